@@ -0,0 +1,108 @@
+#
+# Copyright 2022-2024 Vrije Universiteit Brussel
+#
+# This file is part of vsc-filesystem-oceanstor,
+# originally created by the HPC team of Vrije Universiteit Brussel (https://hpc.vub.be),
+# with support of Vrije Universiteit Brussel (https://www.vub.be),
+# the Flemish Supercomputer Centre (VSC) (https://www.vscentrum.be),
+# the Flemish Research Foundation (FWO) (http://www.fwo.be/en)
+# and the Department of Economy, Science and Innovation (EWI) (http://www.ewi-vlaanderen.be/en).
+#
+# https://github.com/vub-hpc/vsc-filesystem-oceanstor
+#
+# vsc-filesystem-oceanstor is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation v2.
+#
+# vsc-filesystem-oceanstor is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with vsc-filesystem-oceanstor.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Micro-benchmark of the constructor of OceanStorOperations with lazy initialisation
+
+Compares the latency of the constructor, which only requests a token, with the latency it had when the account
+details, the permissions on the object API and the VSC storage configuration were loaded eagerly.
+Queries to OceanStor and parsing of VSC configuration are simulated with a fixed latency.
+This is not part of the test suite, run it manually:
+
+    python bench/lazy_init.py --latency 0.05 --rounds 10
+
+@author: Alex Domingo (Vrije Universiteit Brussel)
+"""
+
+import argparse
+import time
+import unittest.mock as mock
+
+import vsc.filesystem.oceanstor as oceanstor
+
+INIT_PARAMS = ("oceanstor.url", "oceanstor_account", "oceanstor_user", "oceanstor_secret")
+ACCOUNT = {"id": "0000000002", "name": "oceanstor_account", "status": "Active"}
+
+
+def slow(latency, result):
+    """Return function that waits for given latency before returning given result"""
+
+    def slow_call(*args, **kwargs):
+        time.sleep(latency)
+        return result
+
+    return slow_call
+
+
+def mock_backend(latency):
+    """Return mocks of REST client, VSC options and VSC storage answering after given latency"""
+    rest_client = mock.Mock()
+    session = rest_client.return_value
+    session.api.v2.client.login.side_effect = slow(latency, True)
+    session.api.v2.account.accounts.get.side_effect = slow(latency, (0, {"data": [ACCOUNT]}))
+    session.dfv.service.obsOSC.supportAPI.get.side_effect = slow(latency, (0, {"data": {}}))
+
+    options = mock.Mock()
+    options.options.host_institute = "bench_inst"
+    vsc_options = mock.Mock(side_effect=slow(latency, options))
+
+    storage = mock.Mock(backend=oceanstor.LOCAL_FS_OCEANSTOR)
+    vsc_storage = mock.Mock(side_effect=slow(latency, {"bench_inst": {"bench_storage": storage}}))
+
+    return rest_client, vsc_options, vsc_storage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated latency in seconds per query")
+    parser.add_argument("--rounds", type=int, default=10, help="number of constructed instances")
+    args = parser.parse_args()
+
+    rest_client, vsc_options, vsc_storage = mock_backend(args.latency)
+
+    init_times, first_use_times = [], []
+    with mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client), \
+         mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage), \
+         mock.patch("vsc.config.base.VscOptions", vsc_options):
+        for _ in range(args.rounds):
+            oceanstor.OceanStorOperations._instances.clear()
+
+            start = time.perf_counter()
+            ostor = oceanstor.OceanStorOperations(*INIT_PARAMS)
+            init_times.append(time.perf_counter() - start)
+
+            # attributes that were loaded by the constructor before they became lazy
+            start = time.perf_counter()
+            _ = (ostor.account, ostor.objapi_access, ostor.host_institute, ostor.vsc_storage)
+            first_use_times.append(time.perf_counter() - start)
+
+    lazy_ms = 1000 * sum(init_times) / args.rounds
+    eager_ms = lazy_ms + 1000 * sum(first_use_times) / args.rounds
+    print(f"Simulated latency per query: {args.latency * 1000:.1f} ms, rounds: {args.rounds}")
+    print(f"OceanStorOperations constructor (lazy): {lazy_ms:.1f} ms")
+    print(f"OceanStorOperations constructor (eager): {eager_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -27,15 +27,32 @@ Interface for Huawei Pacific OceanStor
 
 @author: Alex Domingo (Vrije Universiteit Brussel)
 """
+import bisect
+import hashlib
+import http.client
+import io
+import itertools
 import json
+import operator
 import os
+import random
 import re
+import sqlite3
 import ssl
+import sys
+import tempfile
+import threading
 import time
+from array import array
 from collections import namedtuple
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from enum import Enum
 from ipaddress import AddressValueError, IPv4Address
 from socket import gethostbyname
+from urllib.error import URLError
+from urllib.parse import urlsplit
 from urllib.request import HTTPError, HTTPSHandler, build_opener
 
 from vsc.config.base import DEFAULT_INODE_MAX, VO_INFIX, VSC, VscStorage
@@ -110,6 +127,43 @@ StorageQuota = namedtuple(
     ],
 )
 
+# Numeric attributes of StorageQuota, stored in typed columns
+OCEANSTOR_QUOTA_INT_FIELDS = (
+    "quota",
+    "blockUsage",
+    "blockQuota",
+    "blockLimit",
+    "blockInDoubt",
+    "blockGrace",
+    "filesUsage",
+    "filesQuota",
+    "filesLimit",
+    "filesInDoubt",
+    "filesGrace",
+    "ownerType",
+    "parentType",
+)
+# Value stored in typed columns for numeric attributes of StorageQuota without value (null in OceanStor)
+OCEANSTOR_QUOTA_INT_NULL = -(2**63)
+# String attributes of StorageQuota shared by many quotas, stored once for all quotas
+OCEANSTOR_QUOTA_SHARED_FIELDS = ("filesetname", "ownerName", "parentId")
+
+# Owner name of user default quotas
+OCEANSTOR_QUOTA_DEFAULT_OWNER = "All User"
+
+# Query parameters of quota limits and their attributes in StorageQuota
+OCEANSTOR_QUOTA_BLOCK_PARAMS = {
+    "space_soft_quota": "blockQuota",
+    "space_hard_quota": "blockLimit",
+}
+OCEANSTOR_QUOTA_FILES_PARAMS = {
+    "file_soft_quota": "filesQuota",
+    "file_hard_quota": "filesLimit",
+}
+
+# URL of query counting quotas, bounds concurrent page requests of quota listings
+OCEANSTOR_QUOTA_COUNT_URL = "/api/v2/file_service/fs_quota/count"
+
 # Soft quota to hard quota factor
 OCEANSTOR_QUOTA_FACTOR = 1.05
 # VO fileset percentage of default user quota
@@ -118,10 +172,105 @@ DEFAULT_VO_USER_QUOTA_PERCENTAGE = 0.5
 DEFAULT_GRACE_DAYS = 7
 # NFS lookup cache lifetime in seconds
 NFS_LOOKUP_CACHE_TIME = 60
+# Lifetime in seconds of resolved addresses of NFS servers
+DNS_CACHE_TIME = 300
 # Keyword identifying the VSC network zone
 VSC_NETWORK_LABEL = "VSC"
+# Details of dtree filesets that need individual queries
+OCEANSTOR_DTREE_DETAILS = ["parent_dir"]
+# Resolution modes of dtree details
+OCEANSTOR_DTREE_DETAIL_MODES = ("eager", "lazy", "skip")
 # Label of local filesystems items with their OceanStor IDs
 LOCAL_FS_OCEANSTOR = "oceanstor"
+# OceanStor ID of local NFS mounts not identified yet
+LOCAL_FS_UNRESOLVED = object()
+# Mount table of the current process, any change invalidates cached identification of local paths
+LOCAL_MOUNT_TABLE = "/proc/self/mountinfo"
+# Default location of the on-disk cache of inventory data from OceanStor
+OCEANSTOR_CACHE_DIR = "/var/cache/vsc-filesystem-oceanstor"
+OCEANSTOR_CACHE_FILE = "inventory.db"
+# Lifetime in seconds of each type of inventory data in the on-disk cache
+OCEANSTOR_CACHE_TTL = {
+    "accounts": 3600,
+    "storagepools": 86400,
+    "namespaces": 3600,
+    "filesystems": 3600,
+    "filesets": 900,
+    "nfsshares": 900,
+    "quotas": 300,
+}
+OCEANSTOR_CACHE_DEFAULT_TTL = 300
+# Freshness policy of cached collections: tuple with TTL and maximum staleness in seconds
+# - data younger than TTL is used as is (if TTL is None: cached data never expires)
+# - data older than TTL but within maximum staleness is used while it is refreshed in the background
+# - older data is refreshed before use
+OCEANSTOR_CACHE_POLICY = {
+    "storagepools": (None, None),
+    "namespaces": (None, None),
+    "buckets": (None, None),
+    "filesystems": (None, None),
+    "filesets": (None, None),
+    "nfsshares": (None, None),
+    "nfsclients": (None, None),
+    "nfsservers": (None, None),
+    "quotas": (None, None),
+}
+# Path of authentication endpoint of the REST API
+OCEANSTOR_AUTH_URL = "api/v2/aa/sessions"
+# Lifetime in seconds of X-Auth-Tokens and margin before expiration to request a new one
+OCEANSTOR_TOKEN_LIFETIME = 1800
+OCEANSTOR_TOKEN_REFRESH_MARGIN = 120
+# Exit codes of OceanStor for failed authentication of the query
+OCEANSTOR_AUTH_ERROR_CODES = (-401, 1077949069)
+# Retries of queries failing with transient errors, with jittered exponential backoff (delays in seconds)
+OCEANSTOR_RETRY_MAX = 4
+OCEANSTOR_RETRY_DELAY = 0.5
+OCEANSTOR_RETRY_MAX_DELAY = 30
+# HTTP methods safe to retry automatically, other methods are only retried if marked as idempotent
+OCEANSTOR_IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE")
+# HTTP status codes of transient failures
+OCEANSTOR_RETRY_HTTP_CODES = (429, 502, 503, 504)
+# Exit codes of OceanStor for transient failures: system busy
+OCEANSTOR_RETRY_ERROR_CODES = (1077949006,)
+# Exit codes of OceanStor for failures that will not go away on retry: object already exists,
+# object does not exist, snapshot does not exist, no permission
+OCEANSTOR_FATAL_ERROR_CODES = (33656849, 33566737, 33656855, 1077949058)
+# Adaptation of query rate on throttling: multiplicative decrease and additive increase per successful query
+OCEANSTOR_RATE_DECREASE = 0.5
+OCEANSTOR_RATE_INCREASE = 0.1
+OCEANSTOR_RATE_MIN = 1
+# HTTP status codes of responses throttling queries
+OCEANSTOR_THROTTLE_HTTP_CODES = (429, 503)
+# Upper bounds in seconds of buckets in histograms of query latency
+OCEANSTOR_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Minimum number of NFS shares to request their clients in bulk for the whole account
+OCEANSTOR_NFS_BULK_THRESHOLD = 8
+# Default options of NFS clients in NFS shares:
+# read-write access, synchronous writes, no squashing of regular users, squashing of root
+OCEANSTOR_NFS_CLIENT_DEFAULTS = {
+    "access_value": 1,
+    "sync": 0,
+    "all_squash": 1,
+    "root_squash": 0,
+}
+# Counters of usage of cached data per collection
+OCEANSTOR_CACHE_COUNTERS = ("hits", "stale_hits", "misses", "refreshes", "disk_hits", "disk_misses")
+# Number of persistent connections kept open per host of the REST API
+OCEANSTOR_POOL_SIZE = 8
+# Maximum number of items per page in paginated queries
+OCEANSTOR_PAGE_SIZE = 100
+# Maximum number of concurrent queries to the REST API
+OCEANSTOR_MAX_WORKERS = 8
+# Rate limits per family of endpoints of the REST API:
+# (queries per second, burst of queries, maximum queries in flight), None disables the limit
+# Query rates are not limited by default, enable them per client with the rate_limits option
+OCEANSTOR_RATE_LIMITS = {
+    "fs_quota": (None, None, OCEANSTOR_MAX_WORKERS),
+    "dtrees": (None, None, OCEANSTOR_MAX_WORKERS),
+    "snapshots": (None, None, OCEANSTOR_MAX_WORKERS),
+    "nas_protocol": (None, None, OCEANSTOR_MAX_WORKERS),
+    "default": (None, None, OCEANSTOR_MAX_WORKERS),
+}
 
 # OceanStor does not support filesets with a different name than its root folder
 # Regex to convert between VSC and OceanStor fileset names
@@ -134,74 +283,984 @@ BANNED_FILESET_NAMES = [
 ]
 
 
+def parallel_map(func, items, max_workers=OCEANSTOR_MAX_WORKERS):
+    """
+    Apply func to each of the given items concurrently in a bounded pool of threads
+    Return list of results in the same order as items, exceptions in any call are re-raised
+
+    @type max_workers: int with maximum number of concurrent threads (if 1: run serially)
+    """
+    items = list(items)
+
+    if max_workers is None or max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(func, items))
+
+
+def approx_sizeof(obj):
+    """
+    Return approximate size in bytes of given object and all objects referenced by it
+    Each object is only accounted once
+    """
+    size = 0
+    seen = set()
+    pending = [obj]
+
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+
+        if isinstance(item, (str, bytes, int, float, bool, type(None), array)):
+            continue
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+        else:
+            if hasattr(item, "__dict__"):
+                pending.append(vars(item))
+            for slot in getattr(item.__class__, "__slots__", ()):
+                if hasattr(item, slot):
+                    pending.append(getattr(item, slot))
+
+    return size
+
+
+class OceanStorResponse(io.BytesIO):
+    """
+    Fully read HTTP response from OceanStor
+    Mimics the file-like responses of urllib used by Client.request()
+    """
+
+    def __init__(self, data, code, reason, headers):
+        super().__init__(data)
+        self.code = code
+        self.status = code
+        self.reason = reason
+        self.headers = headers
+
+    def getcode(self):
+        """Return HTTP status code of the response"""
+        return self.code
+
+
+class OceanStorConnectionPool:
+    """
+    Pool of persistent HTTP/1.1 connections to the OceanStor REST API
+    Idle connections are kept alive per host and reused by subsequent requests
+    """
+
+    # errors raised by connections closed on the server side while idle in the pool
+    STALE_CONNECTION_ERRORS = (
+        http.client.RemoteDisconnected,
+        http.client.BadStatusLine,
+        BrokenPipeError,
+        ConnectionResetError,
+        ConnectionAbortedError,
+    )
+
+    def __init__(self, maxsize=OCEANSTOR_POOL_SIZE, ssl_context=None):
+        """
+        @type maxsize: int with maximum number of idle connections kept per host
+        @type ssl_context: SSLContext for HTTPS connections (if None: default context with certificate verification)
+        """
+        self.maxsize = maxsize
+        self.ssl_context = ssl_context
+        self.hits = 0
+        self.misses = 0
+
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _new_connection(self, scheme, host):
+        """Open new connection to given host"""
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, context=self.ssl_context)
+        return http.client.HTTPConnection(host)
+
+    def acquire(self, scheme, host):
+        """
+        Get a connection to given host, reusing an idle one if possible
+        Return connection and boolean stating if connection was reused
+        """
+        with self._lock:
+            idle = self._idle.get((scheme, host))
+            if idle:
+                self.hits += 1
+                return idle.pop(), True
+            self.misses += 1
+
+        return self._new_connection(scheme, host), False
+
+    def release(self, scheme, host, conn):
+        """Return connection to the pool of idle connections, close it if the pool is full"""
+        with self._lock:
+            idle = self._idle.setdefault((scheme, host), [])
+            if len(idle) < self.maxsize:
+                idle.append(conn)
+                return
+
+        conn.close()
+
+    def clear(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle_conns = [conn for idle in self._idle.values() for conn in idle]
+            self._idle = {}
+
+        for conn in idle_conns:
+            conn.close()
+
+    def stats(self):
+        """Return dict with pool hits, misses and number of idle connections"""
+        with self._lock:
+            idle = sum(len(conns) for conns in self._idle.values())
+
+        return {"hits": self.hits, "misses": self.misses, "idle": idle}
+
+    def urlopen(self, method, url, body=None, headers=None):
+        """
+        Send HTTP request over a pooled connection and read the full response
+        Requests on reused connections that were closed by the server are sent once more on a new connection
+
+        @returns: tuple with HTTP status, reason, response headers and response body
+        """
+        url_parts = urlsplit(url)
+        scheme, host = url_parts.scheme, url_parts.netloc
+        path = url_parts.path or "/"
+        if url_parts.query:
+            path += "?" + url_parts.query
+
+        if headers is None:
+            headers = {}
+
+        while True:
+            conn, reused = self.acquire(scheme, host)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except self.STALE_CONNECTION_ERRORS as err:
+                conn.close()
+                if reused:
+                    fancylogger.getLogger().debug("Pooled connection to %s was closed by server: %s", host, err)
+                    continue
+                raise URLError(err) from err
+            except (OSError, http.client.HTTPException) as err:
+                conn.close()
+                raise URLError(err) from err
+            break
+
+        if response.will_close:
+            conn.close()
+        else:
+            self.release(scheme, host, conn)
+
+        return response.status, response.reason, response.headers, data
+
+
+class OceanStorRateLimiter:
+    """
+    Token bucket rate limiter with a maximum number of queries in flight
+    Query rate is adapted to throttling of the server: decreased multiplicatively and recovered additively
+    """
+
+    def __init__(self, rate=None, burst=None, max_in_flight=None):
+        """
+        @type rate: float with maximum number of queries per second (if None: unlimited)
+        @type burst: int with maximum number of queries sent at once (if None: same as rate)
+        @type max_in_flight: int with maximum number of concurrent queries (if None: unlimited)
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(burst or rate or 1, 1)
+        self.max_in_flight = max_in_flight
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.throttled = 0
+
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+
+    def _take_token(self):
+        """
+        Take a token from the bucket if available
+        Return seconds to wait for next token otherwise
+        """
+        with self._lock:
+            if self.rate is None:
+                return 0
+
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Block until query can be sent within limits of rate and queries in flight"""
+        with self._lock:
+            self.waiting += 1
+
+        try:
+            if self._slots is not None:
+                self._slots.acquire()
+            try:
+                wait = self._take_token()
+                while wait > 0:
+                    time.sleep(wait)
+                    wait = self._take_token()
+            except BaseException:
+                if self._slots is not None:
+                    self._slots.release()
+                raise
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+        with self._lock:
+            self.in_flight += 1
+
+    def release(self, throttled=False):
+        """
+        Release slot of finished query and adapt query rate
+
+        @type throttled: bool to decrease query rate if query was throttled by the server
+        """
+        with self._lock:
+            self.in_flight -= 1
+
+            if self.rate is not None:
+                if throttled:
+                    self.throttled += 1
+                    self.rate = max(self.rate * OCEANSTOR_RATE_DECREASE, OCEANSTOR_RATE_MIN)
+                else:
+                    self.rate = min(self.rate + OCEANSTOR_RATE_INCREASE, self.max_rate)
+
+        if self._slots is not None:
+            self._slots.release()
+
+    def status(self):
+        """Return dict with current rate, queries in flight and queries waiting in queue"""
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "max_rate": self.max_rate,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "waiting": self.waiting,
+                "throttled": self.throttled,
+            }
+
+
+class OceanStorQueryStats:
+    """
+    Statistics of queries to the REST API of OceanStor per endpoint
+    Counts of calls, histograms of latency, bytes transferred, pages fetched and error codes
+    """
+
+    PROMETHEUS_PREFIX = "oceanstor_api"
+
+    def __init__(self, buckets=OCEANSTOR_LATENCY_BUCKETS):
+        """
+        @type buckets: list of upper bounds in seconds of buckets in latency histograms
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def endpoint(url):
+        """
+        Return name of endpoint of given url: its path without query parameters and numeric IDs
+        """
+        path = urlsplit(url).path.strip("/")
+        return "/".join(":id" if component.isdigit() else component for component in path.split("/"))
+
+    def _entry(self, method, url):
+        """Return statistics of endpoint of given query, lock must be held"""
+        key = (method, self.endpoint(url))
+        if key not in self._endpoints:
+            self._endpoints[key] = {
+                "calls": 0,
+                "latency_sum": 0.0,
+                "latency_max": 0.0,
+                "latency_buckets": [0] * (len(self.buckets) + 1),
+                "bytes_sent": 0,
+                "bytes_received": 0,
+                "pages": 0,
+                "errors": {},
+            }
+        return self._endpoints[key]
+
+    def record(self, method, url, latency, bytes_sent=0, bytes_received=0, error=None):
+        """
+        Record statistics of a single query
+
+        @type method: string with HTTP method of the query
+        @type url: string with url of the query
+        @type latency: float with duration of the query in seconds
+        @type bytes_sent: int with size of body of the request
+        @type bytes_received: int with size of body of the response
+        @type error: string with HTTP status or OceanStor exit code of failed query
+        """
+        with self._lock:
+            entry = self._entry(method, url)
+            entry["calls"] += 1
+            entry["latency_sum"] += latency
+            entry["latency_max"] = max(entry["latency_max"], latency)
+            entry["latency_buckets"][bisect.bisect_left(self.buckets, latency)] += 1
+            entry["bytes_sent"] += bytes_sent
+            entry["bytes_received"] += bytes_received
+            if error is not None:
+                entry["errors"][error] = entry["errors"].get(error, 0) + 1
+
+    def record_page(self, method, url):
+        """Record page fetched in a paginated query"""
+        with self._lock:
+            self._entry(method, url)["pages"] += 1
+
+    def report(self):
+        """
+        Return dict with statistics per endpoint, keyed by HTTP method and endpoint name
+        Latency histograms are cumulative and keyed by upper bound of each bucket
+        """
+        report = {}
+        with self._lock:
+            for (method, endpoint), entry in sorted(self._endpoints.items()):
+                histogram = {}
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), entry["latency_buckets"]):
+                    cumulative += count
+                    histogram[bound] = cumulative
+                report[f"{method} {endpoint}"] = dict(entry, latency_buckets=histogram, errors=dict(entry["errors"]))
+
+        return report
+
+    def reset(self):
+        """Clear all statistics"""
+        with self._lock:
+            self._endpoints = {}
+
+    @staticmethod
+    def _labels(**labels):
+        """Format labels of a Prometheus metric"""
+        escaped = []
+        for name, value in labels.items():
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            escaped.append(f'{name}="{value}"')
+        return "{" + ",".join(escaped) + "}"
+
+    def prometheus(self):
+        """Return statistics in Prometheus text exposition format"""
+        prefix = self.PROMETHEUS_PREFIX
+        metrics = {
+            "requests_total": ("counter", "Number of queries to the OceanStor REST API", []),
+            "request_duration_seconds": ("histogram", "Latency of queries to the OceanStor REST API", []),
+            "request_errors_total": ("counter", "Number of failed queries by HTTP status or exit code", []),
+            "sent_bytes_total": ("counter", "Bytes sent in bodies of queries", []),
+            "received_bytes_total": ("counter", "Bytes received in bodies of responses", []),
+            "pages_total": ("counter", "Number of pages fetched in paginated queries", []),
+        }
+
+        for key, entry in self.report().items():
+            method, endpoint = key.split(" ", 1)
+            labels = {"method": method, "endpoint": endpoint}
+            metrics["requests_total"][2].append(f"{prefix}_requests_total{self._labels(**labels)} {entry['calls']}")
+
+            duration = metrics["request_duration_seconds"][2]
+            for bound, count in entry["latency_buckets"].items():
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                duration.append(f"{prefix}_request_duration_seconds_bucket{self._labels(**labels, le=le)} {count}")
+            duration.append(f"{prefix}_request_duration_seconds_sum{self._labels(**labels)} {entry['latency_sum']}")
+            duration.append(f"{prefix}_request_duration_seconds_count{self._labels(**labels)} {entry['calls']}")
+
+            for code, count in sorted(entry["errors"].items()):
+                error_labels = self._labels(**labels, code=code)
+                metrics["request_errors_total"][2].append(f"{prefix}_request_errors_total{error_labels} {count}")
+
+            for metric, field in (
+                ("sent_bytes_total", "bytes_sent"),
+                ("received_bytes_total", "bytes_received"),
+                ("pages_total", "pages"),
+            ):
+                metrics[metric][2].append(f"{prefix}_{metric}{self._labels(**labels)} {entry[field]}")
+
+        lines = []
+        for metric, (metric_type, description, samples) in metrics.items():
+            lines.append(f"# HELP {prefix}_{metric} {description}")
+            lines.append(f"# TYPE {prefix}_{metric} {metric_type}")
+            lines.extend(samples)
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Write statistics to a textfile for the textfile collector of Prometheus node_exporter
+        File is replaced atomically to never expose partial contents to the collector
+
+        @type path: string with path to textfile, should have a '.prom' extension
+        """
+        prom_dir = os.path.dirname(os.path.abspath(path))
+        prom_fd, prom_tmp = tempfile.mkstemp(dir=prom_dir, prefix=".oceanstor-stats-")
+        try:
+            with os.fdopen(prom_fd, "w", encoding="utf-8") as prom_fh:
+                prom_fh.write(self.prometheus())
+            os.chmod(prom_tmp, 0o644)
+            os.replace(prom_tmp, path)
+        except OSError:
+            os.unlink(prom_tmp)
+            raise
+
+
+class OceanStorTokenManager:
+    """
+    Manager of the X-Auth-Token of a user in OceanStor
+    Tokens are renewed before their expiration and can be persisted to disk to be reused by other processes
+    """
+
+    def __init__(
+        self,
+        client,
+        username,
+        password,
+        token_file=None,
+        lifetime=OCEANSTOR_TOKEN_LIFETIME,
+        refresh_margin=OCEANSTOR_TOKEN_REFRESH_MARGIN,
+    ):
+        """
+        @type client: OceanStorClient used to request new tokens
+        @type username: string with username for the REST API
+        @type password: string with plain password for the REST API
+        @type token_file: string with path to file persisting the token (if None: token is not persisted)
+        @type lifetime: int with lifetime of tokens in seconds
+        @type refresh_margin: int with seconds before expiration to request a new token
+        """
+        self.client = client
+        self.username = username
+        self._password = password
+        self.token_file = token_file
+        self.lifetime = lifetime
+        self.refresh_margin = refresh_margin
+
+        self.token = None
+        self.expires = 0
+        self._rejected_token = None
+        self._lock = threading.Lock()
+
+    def _is_fresh(self):
+        """Check if current token is valid for longer than the refresh margin"""
+        return self.token is not None and time.time() < self.expires - self.refresh_margin
+
+    def get_token(self):
+        """
+        Return a valid X-Auth-Token
+        Reuse persisted token if still valid, otherwise request a new one
+        """
+        with self._lock:
+            if not self._is_fresh():
+                self._load_token()
+            if not self._is_fresh():
+                self._authenticate()
+
+            return self.token
+
+    def invalidate(self, token):
+        """
+        Discard given token if it is the current one, next use will request a new token
+        Rejected tokens are not reloaded from the token file
+
+        @type token: string with rejected X-Auth-Token
+        """
+        with self._lock:
+            self._rejected_token = token
+            if self.token == token:
+                self.token = None
+                self.expires = 0
+
+    def _authenticate(self):
+        """Request new token to OceanStor and persist it"""
+        self.client.get_x_auth_token(self.username, self._password)
+        self.token = self.client.x_auth_header["X-Auth-Token"]
+        self.expires = time.time() + self.lifetime
+
+        self._save_token()
+
+    def _load_token(self):
+        """
+        Load persisted token if it belongs to the same server and user
+        Token files accessible by other users are ignored
+        """
+        if self.token_file is None:
+            return
+
+        try:
+            token_stat = os.stat(self.token_file)
+        except FileNotFoundError:
+            return
+        except OSError as err:
+            fancylogger.getLogger().warning("Cannot access token file '%s': %s", self.token_file, err)
+            return
+
+        if token_stat.st_uid != os.getuid() or token_stat.st_mode & 0o077:
+            warnmsg = "Ignoring token file '%s' accessible by other users or not owned by current user"
+            fancylogger.getLogger().warning(warnmsg, self.token_file)
+            return
+
+        try:
+            with open(self.token_file, encoding="utf-8") as token_fh:
+                token_data = json.load(token_fh)
+            url, username = token_data["url"], token_data["username"]
+            token, expires = token_data["token"], float(token_data["expires"])
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            fancylogger.getLogger().warning("Failed to read token file '%s': %s", self.token_file, err)
+            return
+
+        if url == self.client.url and username == self.username and token != self._rejected_token:
+            self.token = token
+            self.expires = expires
+            self.client.x_auth_header = {"X-Auth-Token": token}
+            fancylogger.getLogger().debug("Loaded X-Auth-Token from file: %s", self.token_file)
+
+    def _save_token(self):
+        """
+        Persist current token to disk, only readable by its owner
+        File is replaced atomically to not disrupt other processes using it
+        """
+        if self.token_file is None:
+            return
+
+        token_data = {
+            "url": self.client.url,
+            "username": self.username,
+            "token": self.token,
+            "expires": self.expires,
+        }
+
+        token_dir = os.path.dirname(os.path.abspath(self.token_file))
+        try:
+            os.makedirs(token_dir, mode=0o700, exist_ok=True)
+            token_fd, token_tmp = tempfile.mkstemp(dir=token_dir, prefix=".oceanstor-token-")
+            with os.fdopen(token_fd, "w", encoding="utf-8") as token_fh:
+                json.dump(token_data, token_fh)
+            os.replace(token_tmp, self.token_file)
+        except OSError as err:
+            fancylogger.getLogger().warning("Failed to save token file '%s': %s", self.token_file, err)
+        else:
+            fancylogger.getLogger().debug("Saved X-Auth-Token to file: %s", self.token_file)
+
+
 class OceanStorClient(Client):
     """Client for OceanStor REST API"""
 
-    def __init__(self, *args, **kwargs):
-        """Wrapper for Client.__init__() allowing to disable SSL certificate verification"""
+    def __init__(
+        self,
+        *args,
+        ssl_verify=True,
+        pool_size=OCEANSTOR_POOL_SIZE,
+        retries=OCEANSTOR_RETRY_MAX,
+        retry_delay=OCEANSTOR_RETRY_DELAY,
+        rate_limits=None,
+        **kwargs,
+    ):
+        """
+        Wrapper for Client.__init__() allowing to disable SSL certificate verification
+        Requests are sent through a pool of persistent connections
+
+        @type ssl_verify: bool to enable verification of SSL certificates
+        @type pool_size: int with number of persistent connections per host (if 0: disable connection pool)
+        @type retries: int with maximum number of retries of idempotent queries failing with transient errors
+        @type retry_delay: float with base delay in seconds of the exponential backoff between retries
+        @type rate_limits: dict with rate limits per family of endpoints overriding OCEANSTOR_RATE_LIMITS
+        """
         super().__init__(*args, **kwargs)
 
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+        # Statistics of queries
+        self.stats = OceanStorQueryStats()
+        self._transfer = threading.local()
+
+        self.rate_limiters = {}
+        limits = dict(OCEANSTOR_RATE_LIMITS)
+        if rate_limits:
+            limits.update(rate_limits)
+        for family, family_limits in limits.items():
+            self.set_rate_limit(family, *family_limits)
+
         # X-Auth-Token header
         self.x_auth_header = None
-        ssl_verify = kwargs.get("ssl_verify", True)
+        self.token_manager = None
 
         if ssl_verify is False:
             # Disable verification of SSL certificates
-            nossl_context = ssl._create_unverified_context()
-            nosslHandler = HTTPSHandler(context=nossl_context)
+            ssl_context = ssl._create_unverified_context()
+            nosslHandler = HTTPSHandler(context=ssl_context)
             self.opener = build_opener(nosslHandler)
             fancylogger.getLogger().warning("Verification of SSL certificates disabled by request!")
+        else:
+            ssl_context = ssl.create_default_context()
+
+        self.pool = None
+        if pool_size:
+            self.pool = OceanStorConnectionPool(maxsize=pool_size, ssl_context=ssl_context)
 
-    def get(self, url, pagination=False, headers=None, **params):  # pylint: disable=arguments-differ
+    def get(
+        self,
+        url,
+        pagination=False,
+        headers=None,
+        page_size=OCEANSTOR_PAGE_SIZE,
+        workers=1,
+        count_url=None,
+        stream=False,
+        **params,
+    ):  # pylint: disable=arguments-differ
         """
         HTTP GET request of all pages in the given url with given headers and parameters
         Parameters is a dictionary that will be urlencoded
         Paginated requests append range offset and limit to given parameters
 
         @type pagination: bool to enable paginated queries
+        @type page_size: int with number of items per page in paginated queries (100 is the maximum)
+        @type workers: int with number of pages fetched concurrently in paginated queries
+        @type count_url: string with url of count query of paginated items to bound concurrent page requests
+        @type stream: bool to return a generator of the items in the data of a paginated query
+
+        @returns: tuple with status and response, or generator of items in the response data if streamed
         """
+        if stream is True:
+            # Iterate over items in paginated query, page by page
+            return self._get_items(url, headers, page_size, workers, count_url, params)
+
         # GET query without pagination
         if pagination is False:
             return super().get(url, headers=headers, **params)
 
         # GET query with pagination
+        status = None
+        response = {"data": [], "result": {}}
+
+        for status, page_response in self._get_pages(url, headers, page_size, workers, count_url, params):
+            response["result"] = page_response["result"]  # only keep last result
+            response["data"].extend(page_response["data"])  # append data
+
+        return status, response
+
+    def _get_items(self, url, headers, page_size, workers, count_url, params):
+        """
+        Generator of items in the data of all pages of a paginated GET query
+        Only the pages being processed are kept in memory
+        """
+        for _, page_response in self._get_pages(url, headers, page_size, workers, count_url, params):
+            yield from page_response["data"]
+
+    def _get_page(self, url, headers, offset, limit, params):
+        """
+        HTTP GET request of a single page of items starting at given offset
+        """
         query_range = {
-            "offset": 0,
-            "limit": 100,  # 100 is the maximum
+            "offset": offset,
+            "limit": limit,
         }
 
-        status = None
-        response = {"data": [], "result": {}}
-        page_items = query_range["limit"]
+        page_params = dict(params)
+        page_params["range"] = json.dumps(query_range, separators=OCEANSTOR_JSON_SEP)
+        page_headers = dict(headers) if headers else None
 
-        while page_items == query_range["limit"]:
-            # loop over pages
-            params["range"] = json.dumps(query_range, separators=OCEANSTOR_JSON_SEP)
-            item_status, item_response = super().get(url, headers=headers, **params)
+        return super().get(url, headers=page_headers, **page_params)
 
-            # append page
-            status = item_status
-            response["result"] = item_response["result"]  # only keep last result
-            response["data"].extend(item_response["data"])  # append data
+    def _get_count(self, count_url, headers, params):
+        """
+        HTTP GET request of the total number of items in a paginated query
+        Return None if count cannot be determined
+        """
+        count_headers = dict(headers) if headers else None
 
-            # update item count and jump to next page
-            page_items = len(item_response["data"])
-            query_range["offset"] += page_items
-            fancylogger.getLogger().debug("Items in response of paginated GET query: %s", page_items)
+        try:
+            _, response = super().get(count_url, headers=count_headers, **params)
+            count = int(response["data"]["count"])
+        except (HTTPError, RuntimeError, KeyError, TypeError, ValueError) as err:
+            fancylogger.getLogger().debug("Count query '%s' failed, estimating total of items: %s", count_url, err)
+            return None
 
-        return status, response
+        fancylogger.getLogger().debug("Total of items in paginated GET query: %s", count)
+        return count
 
-    def request(self, method, url, body, headers, content_type=None):
+    def _get_pages(self, url, headers, page_size, workers, count_url, params):
+        """
+        Generator of responses of all pages in a paginated GET query
+        Pages are requested in windows of consecutive offsets fetched concurrently by the given number of workers
+        Windows do not extend past the total of items returned by the count query, if any
+        Responses are yielded in order until the first page that is not full
+
+        @type page_size: int with number of items per page
+        @type workers: int with number of pages fetched concurrently
+        @type count_url: string with url of count query of paginated items (windows are not bounded if None)
+        """
+        if not 0 < page_size <= OCEANSTOR_PAGE_SIZE:
+            errmsg = f"Page size of paginated queries must be between 1 and {OCEANSTOR_PAGE_SIZE}: {page_size}"
+            fancylogger.getLogger().raiseException(errmsg, ValueError)
+
+        workers = max(int(workers), 1)
+
+        total = None
+        if workers > 1 and count_url is not None:
+            total = self._get_count(count_url, headers, params)
+
+        offset = 0
+        while True:
+            window = [offset + n * page_size for n in range(workers)]
+            if total is not None:
+                # do not request pages past the total count, but always check the next page
+                window = [page_offset for page_offset in window if page_offset < total] or [offset]
+
+            pages = parallel_map(
+                lambda page_offset: self._get_page(url, headers, page_offset, page_size, params),
+                window,
+                max_workers=workers,
+            )
+
+            for status, page_response in pages:
+                self.stats.record_page(self.GET, url)
+                page_items = len(page_response["data"])
+                fancylogger.getLogger().debug("Items in response of paginated GET query: %s", page_items)
+                yield status, page_response
+                if page_items < page_size:
+                    # last page
+                    return
+
+            # jump to next window of pages
+            offset = window[-1] + page_size
+
+    @staticmethod
+    def _is_auth_error(err):
+        """Check if error of a query is caused by a rejected X-Auth-Token"""
+        if isinstance(err, HTTPError):
+            return err.code == 401
+
+        try:
+            return err.args[0][1] in OCEANSTOR_AUTH_ERROR_CODES
+        except (IndexError, TypeError):
+            return False
+
+    @staticmethod
+    def is_retryable(err):
+        """
+        Check if error of a query is transient and the query can be retried
+        Connection failures, overload responses and busy system exit codes are transient
+        """
+        if isinstance(err, HTTPError):
+            return err.code in OCEANSTOR_RETRY_HTTP_CODES
+
+        if isinstance(err, URLError):
+            return isinstance(err.reason, (ConnectionError, TimeoutError, http.client.HTTPException))
+
+        try:
+            exit_code = err.args[0][1]
+        except (IndexError, TypeError):
+            return False
+
+        if exit_code in OCEANSTOR_FATAL_ERROR_CODES:
+            return False
+
+        return exit_code in OCEANSTOR_RETRY_ERROR_CODES
+
+    def _retry_wait(self, attempt, err):
+        """
+        Return delay in seconds before given retry attempt of a failed query
+        Exponential backoff with jitter, honouring any Retry-After header in the error response
+        """
+        backoff = min(self.retry_delay * 2**attempt, OCEANSTOR_RETRY_MAX_DELAY)
+        delay = backoff / 2 + random.uniform(0, backoff / 2)
+
+        if isinstance(err, HTTPError) and err.headers is not None:
+            try:
+                delay = max(delay, min(float(err.headers.get("Retry-After")), OCEANSTOR_RETRY_MAX_DELAY))
+            except (TypeError, ValueError):
+                pass
+
+        return delay
+
+    @staticmethod
+    def is_throttled(err):
+        """Check if error of a query is caused by throttling or overload of the server"""
+        if isinstance(err, HTTPError):
+            return err.code in OCEANSTOR_THROTTLE_HTTP_CODES
+
+        try:
+            return err.args[0][1] in OCEANSTOR_RETRY_ERROR_CODES
+        except (IndexError, TypeError):
+            return False
+
+    def set_rate_limit(self, family, rate=None, burst=None, max_in_flight=None):
+        """
+        Set limits of queries to given family of endpoints
+
+        @type family: string with name of endpoint family (e.g. 'fs_quota', 'dtrees' or 'default')
+        @type rate: float with maximum number of queries per second (if None: unlimited)
+        @type burst: int with maximum number of queries sent at once (if None: same as rate)
+        @type max_in_flight: int with maximum number of concurrent queries (if None: unlimited)
+        """
+        self.rate_limiters[family] = OceanStorRateLimiter(rate=rate, burst=burst, max_in_flight=max_in_flight)
+
+    def rate_limiter(self, url):
+        """
+        Return rate limiter of endpoint family of given url
+        Families are matched by any component of the path, falling back to 'default'
+        """
+        for component in urlsplit(url).path.split("/"):
+            if component and component != "default" and component in self.rate_limiters:
+                return self.rate_limiters[component]
+
+        return self.rate_limiters.get("default")
+
+    def rate_limit_status(self):
+        """Return dict with status of rate limiters per endpoint family, including queue depth"""
+        return {family: limiter.status() for family, limiter in self.rate_limiters.items()}
+
+    def post(self, url, body=None, headers=None, idempotent=False, **params):  # pylint: disable=arguments-differ
+        """
+        Wrapper for Client.post() allowing to mark the query as idempotent
+
+        @type idempotent: bool to allow retries of the query on transient errors
+        """
+        url = self._append_slash_to(url) + self.urlencode(params)
+        return self.request(self.POST, url, body, headers, content_type="application/json", idempotent=idempotent)
+
+    def request(self, method, url, body, headers, content_type=None, idempotent=None):
         """
         Wrapper for Client.request() with HTTP error and exit code handling
-        Injects X-Auth-Token headers into the query if present
+        Queries are sent within the limits of rate and concurrency of their endpoint family
+        Idempotent queries failing with transient errors are retried with jittered exponential backoff
+
+        @type idempotent: bool to allow retries of the query on transient errors (if None: depends on HTTP method)
+        """
+        if idempotent is None:
+            idempotent = method in OCEANSTOR_IDEMPOTENT_METHODS
+
+        # Authentication queries are not limited, they can be nested in other queries
+        limiter = None
+        if OCEANSTOR_AUTH_URL not in url:
+            limiter = self.rate_limiter(url)
+
+        attempt = 0
+        while True:
+            try:
+                return self._limited_request(limiter, method, url, body, headers, content_type)
+            except (URLError, RuntimeError) as err:
+                if not idempotent or attempt >= self.retries or not self.is_retryable(err):
+                    raise
+                delay = self._retry_wait(attempt, err)
+                warnmsg = "OceanStor query %s '%s' failed with transient error, retry %s/%s in %.2f seconds: %s"
+                fancylogger.getLogger().warning(warnmsg, method, url, attempt + 1, self.retries, delay, err)
+
+            attempt += 1
+            time.sleep(delay)
+
+    def _limited_request(self, limiter, method, url, body, headers, content_type=None):
+        """
+        Execute request within limits of given rate limiter, adapting its rate to throttling of the server
+        """
+        if limiter is None:
+            return self._authorized_request(method, url, body, headers, content_type)
+
+        throttled = False
+        limiter.acquire()
+        try:
+            return self._authorized_request(method, url, body, headers, content_type)
+        except (URLError, RuntimeError) as err:
+            throttled = self.is_throttled(err)
+            raise
+        finally:
+            limiter.release(throttled=throttled)
+
+    def _authorized_request(self, method, url, body, headers, content_type=None, retry_auth=True):
+        """
+        Execute request injecting X-Auth-Token headers into the query if present
+        Queries rejected due to authentication are retried once with a new token if a token manager is in use
+
+        @type retry_auth: bool to retry query with new token on authentication errors
         """
         # Inject X-Auth-Token into headers
         if headers is None:
             headers = {}
-        if self.x_auth_header:
+
+        token = None
+        if self.token_manager is not None and OCEANSTOR_AUTH_URL not in url:
+            token = self.token_manager.get_token()
+            headers["X-Auth-Token"] = token
+        elif self.x_auth_header:
             headers.update(self.x_auth_header)
 
+        try:
+            return self._request(method, url, body, headers, content_type)
+        except (HTTPError, RuntimeError) as err:
+            if token is None or not retry_auth or not self._is_auth_error(err):
+                raise
+
+        fancylogger.getLogger().warning("OceanStor rejected X-Auth-Token, retrying query with a new token")
+        self.token_manager.invalidate(token)
+
+        return self._authorized_request(method, url, body, headers, content_type=content_type, retry_auth=False)
+
+    @staticmethod
+    def error_code(err):
+        """Return string identifying the failure of a query: HTTP status, OceanStor exit code or error type"""
+        if isinstance(err, HTTPError):
+            return str(err.code)
+
+        if isinstance(err, URLError):
+            return "connection"
+
+        try:
+            return str(err.args[0][1])
+        except (IndexError, TypeError):
+            return err.__class__.__name__
+
+    def _request(self, method, url, body, headers, content_type=None):
+        """
+        Execute request recording its statistics
+        """
+        self._transfer.sent = 0
+        self._transfer.received = 0
+
+        error = None
+        start = time.perf_counter()
+        try:
+            return self._checked_request(method, url, body, headers, content_type)
+        except Exception as err:
+            error = self.error_code(err)
+            raise
+        finally:
+            latency = time.perf_counter() - start
+            self.stats.record(
+                method,
+                url,
+                latency,
+                bytes_sent=self._transfer.sent,
+                bytes_received=self._transfer.received,
+                error=error,
+            )
+
+    def _checked_request(self, method, url, body, headers, content_type=None):
+        """
+        Execute request with HTTP error and exit code handling
+        """
         # Execute request catching any HTTPerror
         try:
             status, response = super().request(method, url, body, headers, content_type)
@@ -241,16 +1300,66 @@ class OceanStorClient(Client):
 
         return status, response
 
+    def get_connection(self, method, url, body, headers):
+        """
+        Wrapper for Client.get_connection() sending requests through the pool of persistent connections
+        HTTP errors are raised as HTTPError, same as urllib openers
+        """
+        if body is not None:
+            self._transfer.sent = len(body.encode())
+
+        if self.pool is None:
+            try:
+                connection = super().get_connection(method, url, body, headers)
+            except HTTPError as err:
+                self._transfer.received = int(err.headers.get("Content-Length", 0) if err.headers else 0)
+                raise
+            self._transfer.received = int(connection.headers.get("Content-Length", 0))
+            return connection
+
+        if not self.url.endswith("/") and not url.startswith("/"):
+            sep = "/"
+        else:
+            sep = ""
+        full_url = self.url + sep + url
+
+        if body is not None:
+            body = body.encode()
+
+        fancylogger.getLogger().debug("opening pooled request: %s", full_url)
+        status, reason, resp_headers, data = self.pool.urlopen(method, full_url, body=body, headers=headers)
+        self._transfer.received = len(data)
+
+        if status >= 400:
+            raise HTTPError(full_url, status, reason, resp_headers, io.BytesIO(data))
+
+        return OceanStorResponse(data, status, reason, resp_headers)
+
+    def login(self, username, password, token_file=None):
+        """
+        Authenticate with X-Auth-Tokens managed by a OceanStorTokenManager
+        Tokens are renewed before expiration and on authentication errors
+
+        @type username: string with username for the REST API
+        @type password: string with plain password for the REST API
+        @type token_file: string with path to file persisting the token (if None: token is not persisted)
+        """
+        self.token_manager = OceanStorTokenManager(self, username, password, token_file=token_file)
+        self.token_manager.get_token()
+
+        return True
+
     def get_x_auth_token(self, username, password):
         """Request authetication token"""
-        query_url = os.path.join("api", "v2", "aa", "sessions")
+        query_url = OCEANSTOR_AUTH_URL
 
         payload = {
             "user_name": username,
             "password": password,
         }
 
-        status, response = self.post(query_url, body=payload)
+        # requesting a new session has no side effects, safe to retry
+        status, response = self.post(query_url, body=payload, idempotent=True)
         fancylogger.getLogger().debug("Request for X-Auth-Token got reponse status: %s", status)
 
         try:
@@ -266,69 +1375,1010 @@ class OceanStorClient(Client):
         return True
 
 
-class OceanStorRestClient(RestClient):
-    def __init__(self, *args, **kwargs):
-        """Create client for OceanStor with given arguments"""
-        self.client = OceanStorClient(*args, **kwargs)
+class OceanStorCollection(dict):
+    """
+    Cached collection of objects from OceanStor
+    Every change to the collection takes a new version number, unique across all collections
+    """
+
+    __slots__ = ("version",)
+
+    _versions = itertools.count(1)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = next(self._versions)
+
+    def _changed(self):
+        """Take new version number after a change to the collection"""
+        self.version = next(self._versions)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+
+def collection_version(source):
+    """
+    Return version of given collection of objects from OceanStor
+    Plain dicts have no version, their size is used instead
+    """
+    try:
+        return source.version
+    except AttributeError:
+        return len(source)
+
+
+class OceanStorDtree(dict):
+    """
+    Dtree fileset data from OceanStor
+    Details missing in listings of dtrees can be resolved on first access through the given resolver
+    """
+
+    def __init__(self, *args, resolver=None, **kwargs):
+        """
+        @type resolver: function returning dict of details of the dtree fileset from its ID
+        """
+        super().__init__(*args, **kwargs)
+        self.resolver = resolver
+
+    def __missing__(self, key):
+        """Resolve missing details of this dtree fileset once"""
+        if self.resolver is not None and key in OCEANSTOR_DTREE_DETAILS:
+            self.resolve()
+            return self[key]
+
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        """Resolve missing details of this dtree fileset before checking for them"""
+        if self.resolver is not None and key in OCEANSTOR_DTREE_DETAILS and not super().__contains__(key):
+            self.resolve()
+
+        return super().__contains__(key)
+
+    def get(self, key, default=None):
+        """Resolve missing details of this dtree fileset before getting them"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def resolve(self):
+        """Query details of this dtree fileset from OceanStor"""
+        resolver, self.resolver = self.resolver, None
+        if resolver is not None:
+            self.update(resolver(self["id"]))
+
+
+class OceanStorNameIndex:
+    """
+    Bidirectional index between names and IDs of the objects in a cached collection from OceanStor
+    Index is rebuilt whenever the indexed collection is replaced or changes version
+    """
+
+    __slots__ = ("id_attr", "name_attr", "_source", "_version", "_by_id", "_by_name")
+
+    def __init__(self, id_attr="id", name_attr="name"):
+        """
+        @type id_attr: string with name of attribute holding the ID of each object
+        @type name_attr: string with name of attribute holding the name of each object
+        """
+        self.id_attr = id_attr
+        self.name_attr = name_attr
+        self._source = None
+        self._version = None
+        self._by_id = {}
+        self._by_name = {}
+
+    def sync(self, source):
+        """
+        Index objects in given collection if it changed since last synchronisation
+
+        @type source: OceanStorCollection with objects from OceanStor (changes in plain dicts are tracked by size)
+
+        @returns: this index
+        """
+        version = collection_version(source)
+        if source is not self._source or version != self._version:
+            self._by_id = {obj[self.id_attr]: obj[self.name_attr] for obj in source.values()}
+            self._by_name = {obj_name: obj_id for obj_id, obj_name in self._by_id.items()}
+            self._source = source
+            self._version = version
+
+        return self
+
+    def get_name(self, obj_id, default=None):
+        """Return name of object with given ID"""
+        return self._by_id.get(obj_id, default)
+
+    def get_id(self, obj_name, default=None):
+        """Return ID of object with given name"""
+        return self._by_name.get(obj_name, default)
+
+
+class OceanStorPathTrie:
+    """
+    Prefix tree of the paths of dtree filesets in a filesystem keyed by path components
+    Each node is a tuple with a dict of child nodes and a list of IDs of dtree filesets at that path
+    """
+
+    __slots__ = ("_root", "_size", "source", "version")
+
+    def __init__(self, source=None):
+        """
+        @type source: dict with dtree filesets in a filesystem (keys per dtree fileset ID)
+        """
+        self._root = ({}, [])
+        self._size = 0
+        self.source = source
+        self.version = None
+
+        if source is not None:
+            self.version = collection_version(source)
+            for dt_id, dt in source.items():
+                self.insert(os.path.join(dt["parent_dir"], dt["name"]), dt_id)
+
+    def __len__(self):
+        return self._size
+
+    @staticmethod
+    def _components(path):
+        """Split path in its components"""
+        return [component for component in path.split("/") if component]
+
+    def insert(self, path, dt_id):
+        """
+        Add dtree fileset at given path
+
+        @type path: string with path of the dtree fileset relative to root of filesystem
+        @type dt_id: ID of the dtree fileset
+        """
+        node = self._root
+        for component in self._components(path):
+            node = node[0].setdefault(component, ({}, []))
+
+        node[1].append(dt_id)
+        self._size += 1
+
+    def lookup(self, path):
+        """
+        Find deepest dtree filesets containing given path
+
+        @type path: string with path relative to root of filesystem
+
+        @returns: tuple with path of the dtree filesets and list of their IDs (empty if none is found)
+        """
+        match_path, match_ids = "/", []
+
+        node = self._root
+        components = self._components(path)
+        for depth, component in enumerate(components, start=1):
+            try:
+                node = node[0][component]
+            except KeyError:
+                break
+            if node[1]:
+                match_path, match_ids = "/" + "/".join(components[:depth]), node[1]
+
+        return match_path, list(match_ids)
+
+
+class OceanStorQuotaTable:
+    """
+    Columnar storage of StorageQuota named tuples
+    Numeric attributes are kept in typed arrays and shared strings are interned, rows are handed out as StorageQuota
+    Rows of removed quotas are reused by new quotas
+    """
+
+    __slots__ = ("_columns", "_free")
+
+    def __init__(self):
+        self._columns = {
+            field: array("q") if field in OCEANSTOR_QUOTA_INT_FIELDS else [] for field in StorageQuota._fields
+        }
+        self._free = []
+
+    def __len__(self):
+        return len(self._columns["id"]) - len(self._free)
+
+    @staticmethod
+    def _row_values(quota):
+        """
+        Return list of values of given quota ready to be stored in the table
+        Numeric attributes are validated as integers and shared strings are interned
+        """
+        values = []
+        for field, value in zip(StorageQuota._fields, quota):
+            if field in OCEANSTOR_QUOTA_INT_FIELDS:
+                value = OCEANSTOR_QUOTA_INT_NULL if value is None else operator.index(value)
+            elif field in OCEANSTOR_QUOTA_SHARED_FIELDS and isinstance(value, str):
+                value = sys.intern(value)
+            values.append(value)
+
+        return values
+
+    def add(self, quota):
+        """
+        Store given quota in a free row of the table
+
+        @type quota: StorageQuota named tuple (numeric attributes must be integers or None)
+
+        @returns: int with row number of the quota
+        """
+        if self._free:
+            row = self._free.pop()
+            self.update(row, quota)
+        else:
+            row = len(self._columns["id"])
+            for field, value in zip(StorageQuota._fields, self._row_values(quota)):
+                self._columns[field].append(value)
+
+        return row
+
+    def update(self, row, quota):
+        """
+        Replace quota in given row of the table
+
+        @type row: int with row number
+        @type quota: StorageQuota named tuple (numeric attributes must be integers or None)
+        """
+        for field, value in zip(StorageQuota._fields, self._row_values(quota)):
+            self._columns[field][row] = value
+
+    def copy(self):
+        """Return independent copy of this table"""
+        table = OceanStorQuotaTable()
+        table._columns = {field: column[:] for field, column in self._columns.items()}
+        table._free = self._free[:]
+
+        return table
+
+    def remove(self, row):
+        """Release given row of the table"""
+        for field in StorageQuota._fields:
+            if field not in OCEANSTOR_QUOTA_INT_FIELDS:
+                # drop references to strings
+                self._columns[field][row] = None
+        self._free.append(row)
+
+    def get(self, row):
+        """Return StorageQuota named tuple of given row"""
+        return StorageQuota._make(self.get_field(row, field) for field in StorageQuota._fields)
+
+    def get_field(self, row, field):
+        """Return value of a single attribute of the quota in given row"""
+        value = self._columns[field][row]
+        if value == OCEANSTOR_QUOTA_INT_NULL and field in OCEANSTOR_QUOTA_INT_FIELDS:
+            return None
+
+        return value
+
+
+class OceanStorQuotaIndex(MutableMapping):
+    """
+    Collection of StorageQuota named tuples of one quota type in a filesystem keyed by quota ID
+    Quotas are stored in a compact OceanStorQuotaTable and handed out as StorageQuota named tuples
+    Quotas are also indexed by parent object and owner, indexes are updated on every change to the collection
+    The index holds one dict of owners per parent object, mapping each owner to the ID of its quota
+    (or a tuple of IDs if the owner has several quotas in the same parent)
+    """
+
+    def __init__(self, quotas=None):
+        """
+        @type quotas: dict with StorageQuota named tuples keyed by quota ID
+        """
+        self._table = OceanStorQuotaTable()
+        self._rows = {}
+        self._by_parent = {}
+
+        if quotas is not None:
+            self.update(quotas)
+
+    def __getitem__(self, quota_id):
+        return self._table.get(self._rows[quota_id])
+
+    def __setitem__(self, quota_id, quota):
+        if quota_id in self._rows:
+            row = self._rows[quota_id]
+            previous_keys = self._index_keys(row)
+            self._table.update(row, quota)
+            self._unindex(quota_id, *previous_keys)
+        else:
+            self._rows[quota_id] = self._table.add(quota)
+
+        self._index(quota_id, quota.parentId, quota.ownerName)
+
+    def __delitem__(self, quota_id):
+        row = self._rows.pop(quota_id)
+        self._unindex(quota_id, *self._index_keys(row))
+        self._table.remove(row)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict(self.items())!r})"
+
+    def copy(self):
+        """Return independent copy of this collection without converting its quotas"""
+        quota_index = OceanStorQuotaIndex()
+        quota_index._table = self._table.copy()
+        quota_index._rows = dict(self._rows)
+        quota_index._by_parent = {parent_id: dict(owners) for parent_id, owners in self._by_parent.items()}
+
+        return quota_index
+
+    def _index_keys(self, row):
+        """Return parent ID and owner name of quota in given row of the table"""
+        return self._table.get_field(row, "parentId"), self._table.get_field(row, "ownerName")
+
+    def _index(self, quota_id, parent_id, owner):
+        """Add quota with given ID to the index by parent and owner"""
+        parent_owners = self._by_parent.setdefault(parent_id, {})
+        owner_quotas = parent_owners.get(owner)
+        if owner_quotas is None:
+            parent_owners[owner] = quota_id
+        elif isinstance(owner_quotas, tuple):
+            parent_owners[owner] = owner_quotas + (quota_id,)
+        else:
+            parent_owners[owner] = (owner_quotas, quota_id)
+
+    def _unindex(self, quota_id, parent_id, owner):
+        """Remove quota with given ID from the index by parent and owner"""
+        parent_owners = self._by_parent[parent_id]
+        owner_quotas = parent_owners[owner]
+        if isinstance(owner_quotas, tuple):
+            owner_quotas = tuple(qid for qid in owner_quotas if qid != quota_id)
+            parent_owners[owner] = owner_quotas[0] if len(owner_quotas) == 1 else owner_quotas
+        else:
+            del parent_owners[owner]
+
+        if not parent_owners:
+            del self._by_parent[parent_id]
+
+    @staticmethod
+    def _owner_quota_ids(owner_quotas):
+        """Return tuple of quota IDs of an entry of the index by parent and owner"""
+        return owner_quotas if isinstance(owner_quotas, tuple) else (owner_quotas,)
+
+    def lookup(self, parent_id, owner=None):
+        """
+        Return dict of quotas attached to given parent object keyed by quota ID
+
+        @type parent_id: ID of the parent object in OceanStor (filesystem or dtree)
+        @type owner: name of the owner of the quotas (if None: any owner)
+        """
+        parent_owners = self._by_parent.get(parent_id, {})
+        if owner is None:
+            owner_quotas = parent_owners.values()
+        elif owner in parent_owners:
+            owner_quotas = [parent_owners[owner]]
+        else:
+            owner_quotas = []
+
+        return {
+            quota_id: self[quota_id]
+            for quotas in owner_quotas
+            for quota_id in self._owner_quota_ids(quotas)
+        }
+
+
+class OceanStorInventoryCache:
+    """
+    On-disk cache of inventory data from OceanStor shared across processes
+    Data is stored as JSON in a SQLite database in WAL mode, entries expire after the TTL of their type of data
+    Entries are scoped to a given API server and account
+    """
+
+    def __init__(self, scope, cache_dir=OCEANSTOR_CACHE_DIR, ttl=None):
+        """
+        @type scope: string identifying the API server and account of the cached data
+        @type cache_dir: string with path to directory of the cache (created with 0700 permissions)
+        @type ttl: dict with lifetime in seconds per type of data (defaults to OCEANSTOR_CACHE_TTL)
+        """
+        self.log = fancylogger.getLogger()
+        self.scope = scope
+        self.ttl = dict(OCEANSTOR_CACHE_TTL)
+        if ttl is not None:
+            self.ttl.update(ttl)
+
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        self.path = os.path.join(cache_dir, OCEANSTOR_CACHE_FILE)
+
+        # database is only accessible by its owner, SQLite creates its journals with the same permissions
+        cache_fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            os.fchmod(cache_fd, 0o600)
+        finally:
+            os.close(cache_fd)
+
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS inventory ("
+            "scope TEXT NOT NULL, entity TEXT NOT NULL, key TEXT NOT NULL, "
+            "value TEXT NOT NULL, updated REAL NOT NULL, expires REAL NOT NULL, "
+            "PRIMARY KEY (scope, entity, key))"
+        )
+
+        self._lock = threading.Lock()
+        self.log.debug("On-disk cache of OceanStor inventory in: %s", self.path)
+
+    def get(self, entity, key, max_age=None):
+        """
+        Return cached data of given type and key, None if missing, expired or older than max_age
+
+        @type entity: string with type of data
+        @type key: string identifying the data
+        @type max_age: int with maximum age in seconds of the data (if None: only expiration applies)
+        """
+        return self.get_entry(entity, key, max_age=max_age)[0]
+
+    def get_entry(self, entity, key, max_age=None):
+        """
+        Return tuple with cached data of given type and key and its age in seconds
+        Return (None, None) if missing, expired or older than max_age
+
+        @type entity: string with type of data
+        @type key: string identifying the data
+        @type max_age: int with maximum age in seconds of the data (if None: only expiration applies)
+        """
+        now = time.time()
+        query = "SELECT value, updated FROM inventory WHERE scope = ? AND entity = ? AND key = ? AND expires > ?"
+        params = [self.scope, entity, str(key), now]
+        if max_age is not None:
+            query += " AND updated >= ?"
+            params.append(now - max_age)
+
+        try:
+            with self._lock:
+                row = self._conn.execute(query, params).fetchone()
+        except sqlite3.Error as err:
+            self.log.warning("Failed to read %s '%s' from on-disk cache: %s", entity, key, err)
+            return None, None
+
+        if row is None:
+            return None, None
+
+        self.log.debug("(disk cache) Found %s '%s' in on-disk cache", entity, key)
+        return json.loads(row[0]), max(now - row[1], 0)
+
+    def set(self, entity, key, value, age=None):
+        """
+        Store data of given type and key in the cache
+
+        @type entity: string with type of data
+        @type key: string identifying the data
+        @type value: JSON serializable data
+        @type age: float with age in seconds of the data (if None: data is new)
+        """
+        updated = time.time() - (age or 0)
+        expires = updated + self.ttl.get(entity, OCEANSTOR_CACHE_DEFAULT_TTL)
+        query = (
+            "INSERT OR REPLACE INTO inventory (scope, entity, key, value, updated, expires) VALUES (?, ?, ?, ?, ?, ?)"
+        )
+        try:
+            with self._lock:
+                self._conn.execute(query, (self.scope, entity, str(key), json.dumps(value), updated, expires))
+        except (sqlite3.Error, TypeError, ValueError) as err:
+            self.log.warning("Failed to write %s '%s' to on-disk cache: %s", entity, key, err)
+
+    def invalidate(self, entity=None, key=None):
+        """
+        Drop cached data of given type and key
+
+        @type entity: string with type of data (if None: all types of data)
+        @type key: string identifying the data (if None: all data of given type)
+        """
+        query = "DELETE FROM inventory WHERE scope = ?"
+        params = [self.scope]
+        if entity is not None:
+            query += " AND entity = ?"
+            params.append(entity)
+            if key is not None:
+                query += " AND key = ?"
+                params.append(str(key))
+
+        try:
+            with self._lock:
+                self._conn.execute(query, params)
+        except sqlite3.Error as err:
+            self.log.warning("Failed to drop %s '%s' from on-disk cache: %s", entity, key, err)
+
+    def purge(self):
+        """Remove all expired entries from the cache"""
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM inventory WHERE expires <= ?", (time.time(),))
+        except sqlite3.Error as err:
+            self.log.warning("Failed to purge expired entries from on-disk cache: %s", err)
+
+    def close(self):
+        """Close connection to the cache database"""
+        with self._lock:
+            self._conn.close()
+
+
+class OceanStorRestClient(RestClient):
+    def __init__(self, *args, **kwargs):
+        """Create client for OceanStor with given arguments"""
+        self.client = OceanStorClient(*args, **kwargs)
+
+
+class OceanStorOperationError(PosixOperationError):
+    pass
+
+
+class OceanStorOperations(PosixOperations, metaclass=Singleton):
+    def __init__(self, url, account, username, password, cache_dir=None, token_file=None):
+        """
+        Initialize REST client and request authentication token
+
+        @type url: string with URL of REST API, only scheme and FQDM of server is needed
+        @type account: string with name of account in OceanStor
+        @type username: string with username for the REST API
+        @type password: string with plain password for the REST API
+        @type cache_dir: string with path to directory of on-disk cache of inventory data
+                         (if None: disabled; see OCEANSTOR_CACHE_DIR for the default location)
+        @type token_file: string with path to file persisting the X-Auth-Token for reuse by other processes
+                          (if None: token is not persisted)
+        """
+        super().__init__()
+
+        # Optional on-disk cache shared with other processes
+        self.disk_cache = None
+        if cache_dir is not None:
+            try:
+                self.disk_cache = OceanStorInventoryCache(f"{url}|{account}", cache_dir=cache_dir)
+            except (OSError, sqlite3.Error) as err:
+                self.log.warning("On-disk cache in '%s' disabled, failed to open it: %s", cache_dir, err)
+
+        self.supportedfilesystems = ["nfs", "nfs4"]
+        self.ignorerealpathmismatch = True  # allow working through symlinks
+
+        self.oceanstor_storagepools = OceanStorCollection()
+        self.oceanstor_namespaces = OceanStorCollection()
+        self.oceanstor_account_namespaces = {}
+        self.oceanstor_buckets = {}
+        self.oceanstor_bucket_attrs = {}
+        self.oceanstor_filesystems = OceanStorCollection()
+        self.oceanstor_filesets = {}
+        self.oceanstor_fileset_paths = {}
+
+        self.storage_pool_index = OceanStorNameIndex(id_attr="storagePoolId", name_attr="storagePoolName")
+        self.namespace_index = OceanStorNameIndex()
+        self.filesystem_index = OceanStorNameIndex()
+        self.fileset_indexes = {}
+
+        self.oceanstor_quotas = {}
+        self.oceanstor_defaultquotas = {}
+        self.quota_types = Typ2Param
+        self._deferred_quota_refresh = None
+
+        self.oceanstor_nfsshares = {}
+        self.oceanstor_nfsclients = {}
+        self.oceanstor_nfsservers = set()
+
+        # Freshness of cached collections
+        self.cache_policy = dict(OCEANSTOR_CACHE_POLICY)
+        self._cache_times = {}
+        self._refresh_executor = None
+        self._refresh_pending = {}
+        self._refresh_lock = threading.Lock()
+        # Changes to cached collections from OceanStor, serialized with background refreshes
+        self._cache_lock = threading.RLock()
+        self._quota_changes = {}
+        self.dns_cache = {}
+
+        # Usage counters of cached collections
+        self.cache_stats = {}
+        self._cache_stats_lock = threading.Lock()
+
+        self.local_paths = {}
+        self.local_paths_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        self._mount_table_fingerprint = None
+        self.fileset_local_paths = None
+        self._fileset_local_paths_version = None
+
+        # Details of account and VSC configuration are loaded on first use
+        self.account_name = account
+        self._account = None
+        self._objapi_access = None
+        self._vsc = None
+        self._vsc_storage = None
+        self._lazy_lock = threading.RLock()
+
+        # OceanStor API URL
+        # Initialize REST client without user/password
+        self.log.info("URL of OceanStor REST API server: %s", url)
+        self.session = OceanStorRestClient(url)
+        # Get token for this session with user/password, renewed automatically
+        self.session.api.v2.client.login(username, password, token_file=token_file)
+
+    @property
+    def account(self):
+        """Details of account in OceanStor, requested on first use"""
+        if self._account is None:
+            with self._lazy_lock:
+                if self._account is None:
+                    self._account = self.get_account_info(self.account_name)
+        return self._account
+
+    @property
+    def objapi_access(self):
+        """Access of account to the object API in OceanStor, checked on first use"""
+        if self._objapi_access is None:
+            with self._lazy_lock:
+                if self._objapi_access is None:
+                    self._objapi_access = self._check_account_objapi_access()
+        return self._objapi_access
+
+    @property
+    def vsc(self):
+        """VSC object with options of this host, loaded on first use"""
+        if self._vsc is None:
+            with self._lazy_lock:
+                if self._vsc is None:
+                    vsc = VSC()
+                    vsc.get_vsc_options()
+                    self._vsc = vsc
+        return self._vsc
+
+    @property
+    def host_institute(self):
+        """Institute of this host"""
+        return self.vsc.options.options.host_institute
+
+    @property
+    def vsc_storage(self):
+        """List of VSC storage definitions in OceanStor of this host institute, parsed on first use"""
+        if self._vsc_storage is None:
+            with self._lazy_lock:
+                if self._vsc_storage is None:
+                    vsc_storage = VscStorage()
+                    self._vsc_storage = [
+                        stor
+                        for stor in vsc_storage[self.host_institute].values()
+                        if stor.backend == LOCAL_FS_OCEANSTOR
+                    ]
+        return self._vsc_storage
+
+    @property
+    def stats(self):
+        """Statistics of queries to the REST API of OceanStor per endpoint, see OceanStorQueryStats"""
+        return self.session.client.stats
+
+    def rate_limit_status(self):
+        """
+        Return status of rate limiters of queries to OceanStor per endpoint family
+        Includes current query rate, queries in flight and queries waiting in queue
+        """
+        return self.session.client.rate_limit_status()
+
+    def _load_disk_cache(self, entity, key, update=False, max_age=None):
+        """
+        Return tuple with data of given type and key from the on-disk cache and its age in seconds
+        Data older than max_age, or than the TTL of the collection in memory if max_age is None, is not used
+        Return (None, None) if missing, too old, disabled or on forced updates
+
+        @type update: bool to force an update skipping the on-disk cache
+        @type max_age: int with maximum age in seconds of cached data (if None: follow cache policy)
+        """
+        if self.disk_cache is None or update:
+            return None, None
+
+        if max_age is None:
+            max_age = self.cache_policy.get(entity, (None, None))[0]
+
+        value, age = self.disk_cache.get_entry(entity, key, max_age=max_age)
+        self._count_cache(entity, "disk_misses" if value is None else "disk_hits")
+
+        return value, age
+
+    def _save_disk_cache(self, entity, key, value, age=None):
+        """
+        Store data of given type and key in the on-disk cache (if enabled)
+
+        @type age: float with age in seconds of the data (if None: data is new)
+        """
+        if self.disk_cache is not None:
+            self.disk_cache.set(entity, key, value, age=age)
+
+    def _drop_disk_cache(self, entity, key=None):
+        """
+        Remove data of given type and key from the on-disk cache (if enabled)
+        """
+        if self.disk_cache is not None:
+            self.disk_cache.invalidate(entity, key)
+
+    def set_cache_policy(self, collection, ttl=None, max_stale=None):
+        """
+        Set freshness policy of a cached collection
+
+        @type collection: string with name of collection (see OCEANSTOR_CACHE_POLICY)
+        @type ttl: int with seconds that cached data is used as is (if None: cached data never expires)
+        @type max_stale: int with seconds after TTL that cached data is used while refreshed in the background
+        """
+        if collection not in self.cache_policy:
+            errmsg = f"Unknown cached collection '{collection}'. Use any of: {', '.join(self.cache_policy)}"
+            self.log.raiseException(errmsg, OceanStorOperationError)
+
+        self.cache_policy[collection] = (ttl, max_stale)
+
+    def _count_cache(self, collection, counter):
+        """Increase usage counter of given cached collection"""
+        with self._cache_stats_lock:
+            if collection not in self.cache_stats:
+                self.cache_stats[collection] = dict.fromkeys(OCEANSTOR_CACHE_COUNTERS, 0)
+            self.cache_stats[collection][counter] += 1
+
+    def _cache_collections(self):
+        """
+        Return dict with cached collections and the depth of their nested dicts up to the cached entries
+        """
+        return {
+            "storagepools": (self.oceanstor_storagepools, 1),
+            "namespaces": (self.oceanstor_namespaces, 1),
+            "account_namespaces": (self.oceanstor_account_namespaces, 2),
+            "buckets": (self.oceanstor_buckets, 2),
+            "bucket_attrs": (self.oceanstor_bucket_attrs, 1),
+            "filesystems": (self.oceanstor_filesystems, 1),
+            "filesets": (self.oceanstor_filesets, 2),
+            "fileset_paths": (self.oceanstor_fileset_paths, 2),
+            "quotas": (self.oceanstor_quotas, 3),
+            "defaultquotas": (self.oceanstor_defaultquotas, 3),
+            "nfsshares": (self.oceanstor_nfsshares, 2),
+            "nfsclients": (self.oceanstor_nfsclients, 2),
+            "nfsservers": (self.oceanstor_nfsservers, 1),
+            "dns": (self.dns_cache, 1),
+            "local_paths": (self.local_paths, 1),
+        }
+
+    @staticmethod
+    def _count_cache_entries(cache, depth):
+        """Return number of entries in a cache of nested dicts of given depth"""
+        if depth <= 1:
+            return len(cache)
+
+        return sum(OceanStorOperations._count_cache_entries(sub_cache, depth - 1) for sub_cache in cache.values())
+
+    def cache_report(self):
+        """
+        Return report of usage of cached data per collection
+        Counters of hits, misses and refreshes, hit ratio, number of entries and approximate size in bytes
+        """
+        with self._cache_stats_lock:
+            counters = {collection: dict(coll_stats) for collection, coll_stats in self.cache_stats.items()}
+
+        # identified local paths keep their own counters
+        local_paths_counters = counters.setdefault("local_paths", dict.fromkeys(OCEANSTOR_CACHE_COUNTERS, 0))
+        local_paths_counters["hits"] += self.local_paths_stats["hits"]
+        local_paths_counters["misses"] += self.local_paths_stats["misses"]
+
+        caches = self._cache_collections()
+
+        report = {}
+        for collection in sorted(set(caches) | set(counters)):
+            coll_report = dict.fromkeys(OCEANSTOR_CACHE_COUNTERS, 0)
+            coll_report.update(counters.get(collection, {}))
+
+            lookups = coll_report["hits"] + coll_report["misses"] + coll_report["refreshes"]
+            coll_report["hit_ratio"] = coll_report["hits"] / lookups if lookups else None
+
+            coll_report["entries"] = 0
+            coll_report["bytes"] = 0
+            if collection in caches:
+                cache, depth = caches[collection]
+                coll_report["entries"] = self._count_cache_entries(cache, depth)
+                coll_report["bytes"] = approx_sizeof(cache)
+
+            report[collection] = coll_report
+
+        return report
+
+    def reset_cache_stats(self):
+        """Reset usage counters of all cached collections"""
+        with self._cache_stats_lock:
+            self.cache_stats = {}
+
+    @contextmanager
+    def cache_profile(self, operation=None):
+        """
+        Context manager capturing the usage of cached data by the operations in its block
+        Yields a dict that is filled on exit with the change of usage counters per collection
+
+        @type operation: string with name of profiled operation used in the logs
+        """
+        with self._cache_stats_lock:
+            counters_start = {collection: dict(coll_stats) for collection, coll_stats in self.cache_stats.items()}
+        time_start = time.monotonic()
+
+        profile = {}
+        try:
+            yield profile
+        finally:
+            with self._cache_stats_lock:
+                for collection, coll_stats in self.cache_stats.items():
+                    coll_start = counters_start.get(collection, {})
+                    coll_profile = {counter: num - coll_start.get(counter, 0) for counter, num in coll_stats.items()}
+                    if any(coll_profile.values()):
+                        profile[collection] = coll_profile
+
+            elapsed = time.monotonic() - time_start
+            self.log.debug("Cache profile of %s (%.3f seconds): %s", operation or "operation", elapsed, profile)
+
+    def _mark_cached(self, collection, key, age=None):
+        """
+        Record time of last update of cached data in given collection and key
+
+        @type age: float with age in seconds of the cached data (if None: data is new)
+        """
+        self._cache_times[(collection, key)] = time.monotonic() - (age or 0)
+
+    def _cache_age(self, collection, key):
+        """Return age in seconds of cached data in given collection and key, None if unknown"""
+        cache_time = self._cache_times.get((collection, key))
+        if cache_time is None:
+            return None
+
+        return time.monotonic() - cache_time
 
+    def _swap_cached(self, attr, updates=None, removed=()):
+        """
+        Change entries of the cached collection held in given attribute
+        The collection is copied, changed and swapped in under the cache lock,
+        threads iterating the previous collection are not disturbed
 
-class OceanStorOperationError(PosixOperationError):
-    pass
+        @type attr: string with name of attribute holding the cached collection
+        @type updates: dict with new entries of the collection built by the caller
+        @type removed: iterable with keys of entries to remove from the collection
+        """
+        with self._cache_lock:
+            current = getattr(self, attr)
+            collection = type(current)(current)
+            collection.update(updates or {})
+            for key in removed:
+                collection.pop(key, None)
+            setattr(self, attr, collection)
+
+    def _use_cache(self, collection, key, cached, update=False, max_age=None):
+        """
+        Decide if cached data of given collection and key can be used
 
+        @type collection: string with name of collection
+        @type key: key of the cached data in the collection
+        @type cached: bool stating if the data is in cache
+        @type update: bool to force an update of cached data
+        @type max_age: int with maximum age in seconds of cached data (if None: follow policy of the collection)
 
-class OceanStorOperations(PosixOperations, metaclass=Singleton):
-    def __init__(self, url, account, username, password):
+        @returns: bool, True if cached data is fresh enough
         """
-        Initialize REST client and request authentication token
+        if not cached:
+            self._count_cache(collection, "misses")
+            return False
+
+        if update:
+            self._count_cache(collection, "refreshes")
+            return False
+
+        cache_time = self._cache_times.get((collection, key))
+        if cache_time is None:
+            # data added to cache by other means, consider it fresh
+            self._mark_cached(collection, key)
+            self._count_cache(collection, "hits")
+            return True
 
-        @type url: string with URL of REST API, only scheme and FQDM of server is needed
-        @type account: string with name of account in OceanStor
-        @type username: string with username for the REST API
-        @type password: string with plain password for the REST API
+        age = time.monotonic() - cache_time
+
+        if max_age is not None:
+            fresh = age <= max_age
+            self._count_cache(collection, "hits" if fresh else "refreshes")
+            return fresh
+
+        ttl, max_stale = self.cache_policy.get(collection, (None, None))
+        if ttl is None or age <= ttl:
+            self._count_cache(collection, "hits")
+            return True
+
+        if max_stale is not None and age <= ttl + max_stale:
+            # serve stale data and refresh it ahead of the next request
+            self._count_cache(collection, "hits")
+            self._count_cache(collection, "stale_hits")
+            self._refresh_ahead(collection, key)
+            return True
+
+        self.log.debug("Cached %s '%s' expired %.1f seconds ago", collection, key, age - ttl)
+        self._count_cache(collection, "refreshes")
+        return False
+
+    def _refresh_ahead(self, collection, key):
         """
-        super().__init__()
+        Refresh cached data of given collection and key in the background
+        Only one refresh per collection and key is queued at any time
+        """
+        refresh_funcs = {
+            "storagepools": lambda _: self.list_storage_pools(update=True),
+            "namespaces": lambda _: self.list_namespaces(update=True),
+            "buckets": lambda _: self.list_buckets(update=True),
+            "filesystems": lambda _: self.list_filesystems(update=True),
+            "filesets": lambda fs_name: self.list_filesets(devices=fs_name, update=True),
+            "nfsshares": lambda fs_name: self.list_nfs_shares(filesystemnames=fs_name, update=True),
+            "nfsclients": lambda ns_id: self.list_nfs_clients(nfs_share_id=ns_id, update=True),
+            "nfsservers": lambda _: self.list_nfs_servers(update=True),
+            "quotas": lambda fs_name: self.list_quota(devices=fs_name, update=True),
+        }
 
-        self.supportedfilesystems = ["nfs", "nfs4"]
-        self.ignorerealpathmismatch = True  # allow working through symlinks
+        def refresh():
+            try:
+                refresh_funcs[collection](key)
+            except Exception as err:  # pylint: disable=broad-except
+                self.log.warning("Background refresh of %s '%s' failed: %s", collection, key, err)
+            else:
+                self.log.debug("Background refresh of %s '%s' completed", collection, key)
+            finally:
+                with self._refresh_lock:
+                    self._refresh_pending.pop((collection, key), None)
 
-        self.oceanstor_storagepools = {}
-        self.oceanstor_namespaces = {}
-        self.oceanstor_account_namespaces = {}
-        self.oceanstor_buckets = {}
-        self.oceanstor_filesystems = {}
-        self.oceanstor_filesets = {}
+        with self._refresh_lock:
+            if (collection, key) in self._refresh_pending:
+                return
 
-        self.oceanstor_quotas = {}
-        self.oceanstor_defaultquotas = {}
-        self.quota_types = Typ2Param
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="oceanstor-refresh")
 
-        self.oceanstor_nfsshares = {}
-        self.oceanstor_nfsclients = {}
-        self.oceanstor_nfsservers = {}
+            self.log.debug("Refreshing stale %s '%s' in the background", collection, key)
+            self._refresh_pending[(collection, key)] = self._refresh_executor.submit(refresh)
 
-        self.vsc = VSC()
-        self.vsc.get_vsc_options()
-        self.host_institute = self.vsc.options.options.host_institute
+    def wait_for_refresh(self, timeout=None):
+        """
+        Wait for completion of all pending background refreshes of cached data
 
-        vsc_storage = VscStorage()
-        self.vsc_storage = [
-            stor for stor in vsc_storage[self.host_institute].values() if stor.backend == LOCAL_FS_OCEANSTOR
-        ]
+        @type timeout: maximum number of seconds to wait for each refresh
+        """
+        with self._refresh_lock:
+            pending = list(self._refresh_pending.values())
 
-        # OceanStor API URL
-        # Initialize REST client without user/password
-        self.log.info("URL of OceanStor REST API server: %s", url)
-        self.session = OceanStorRestClient(url)
-        # Get token for this session with user/password
-        self.session.api.v2.client.get_x_auth_token(username, password)
-        # Account details
-        self.account = self.get_account_info(account)
-        self.objapi_access = self._check_account_objapi_access()
+        for future in pending:
+            future.result(timeout=timeout)
 
     def get_account_info(self, account_name):
         """
         Query the details of an account by name
         """
+        ostor_account, _ = self._load_disk_cache("accounts", account_name)
+        if ostor_account is not None:
+            return ostor_account
 
         filter_json = [{"name": account_name}]
         filter_json = json.dumps(filter_json, separators=OCEANSTOR_JSON_SEP)
@@ -339,6 +2389,8 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
             errmsg = f"OceanStor account not found: {account_name}"
             self.log.raiseException(errmsg, OceanStorOperationError)
 
+        self._save_disk_cache("accounts", account_name, ostor_account)
+
         return ostor_account
 
     def list_active_accounts(self):
@@ -346,9 +2398,27 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         Query active accounts
         Return list of tuples with name and ID of active account
         """
+        active_accounts, _ = self._load_disk_cache("accounts", "active")
+        if active_accounts is not None:
+            return [tuple(acc) for acc in active_accounts]
+
         _, response = self.session.api.v2.account.accounts.get(pagination=True)
+        active_accounts = [(acc["name"], acc["id"]) for acc in response["data"] if acc["status"] == "Active"]
 
-        return [(acc["name"], acc["id"]) for acc in response["data"] if acc["status"] == "Active"]
+        self._save_disk_cache("accounts", "active", active_accounts)
+
+        return active_accounts
+
+    def iter_active_accounts(self):
+        """
+        Query active accounts page by page
+        Generator of tuples with name and ID of active account
+        """
+        accounts = self.session.api.v2.account.accounts.get(pagination=True, stream=True)
+
+        for acc in accounts:
+            if acc["status"] == "Active":
+                yield (acc["name"], acc["id"])
 
     def _validate_accounts(self, accounts):
         """
@@ -386,10 +2456,12 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         return objapi_access
 
-    def list_storage_pools(self, update=False):
+    def list_storage_pools(self, update=False, max_age=None):
         """
         List available storage pools in OceanStor
 
+        @type max_age: int with maximum age in seconds of cached data (if None: follow cache policy)
+
         Set self.oceanstor_storagepools as dict with
         : keys per storagePoolName and value is dict with
         :: keys returned by OceanStor:
@@ -416,23 +2488,27 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         - encryptType
         - supportEncryptForMainStorageMedia
         """
-        if not update and self.oceanstor_storagepools:
+        if self._use_cache("storagepools", "all", bool(self.oceanstor_storagepools), update, max_age):
             return self.oceanstor_storagepools
 
-        # Request storage pools
-        _, response = self.session.api.v2.data_service.storagepool.get()
+        cached_storage_pools, cached_age = self._load_disk_cache("storagepools", "all", update, max_age)
+        if cached_storage_pools is None:
+            # Request storage pools
+            _, response = self.session.api.v2.data_service.storagepool.get()
+            cached_storage_pools = response["storagePools"]
+            self._save_disk_cache("storagepools", "all", cached_storage_pools)
 
         # Organize in a dict by storage pool name
-        storage_pools = {}
-        for sp in response["storagePools"]:
-            storage_pools.update({sp["storagePoolName"]: sp})
+        storage_pools = OceanStorCollection((sp["storagePoolName"], sp) for sp in cached_storage_pools)
 
         if len(storage_pools) == 0:
             self.log.raiseException("No storage pools found in OceanStor", OceanStorOperationError)
         else:
             self.log.debug("Storage pools in OceanStor: %s", ", ".join(storage_pools))
 
-        self.oceanstor_storagepools = storage_pools
+        with self._cache_lock:
+            self.oceanstor_storagepools = storage_pools
+        self._mark_cached("storagepools", "all", age=cached_age)
         return storage_pools
 
     def select_storage_pools(self, sp_names, byid=False):
@@ -458,16 +2534,18 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         # Convert names to IDs
         if byid:
-            sp_select = [storage_pools[sp]["storagePoolId"] for sp in sp_select]
+            sp_index = self.storage_pool_index.sync(storage_pools)
+            sp_select = [sp_index.get_id(sp) for sp in sp_select]
 
         return sp_select
 
-    def list_namespaces(self, pool=None, account=None, update=False):
+    def list_namespaces(self, pool=None, account=None, update=False, max_age=None):
         """
         List namespaces in given storage pool and owned by given accounts
 
         @type pool: list of storage pools names (if string: 1 storage pool; if None or all: all known ones)
         @type account: list of owner account names (if string: 1 storage pool; if None or all: all known ones)
+        @type max_age: int with maximum age in seconds of cached data (if None: follow cache policy)
 
         Set self.oceanstor_namespaces as dict with
         : keys per namespaceName and value is dict with
@@ -494,24 +2572,33 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         namespaces = {}
         for acc_id in filter_acc:
-            if not update and acc_id in self.oceanstor_account_namespaces:
+            if self._use_cache("namespaces", acc_id, acc_id in self.oceanstor_account_namespaces, update, max_age):
                 # Use cached namespace data
                 dbg_prefix = "(cached) "
                 namespaces[acc_id] = self.oceanstor_account_namespaces[acc_id]
             else:
                 # Request namespace data
                 dbg_prefix = ""
-                # Query namespaces in all pools for this account
-                filter_json = [{"account_id": str(acc_id)}]
-                filter_json = json.dumps(filter_json, separators=OCEANSTOR_JSON_SEP)
-                _, response = self.session.api.v2.converged_service.namespaces.get(filter=filter_json)
-                # Save selection of attributes for this namespace
-                account_namespaces = {ns["name"]: {attr: ns[attr] for attr in ns_attrs} for ns in response["data"]}
+                cached_namespaces, cached_age = self._load_disk_cache("namespaces", acc_id, update, max_age)
+                if cached_namespaces is None:
+                    # Query namespaces in all pools for this account
+                    filter_json = [{"account_id": str(acc_id)}]
+                    filter_json = json.dumps(filter_json, separators=OCEANSTOR_JSON_SEP)
+                    _, response = self.session.api.v2.converged_service.namespaces.get(filter=filter_json)
+                    # Save selection of attributes for this namespace
+                    cached_namespaces = [{attr: ns[attr] for attr in ns_attrs} for ns in response["data"]]
+                    self._save_disk_cache("namespaces", acc_id, cached_namespaces)
+                account_namespaces = {ns["name"]: ns for ns in cached_namespaces}
                 namespaces[acc_id] = account_namespaces
 
                 # Update caches of namespaces with this account
-                self.oceanstor_account_namespaces[acc_id] = namespaces[acc_id]
-                self.oceanstor_namespaces.update(account_namespaces)
+                with self._cache_lock:
+                    self._swap_cached("oceanstor_account_namespaces", {acc_id: account_namespaces})
+                    all_namespaces = OceanStorCollection()
+                    for acc_ns in self.oceanstor_account_namespaces.values():
+                        all_namespaces.update(acc_ns)
+                    self.oceanstor_namespaces = all_namespaces
+                self._mark_cached("namespaces", acc_id, age=cached_age)
 
         # Filter on storage pools
         # Support special case 'all' for downstream compatibility
@@ -555,29 +2642,59 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         @returns: boolean corresponding to the bucket attribute. None if undetermined due to permissions.
         """
+        return self._are_buckets([namespace])[namespace]
+
+    def _are_buckets(self, namespaces):
+        """
+        Check if namespaces are buckets in OceanStor
+        The bucket attribute of a namespace never changes, it is cached by namespace ID
+        Uncached namespaces are checked concurrently
+
+        @type namespaces: list of namespace names
+
+        @returns: dict with bucket attribute of each namespace. None if undetermined due to permissions.
+        """
         self.list_namespaces()
 
-        if namespace not in self.oceanstor_namespaces:
-            errmsg = f"OceanStor has no information for namespace: {namespace}"
-            self.log.raiseException(errmsg, OceanStorOperationError)
+        for namespace in namespaces:
+            if namespace not in self.oceanstor_namespaces:
+                errmsg = f"OceanStor has no information for namespace: {namespace}"
+                self.log.raiseException(errmsg, OceanStorOperationError)
+
+        if not self.objapi_access:
+            # No permissions to determine bucket attribute of namespaces
+            return {namespace: None for namespace in namespaces}
+
+        ns_index = self.namespace_index.sync(self.oceanstor_namespaces)
+        ns_ids = {namespace: ns_index.get_id(namespace) for namespace in namespaces}
+        uncached = [ns for ns in namespaces if ns_ids[ns] not in self.oceanstor_bucket_attrs]
+
+        if uncached:
+            bucket_attrs = parallel_map(self._query_bucket_exists, uncached)
+            self._swap_cached(
+                "oceanstor_bucket_attrs", {ns_ids[ns]: attr for ns, attr in zip(uncached, bucket_attrs)}
+            )
+            self.log.debug("Bucket attribute of namespaces determined for: %s", ", ".join(uncached))
 
+        return {namespace: self.oceanstor_bucket_attrs[ns_ids[namespace]] for namespace in namespaces}
+
+    def _query_bucket_exists(self, namespace):
+        """
+        Query bucket attribute of given namespace to the object API of OceanStor
+        """
         query_params = {
             "name": namespace,
         }
 
-        if not self.objapi_access:
-            # No permissions to determine bucket attribute of namespaces
-            return None
-
         try:
-            _, result = self.session.dfv.service.obsOSC.bucket_exists.post(body=query_params)
+            _, result = self.session.dfv.service.obsOSC.bucket_exists.post(body=query_params, idempotent=True)
         except RuntimeError as err:
             errmsg = getattr(err, "message", str(err))
             self.log.raiseException(errmsg, OceanStorOperationError)
 
         return result["data"]["bucket_exists"]
 
-    def list_buckets(self, pool=None, account=None, update=False):
+    def list_buckets(self, pool=None, account=None, update=False, max_age=None):
         """
         List buckets in OceanStor
         - Buckets are namespaces in OceanStor
@@ -585,6 +2702,7 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         @type pool: list of storage pools names (if string: 1 storage pool; if None or all: all known ones)
         @type account: list of owner account names (if string: 1 storage pool; if None or all: all known ones)
+        @type max_age: int with maximum age in seconds of cached data (if None: follow cache policy)
 
         Set self.oceanstor_buckets as dict with
         : keys per accountName and value is dict with
@@ -601,24 +2719,26 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         buckets = {}
         for acc_id in active_acc:
-            if not update and acc_id in self.oceanstor_buckets:
+            if self._use_cache("buckets", acc_id, acc_id in self.oceanstor_buckets, update, max_age):
                 # Use cached namespace data
                 dbg_prefix = "(cached) "
                 buckets[acc_id] = self.oceanstor_buckets[acc_id]
             else:
                 # Seek buckets in namespace data
                 dbg_prefix = ""
+                bucket_attrs = self._are_buckets(list(acc_namespaces[acc_id]))
                 buckets[acc_id] = {
-                    ns["name"]: ns for ns in acc_namespaces[acc_id].values() if self._is_bucket(ns["name"])
+                    ns["name"]: ns for ns in acc_namespaces[acc_id].values() if bucket_attrs[ns["name"]]
                 }
                 # Update cache of namespaces with this account
-                self.oceanstor_buckets[acc_id] = buckets[acc_id]
+                self._swap_cached("oceanstor_buckets", {acc_id: buckets[acc_id]})
+                self._mark_cached("buckets", acc_id)
 
         self.log.debug("%sBuckets in OceanStor: %s", dbg_prefix, ", ".join(buckets))
 
         return buckets
 
-    def list_filesystems(self, device=None, pool=None, update=False):
+    def list_filesystems(self, device=None, pool=None, update=False, max_age=None):
         """
         List filesystems in OceanStor owned by our account
         - Filesystems are namespaces in OceanStor
@@ -627,6 +2747,7 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         @type device: list of filesystem names (if string: 1 filesystem, if None or all: all known ones)
         @type pool: list of storage pools names (if string: 1 storage pool; if None or all: all known ones)
+        @type max_age: int with maximum age in seconds of cached data (if None: follow cache policy)
 
         Set self.oceanstor_filesystems as dict with
         : keys per filesystemName and value is dict with
@@ -636,18 +2757,25 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         - storage_pool_id
         - account_id
         """
-        if not update and self.oceanstor_filesystems:
+        if self._use_cache("filesystems", "all", bool(self.oceanstor_filesystems), update, max_age):
             # Use cached filesystems data
             dbg_prefix = "(cached) "
         else:
             # Update filesystems from namespaces data
             dbg_prefix = ""
-            acc_namespaces = self.list_namespaces(pool=pool, account=self.account["name"], update=update)
-            # Select filesystems from namespace list
-            # note: in case of not enough permissions to check bucket attribute, assume namespace is a filesystem
-            acc_filesystem_names = [ns for ns in acc_namespaces[self.account["id"]] if not self._is_bucket(ns)]
-            acc_filesystems = {fs: acc_namespaces[self.account["id"]][fs] for fs in acc_filesystem_names}
-            self.oceanstor_filesystems = acc_filesystems
+            cached_filesystems, cached_age = self._load_disk_cache("filesystems", "all", update, max_age)
+            if cached_filesystems is None:
+                acc_namespaces = self.list_namespaces(pool=pool, account=self.account["name"], update=update)
+                # Select filesystems from namespace list
+                # note: in case of not enough permissions to check bucket attribute, assume namespace is a filesystem
+                bucket_attrs = self._are_buckets(list(acc_namespaces[self.account["id"]]))
+                acc_filesystem_names = [ns for ns in acc_namespaces[self.account["id"]] if not bucket_attrs[ns]]
+                cached_filesystems = [acc_namespaces[self.account["id"]][fs] for fs in acc_filesystem_names]
+                self._save_disk_cache("filesystems", "all", cached_filesystems)
+            filesystems = OceanStorCollection((fs["name"], fs) for fs in cached_filesystems)
+            with self._cache_lock:
+                self.oceanstor_filesystems = filesystems
+            self._mark_cached("filesystems", "all", age=cached_age)
 
         filesystems = self.oceanstor_filesystems
 
@@ -696,10 +2824,9 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
                 self.log.raiseException(f"Malformed list of filesystem IDs: {comma_sep_ids}", ValueError)
             else:
                 # Convert known IDs to names
+                fs_index = self.filesystem_index.sync(filesystems)
                 for n, fs_id in enumerate(target_filesystems_id):
-                    fs_name = [fs for fs in filesystems if filesystems[fs]["id"] == fs_id]
-                    if fs_name:
-                        target_filesystems[n] = fs_name[0]
+                    target_filesystems[n] = fs_index.get_name(fs_id, default=target_filesystems[n])
 
             self.log.debug("Converted filesystem IDs to filesystem names: %s", ", ".join(target_filesystems))
 
@@ -737,7 +2864,7 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
             self.log.raiseException(errmsg, OceanStorOperationError)
             return None
 
-    def list_filesets(self, devices=None, filesetnames=None, pool=None, update=False):
+    def list_filesets(self, devices=None, filesetnames=None, pool=None, update=False, details="eager", max_age=None):
         """
         Get all dtree filesets in given devices and given filesystems
         Filter reported results by name of filesystem
@@ -746,6 +2873,11 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         @type devices: list of filesystem names (if string: 1 filesystem, if None: all known ones)
         @type filesetnames: list of fileset names (if string: 1 fileset, if None: all known ones)
         @type pool: list of storage pools names (if string: 1 storage pool; if None: all known ones)
+        @type details: string with resolution mode of dtree details (i.e. parent_dir):
+                       'eager' to request them concurrently for all filesets,
+                       'lazy' to request them on first access to 'parent_dir' of each fileset,
+                       'skip' to not request them at all
+        @type max_age: int with maximum age in seconds of cached data (if None: follow cache policy)
 
         Set self.oceanstor_filesets as dict with
         : keys per parent filesystemName and value is dict with
@@ -760,6 +2892,10 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         - unix_mode
         """
 
+        if details not in OCEANSTOR_DTREE_DETAIL_MODES:
+            errmsg = f"Unknown resolution mode of dtree details '{details}'. Use any of: {OCEANSTOR_DTREE_DETAIL_MODES}"
+            self.log.raiseException(errmsg, OceanStorOperationError)
+
         # Filter by filesystem name (device in GPFS) in target storage pool
         if devices is None:
             filesystems = self.list_filesystems(pool=pool, update=update)
@@ -770,25 +2906,43 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         dtree_filesets = {}
         for fs_name in filter_fs:
-            if not update and fs_name in self.oceanstor_filesets:
+            fetched = False
+            refreshed = False
+            cached_age = None
+            if self._use_cache("filesets", fs_name, fs_name in self.oceanstor_filesets, update, max_age):
                 # Use cached dtree fileset data and filter by filesystem name
                 dbg_prefix = "(cached) "
                 dtree_filesets[fs_name] = self.oceanstor_filesets[fs_name]
             else:
                 # Request dtree filesets
                 dbg_prefix = ""
-                # query dtrees in this filesystem
-                _, response = self.session.api.v2.file_service.dtrees.get(file_system_name=fs_name)
-                fs_dtree = {dt["id"]: dt for dt in response["data"]}
-                # query each individual fileset by ID (fsId@dtreeId) to get its parent directory
-                for dt_id in fs_dtree:
-                    _, dt_response = self.session.api.v2.file_service.dtrees.get(id=dt_id)
-                    fs_dtree[dt_id]["parent_dir"] = dt_response["data"]["parent_dir"]
-
-                dtree_filesets[fs_name] = fs_dtree
-
-                # Update cache of dtree filesets in the selected filesystem
-                self.oceanstor_filesets[fs_name] = fs_dtree
+                refreshed = True
+                cached_dtrees, cached_age = self._load_disk_cache("filesets", fs_name, update, max_age)
+                if cached_dtrees is None:
+                    # query dtrees in this filesystem
+                    _, response = self.session.api.v2.file_service.dtrees.get(file_system_name=fs_name)
+                    cached_dtrees = response["data"]
+                    fetched = True
+                dtree_filesets[fs_name] = OceanStorCollection((dt["id"], OceanStorDtree(dt)) for dt in cached_dtrees)
+
+            # cached filesets might lack details from previous queries in other modes
+            listed_dtree = dtree_filesets[fs_name]
+            fs_dtree, resolved_details = self._resolve_dtree_details(listed_dtree, details=details)
+            dtree_filesets[fs_name] = fs_dtree
+
+            with self._cache_lock:
+                if refreshed:
+                    # Update cache of dtree filesets in the selected filesystem once their details are resolved
+                    self._swap_cached("oceanstor_filesets", {fs_name: fs_dtree})
+                    self._mark_cached("filesets", fs_name, age=cached_age)
+                elif fs_dtree is not listed_dtree and self.oceanstor_filesets.get(fs_name) is listed_dtree:
+                    # cached dtree filesets with new details, unless cached ones were replaced meanwhile
+                    self._swap_cached("oceanstor_filesets", {fs_name: fs_dtree})
+
+            if fetched or resolved_details:
+                # store filesets with all their resolved details, keeping the age of the listing of dtrees
+                fs_dtrees = [dict(dt) for dt in dtree_filesets[fs_name].values()]
+                self._save_disk_cache("filesets", fs_name, fs_dtrees, age=self._cache_age("filesets", fs_name))
 
             dt_names = [dt["name"] for dt in dtree_filesets[fs_name].values()]
             self.log.debug(
@@ -819,6 +2973,87 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         return dtree_filesets
 
+    def _resolve_dtree_details(self, fs_dtree, details="eager"):
+        """
+        Add missing details to dtree filesets
+        Details of each dtree fileset are requested individually by ID (fsId@dtreeId)
+
+        @type fs_dtree: dict with dtree filesets in a filesystem (keys per dtree fileset ID)
+        @type details: string with resolution mode of dtree details: 'eager', 'lazy' or 'skip'
+
+        @returns: tuple with collection of dtree filesets and number of dtree filesets whose details were resolved
+                  (given collection is left untouched, a new one is returned if any dtree fileset changed)
+        """
+        # check raw membership, membership tests on lazy dtrees would resolve their details one by one
+        missing = [dt_id for dt_id, dt in fs_dtree.items() if not dict.__contains__(dt, "parent_dir")]
+
+        if not missing or details == "skip":
+            return fs_dtree, 0
+
+        if details == "lazy":
+            # defer queries to first access of details, dtrees already pending resolution are kept as is
+            unresolved = [dt_id for dt_id in missing if getattr(fs_dtree[dt_id], "resolver", None) is None]
+            if not unresolved:
+                return fs_dtree, 0
+
+            lazy_dtree = OceanStorCollection(fs_dtree)
+            for dt_id in unresolved:
+                lazy_dtree[dt_id] = OceanStorDtree(fs_dtree[dt_id], resolver=self._get_dtree_details)
+            self.log.debug("Details of %s dtree filesets will be resolved on first access", len(unresolved))
+            return lazy_dtree, 0
+
+        # query all missing details concurrently, including those of dtrees pending lazy resolution
+        dt_details = parallel_map(self._get_dtree_details, missing)
+        resolved_dtree = OceanStorCollection(fs_dtree)
+        for dt_id, dt_detail in zip(missing, dt_details):
+            resolved_dtree[dt_id] = OceanStorDtree(fs_dtree[dt_id], **dt_detail)
+        self.log.debug("Resolved details of %s dtree filesets", len(missing))
+
+        return resolved_dtree, len(missing)
+
+    def _get_dtree_details(self, dt_id):
+        """
+        Query details of dtree fileset by ID (fsId@dtreeId) missing in listings of dtrees
+        Return dict with the missing details
+        """
+        _, dt_response = self.session.api.v2.file_service.dtrees.get(id=dt_id)
+
+        return {"parent_dir": dt_response["data"]["parent_dir"]}
+
+    def _get_fileset_index(self, filesystem_name):
+        """
+        Return index between names and IDs of dtree filesets in given filesystem
+        Index is rebuilt if the cached dtree filesets of the filesystem changed
+
+        @type filesystem_name: string with the name of an existing filesystem
+        """
+        fs_dtree = self.list_filesets(devices=filesystem_name)[filesystem_name]
+        fileset_index = self.fileset_indexes.setdefault(filesystem_name, OceanStorNameIndex())
+
+        return fileset_index.sync(fs_dtree)
+
+    def _get_fileset_trie(self, filesystem_name):
+        """
+        Return prefix tree of paths of dtree filesets in given filesystem
+        Tree is rebuilt if the cached dtree filesets of the filesystem changed
+
+        @type filesystem_name: string with the name of an existing filesystem
+        """
+        fs_dtree = self.list_filesets(devices=filesystem_name)[filesystem_name]
+
+        fileset_trie = self.oceanstor_fileset_paths.get(filesystem_name)
+        if (
+            fileset_trie is None
+            or fileset_trie.source is not fs_dtree
+            or fileset_trie.version != collection_version(fs_dtree)
+        ):
+            # paths of filesets are needed from all dtrees, listed above with their details resolved eagerly
+            fileset_trie = OceanStorPathTrie(fs_dtree)
+            self._swap_cached("oceanstor_fileset_paths", {filesystem_name: fileset_trie})
+            self.log.debug("Indexed paths of %s dtree filesets in filesystem '%s'", len(fileset_trie), filesystem_name)
+
+        return fileset_trie
+
     def get_fileset_info(self, filesystem_name, fileset_name):
         """
         Get all the relevant information for a given VSC fileset.
@@ -843,11 +3078,11 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
             vsc_name_match, ostor_name_sub = banned_fs[0]
             fileset_name = vsc_name_match.sub(ostor_name_sub, fileset_name)
 
-        for fset in filesystem_fsets.values():
-            if fset["name"] == fileset_name:
-                return fset
+        fset_id = self._get_fileset_index(filesystem_name).get_id(fileset_name)
+        if fset_id is None:
+            return None
 
-        return None
+        return filesystem_fsets[fset_id]
 
     def get_fileset_name(self, fileset_id, filesystem_name):
         """
@@ -920,12 +3155,13 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         return owner_id
 
-    def list_nfs_shares(self, filesystemnames=None, update=False):
+    def list_nfs_shares(self, filesystemnames=None, update=False, max_age=None):
         """
         Get all NFS shares in given filesystems
         Filter reported results by name of filesystem
 
         @type filesystemnames: list of filesystem names (if string: 1 filesystem; if None: all known filesystems)
+        @type max_age: int with maximum age in seconds of cached data (if None: follow cache policy)
 
         Set self.oceanstor_nfsshares as dict with
         : keys per filesystem name and value is dict with
@@ -950,7 +3186,7 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         nfs_shares = {}
         for fs_name, fs_id in filter_fs.items():
-            if not update and fs_name in self.oceanstor_nfsshares:
+            if self._use_cache("nfsshares", fs_name, fs_name in self.oceanstor_nfsshares, update, max_age):
                 # Use cached data
                 dbg_prefix = "(cached) "
                 nfs_shares[fs_name] = self.oceanstor_nfsshares[fs_name]
@@ -963,25 +3199,34 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
                     "account_name": self.account["name"],
                     "filter": filter_json,
                 }
-                _, response = self.session.api.v2.nas_protocol.nfs_share_list.get(**query_params)
-                fs_nfs_shares = {ns["id"]: ns for ns in response["data"]}
+                cached_nfs_shares, cached_age = self._load_disk_cache("nfsshares", fs_name, update, max_age)
+                if cached_nfs_shares is None:
+                    _, response = self.session.api.v2.nas_protocol.nfs_share_list.get(**query_params)
+                    cached_nfs_shares = response["data"]
+                    self._save_disk_cache("nfsshares", fs_name, cached_nfs_shares)
+                fs_nfs_shares = {ns["id"]: ns for ns in cached_nfs_shares}
                 nfs_shares[fs_name] = fs_nfs_shares
 
                 # Update cache of NFS shares in selected filesystem
-                self.oceanstor_nfsshares[fs_name] = fs_nfs_shares
+                self._swap_cached("oceanstor_nfsshares", {fs_name: fs_nfs_shares})
+                self._mark_cached("nfsshares", fs_name, age=cached_age)
 
             nfs_desc = [f"'{ns['description']}'" for ns in nfs_shares[fs_name].values()]
             self.log.debug("%sNFS shares in OceanStor filesystem '%s': %s", dbg_prefix, fs_name, ", ".join(nfs_desc))
 
         return nfs_shares
 
-    def list_nfs_clients(self, nfs_share_id=None, filesystemnames=None, update=False):
+    def list_nfs_clients(self, nfs_share_id=None, filesystemnames=None, update=False, max_age=None, bulk=None):
         """
         Get NFS clients for all or certain NFS shares
         Filter reported results by ID of NFS shares and/or name of filesystem
+        Clients of many NFS shares are requested in bulk for the whole account, otherwise concurrently per share
 
         @type nfs_share_id: list of integers with IDs of NFS shares (if int: 1 NFS share; if None: all NFS shares)
         @type filesystemnames: list of filesystem names (if string: 1 filesystem; if None: all known filesystems)
+        @type max_age: int with maximum age in seconds of cached data (if None: follow cache policy)
+        @type bulk: bool to request NFS clients in bulk for the whole account
+                    (if None: bulk if at least OCEANSTOR_NFS_BULK_THRESHOLD NFS shares are requested)
 
         Set self.oceanstor_nfsclients as dict with
         : keys per NFS share ID and value is dict with
@@ -1002,11 +3247,12 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         # NFS shares in given filesystems
         nfs_shares = self.list_nfs_shares(filesystemnames=filesystemnames, update=update)
-        nfs_id_pool = [nfs_shares[fs][ns]["id"] for fs in nfs_shares for ns in nfs_shares[fs]]
+        nfs_id_list = [nfs_shares[fs][ns]["id"] for fs in nfs_shares for ns in nfs_shares[fs]]
+        nfs_id_pool = set(nfs_id_list)
 
         # Filter by NFS share ID
         if nfs_share_id is None:
-            filter_ns = nfs_id_pool
+            filter_ns = nfs_id_list
         else:
             if not isinstance(nfs_share_id, list):
                 nfs_share_id = [nfs_share_id]
@@ -1015,39 +3261,387 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         self.log.debug("Seeking NFS clients for NFS shares: %s", ", ".join(str(i) for i in filter_ns))
 
         nfs_clients = {}
+        request_ns = []
         for ns_id in filter_ns:
-            if not update and ns_id in self.oceanstor_nfsclients:
+            if self._use_cache("nfsclients", ns_id, ns_id in self.oceanstor_nfsclients, update, max_age):
                 # Use cached data
-                dbg_prefix = "(cached) "
                 nfs_clients[ns_id] = self.oceanstor_nfsclients[ns_id]
+                nc_access_name = [f"'{nc['access_name']}'" for nc in nfs_clients[ns_id].values()]
+                self.log.debug(
+                    "(cached) NFS clients for OceanStor NFS share ID '%s': %s", ns_id, ", ".join(nc_access_name)
+                )
             else:
-                # Request NFS clients for this share
-                dbg_prefix = ""
-                filter_json = [{"share_id": str(ns_id)}]
-                filter_json = json.dumps(filter_json, separators=OCEANSTOR_JSON_SEP)
-                query_params = {
-                    "account_name": self.account["name"],
-                    "filter": filter_json,
-                }
-                _, response = self.session.api.v2.nas_protocol.nfs_share_auth_client_list.get(**query_params)
-                share_client = {nc["id"]: nc for nc in response["data"]}
-                nfs_clients[ns_id] = share_client
+                request_ns.append(ns_id)
+
+        if not request_ns:
+            return nfs_clients
+
+        if bulk is None:
+            bulk = len(request_ns) >= OCEANSTOR_NFS_BULK_THRESHOLD
+
+        share_clients = None
+        if bulk:
+            try:
+                share_clients = self._query_account_nfs_clients(nfs_id_pool)
+            except (HTTPError, RuntimeError) as err:
+                self.log.warning("Bulk request of NFS clients failed, requesting them per NFS share: %s", err)
+
+        if share_clients is None:
+            # Request NFS clients of each share concurrently
+            share_clients = dict(zip(request_ns, parallel_map(self._query_nfs_share_clients, request_ns)))
 
-                # Update cache of NFS clients in selected share
-                self.oceanstor_nfsclients[ns_id] = share_client
+        # Update cache of NFS clients in requested shares
+        self._swap_cached("oceanstor_nfsclients", share_clients)
+        for ns_id in share_clients:
+            self._mark_cached("nfsclients", ns_id)
 
+        for ns_id in request_ns:
+            nfs_clients[ns_id] = share_clients[ns_id]
             nc_access_name = [f"'{nc['access_name']}'" for nc in nfs_clients[ns_id].values()]
-            self.log.debug(
-                "%sNFS clients for OceanStor NFS share ID '%s': %s", dbg_prefix, ns_id, ", ".join(nc_access_name)
-            )
+            self.log.debug("NFS clients for OceanStor NFS share ID '%s': %s", ns_id, ", ".join(nc_access_name))
 
         return nfs_clients
 
-    def list_nfs_servers(self, update=False):
+    def _query_nfs_share_clients(self, nfs_share_id):
+        """
+        Request NFS clients of a single NFS share
+        Return dict with NFS clients keyed by their ID
+
+        @type nfs_share_id: string with ID of NFS share
+        """
+        filter_json = [{"share_id": str(nfs_share_id)}]
+        filter_json = json.dumps(filter_json, separators=OCEANSTOR_JSON_SEP)
+        query_params = {
+            "account_name": self.account["name"],
+            "filter": filter_json,
+        }
+        _, response = self.session.api.v2.nas_protocol.nfs_share_auth_client_list.get(**query_params)
+
+        return {nc["id"]: nc for nc in response["data"]}
+
+    def _query_account_nfs_clients(self, nfs_share_ids):
+        """
+        Request NFS clients of all NFS shares in the account with a paginated query
+        Return dict with NFS clients of given NFS shares keyed by share ID and client ID
+
+        @type nfs_share_ids: set of strings with IDs of NFS shares
+        """
+        query_params = {
+            "account_name": self.account["name"],
+        }
+        _, response = self.session.api.v2.nas_protocol.nfs_share_auth_client_list.get(
+            pagination=True, workers=OCEANSTOR_MAX_WORKERS, **query_params
+        )
+
+        share_clients = {ns_id: {} for ns_id in nfs_share_ids}
+        for nfs_client in response["data"]:
+            ns_id = str(nfs_client["share_id"])
+            if ns_id in share_clients:
+                share_clients[ns_id][nfs_client["id"]] = nfs_client
+
+        self.log.debug("Bulk request of NFS clients in account: %s clients", len(response["data"]))
+
+        return share_clients
+
+    def sync_nfs_exports(self, desired, prune=False):
+        """
+        Synchronise NFS shares and their clients in OceanStor with the given desired state
+        Only the shares and clients that differ from the cached ones are created, updated or deleted
+        New shares are created first, then all changes of clients are sent concurrently
+
+        @type desired: iterable of tuples with (filesystem_name, fileset_name, clients)
+            filesystem_name: string with name of filesystem in OceanStor
+            fileset_name: string with name of dtree fileset exported by the NFS share
+            clients: dict of NFS clients keyed by access name (host, IP or network) with dicts of options
+                     (missing options take their value from OCEANSTOR_NFS_CLIENT_DEFAULTS)
+        @type prune: bool to delete NFS shares of dtrees in the given filesystems that are not in the desired state
+
+        @returns: list of dicts with the report of each share and client: filesystem, fileset, share_id, client,
+                  action and status
+            action: 'create_share', 'delete_share', 'create_client', 'update_client', 'delete_client' or 'noop'
+            status: 'ok', 'dryrun' or 'failed' (with the error in 'error')
+        """
+        desired = [(fs_name, fileset_name, dict(clients)) for fs_name, fileset_name, clients in desired]
+
+        report = []
+        plan = self._plan_nfs_sync(desired, prune, report)
+
+        share_changes = [change for change in plan if change["action"] in ("create_share", "delete_share")]
+        client_changes = [change for change in plan if change["action"] not in ("create_share", "delete_share")]
+
+        if self.dry_run:
+            for change in share_changes + client_changes:
+                change["report"]["status"] = "dryrun"
+                self.log.info(
+                    "(dryrun) syncNfsExports: %s of '%s' in '%s': %s",
+                    change["action"], change["fileset"], change["filesystem"], change.get("client") or "",
+                )
+            return report
+
+        try:
+            # Create and delete shares before changing any client
+            results = parallel_map(self._apply_nfs_sync, share_changes)
+            for change, (result, error) in zip(share_changes, results):
+                self._report_nfs_sync(change, error)
+                if change["action"] == "create_share" and error is None:
+                    change["report"]["share_id"] = result
+
+            for change in client_changes:
+                share_change = change.get("share_change")
+                if share_change is None:
+                    continue
+                if share_change["report"]["status"] == "failed":
+                    change["report"]["status"] = "failed"
+                    change["report"]["error"] = "NFS share could not be created"
+                else:
+                    change["share_id"] = change["report"]["share_id"] = share_change["report"]["share_id"]
+
+            client_changes = [change for change in client_changes if change["report"]["status"] != "failed"]
+            results = parallel_map(self._apply_nfs_sync, client_changes)
+            for change, (_, error) in zip(client_changes, results):
+                self._report_nfs_sync(change, error)
+        finally:
+            # Changed shares and clients are requested again on next listing, even if sync was interrupted
+            changed_fs = {change["filesystem"] for change in share_changes}
+            self._swap_cached("oceanstor_nfsshares", removed=changed_fs)
+            for fs_name in changed_fs:
+                self._drop_disk_cache("nfsshares", fs_name)
+            changed_shares = {change["share_id"] for change in share_changes + client_changes}
+            self._swap_cached("oceanstor_nfsclients", removed=changed_shares)
+
+        failed = [item for item in report if item["status"] == "failed"]
+        self.log.info(
+            "syncNfsExports: %d shares and clients processed, %d changed, %d failed",
+            len(report), len(share_changes) + len(client_changes), len(failed)
+        )
+
+        return report
+
+    def _plan_nfs_sync(self, desired, prune, report):
+        """
+        Determine the changes of NFS shares and clients needed to reach given desired state
+        Appends the report of each desired share and client to given report
+
+        @returns: list of dicts describing each change with keys: action, filesystem, fileset, share_id, client,
+                  options, report and share_change (pending creation of the share of the client)
+        """
+        fs_names = sorted({fs_name for fs_name, _, _ in desired})
+        nfs_shares = self.list_nfs_shares(filesystemnames=fs_names)
+        nfs_clients = self.list_nfs_clients(filesystemnames=fs_names)
+
+        plan = []
+
+        def add_item(action, fs_name, fileset_name, share_id, client=None, options=None, share_change=None, error=None):
+            item_report = {
+                "filesystem": fs_name,
+                "fileset": fileset_name,
+                "share_id": share_id,
+                "client": client,
+                "action": action,
+                "status": None,
+                "error": error,
+            }
+            report.append(item_report)
+            if error is not None:
+                item_report["status"] = "failed"
+                return None
+            if action == "noop":
+                item_report["status"] = "ok"
+                return None
+
+            change = {
+                "action": action,
+                "filesystem": fs_name,
+                "fileset": fileset_name,
+                "share_id": share_id,
+                "client": client,
+                "options": options,
+                "report": item_report,
+                "share_change": share_change,
+            }
+            plan.append(change)
+            return change
+
+        # NFS shares and their filesystem by dtree ID
+        dtree_shares = {}
+        for fs_name in fs_names:
+            for share in nfs_shares.get(fs_name, {}).values():
+                dtree_shares[share["dtree_id"]] = (fs_name, share)
+
+        desired_dtrees = set()
+        for fs_name, fileset_name, clients in desired:
+            try:
+                dtree = self.get_fileset_info(fs_name, fileset_name)
+            except OceanStorOperationError as err:
+                dtree, error = None, str(err)
+            else:
+                error = f"dtree fileset '{fileset_name}' not found in filesystem '{fs_name}'"
+
+            if dtree is None:
+                add_item(None, fs_name, fileset_name, None, error=error)
+                self.log.warning("syncNfsExports: %s", error)
+                continue
+
+            desired_dtrees.add(dtree["id"])
+            _, share = dtree_shares.get(dtree["id"], (None, None))
+
+            if share is None:
+                share_change = add_item("create_share", fs_name, fileset_name, None, options={"dtree": dtree})
+                current_clients = {}
+            else:
+                share_change = None
+                current_clients = {nc["access_name"]: nc for nc in nfs_clients.get(share["id"], {}).values()}
+
+            share_id = share["id"] if share else None
+            for access_name, options in clients.items():
+                client_options = dict(OCEANSTOR_NFS_CLIENT_DEFAULTS)
+                client_options.update(options or {})
+
+                current = current_clients.pop(access_name, None)
+                if current is None:
+                    action = "create_client"
+                elif any(str(current.get(opt)) != str(value) for opt, value in client_options.items()):
+                    action = "update_client"
+                    client_options["id"] = current["id"]
+                else:
+                    action = "noop"
+                add_item(action, fs_name, fileset_name, share_id, access_name, client_options, share_change)
+
+            for access_name, current in current_clients.items():
+                add_item("delete_client", fs_name, fileset_name, share_id, access_name, {"id": current["id"]})
+
+        if prune:
+            for dtree_id, (fs_name, share) in dtree_shares.items():
+                if dtree_id not in desired_dtrees:
+                    fileset_name = self._get_fileset_index(fs_name).get_name(dtree_id, share.get("description"))
+                    add_item("delete_share", fs_name, fileset_name, share["id"])
+
+        return plan
+
+    def _apply_nfs_sync(self, change):
+        """
+        Send planned change of NFS share or client to OceanStor
+
+        @type change: dict describing the change as generated by _plan_nfs_sync
+
+        @returns: tuple with result and error message
+            result: ID of new share or client on creation
+        """
+        action = change["action"]
+        try:
+            if action == "create_share":
+                result = self._new_nfs_share_api(change["filesystem"], change["options"]["dtree"])
+            elif action == "delete_share":
+                result = self._delete_nfs_share_api(change["share_id"])
+            elif action == "create_client":
+                result = self._new_nfs_client_api(change["share_id"], change["client"], change["options"])
+            elif action == "update_client":
+                result = self._change_nfs_client_api(change["options"])
+            else:
+                result = self._delete_nfs_client_api(change["options"]["id"])
+        except (OceanStorOperationError, HTTPError, RuntimeError, KeyError) as err:
+            errmsg = f"syncNfsExports: failed to {action} of '{change['fileset']}' in '{change['filesystem']}': {err}"
+            self.log.error(errmsg)
+            return None, str(err)
+
+        return result, None
+
+    @staticmethod
+    def _report_nfs_sync(change, error):
+        """Update report of given change of NFS share or client with its result"""
+        if error is None:
+            change["report"]["status"] = "ok"
+        else:
+            change["report"]["status"] = "failed"
+            change["report"]["error"] = error
+
+    def _new_nfs_share_api(self, filesystem_name, dtree):
+        """
+        Create NFS share of given dtree fileset in OceanStor
+
+        @type filesystem_name: string with name of filesystem of the dtree
+        @type dtree: dict with details of the dtree fileset
+
+        @returns: string with ID of the new NFS share
+        """
+        query_params = {
+            "account_name": self.account["name"],
+            "share_path": f"/{filesystem_name}/{dtree['name']}/",
+            "description": f"/{filesystem_name}/{dtree['name']}",
+        }
+        _, response = self.session.api.v2.nas_protocol.nfs_share.post(body=query_params)
+
+        new_share_id = str(response["data"]["id"])
+        infomsg = "New NFS share of '%s' created successfully with ID: %s"
+        self.log.info(infomsg, query_params["share_path"], new_share_id)
+
+        return new_share_id
+
+    def _delete_nfs_share_api(self, share_id):
+        """
+        Delete NFS share with given ID in OceanStor, including all its clients
+        """
+        query_params = {
+            "account_name": self.account["name"],
+            "id": share_id,
+        }
+        self.session.api.v2.nas_protocol.nfs_share.delete(body=query_params)
+        self.log.info("NFS share '%s' deleted successfully", share_id)
+
+        return share_id
+
+    def _new_nfs_client_api(self, share_id, access_name, options):
         """
-        Return list of IPs in the VSC network of all servers in the OceanStor cluster
+        Add client with given access name and options to NFS share with given ID
+
+        @returns: string with ID of the new NFS client
+        """
+        query_params = dict(options)
+        query_params.update(
+            {
+                "account_name": self.account["name"],
+                "access_name": access_name,
+                "share_id": share_id,
+            }
+        )
+        _, response = self.session.api.v2.nas_protocol.nfs_share_auth_client.post(body=query_params)
+
+        new_client_id = str(response["data"]["id"])
+        self.log.info("New NFS client '%s' of share '%s' added with ID: %s", access_name, share_id, new_client_id)
+
+        return new_client_id
+
+    def _change_nfs_client_api(self, options):
+        """
+        Modify options of existing NFS client, its ID is included in given options
+        """
+        query_params = dict(options)
+        query_params["account_name"] = self.account["name"]
+        self.session.api.v2.nas_protocol.nfs_share_auth_client.put(body=query_params)
+        self.log.info("NFS client '%s' updated successfully", options["id"])
+
+        return options["id"]
+
+    def _delete_nfs_client_api(self, client_id):
+        """
+        Remove NFS client with given ID from its NFS share
+        """
+        query_params = {
+            "account_name": self.account["name"],
+            "id": client_id,
+        }
+        self.session.api.v2.nas_protocol.nfs_share_auth_client.delete(body=query_params)
+        self.log.info("NFS client '%s' deleted successfully", client_id)
+
+        return client_id
+
+    def list_nfs_servers(self, update=False, max_age=None):
+        """
+        Return set of IPs in the VSC network of all servers in the OceanStor cluster
+
+        @type max_age: int with maximum age in seconds of cached data (if None: follow cache policy)
         """
-        if not update and self.oceanstor_nfsservers:
+        if self._use_cache("nfsservers", "all", bool(self.oceanstor_nfsservers), update, max_age):
             return self.oceanstor_nfsservers
 
         # Request all server IPs
@@ -1059,76 +3653,192 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         # Validate IP addresses
         comma_sep_ips = ", ".join([str(ip) for ip in nfs_servers])
         try:
-            nfs_servers = [IPv4Address(ip) for ip in nfs_servers]
+            nfs_servers = {IPv4Address(ip) for ip in nfs_servers}
         except AddressValueError:
             errmsg = f"Received malformed server IPs from OceanStor: {comma_sep_ips}"
             self.log.raiseException(errmsg, OceanStorOperationError)
         else:
             self.log.debug("NFS servers in OceanStor: %s", comma_sep_ips)
 
-        self.oceanstor_nfsservers = nfs_servers
+        with self._cache_lock:
+            self.oceanstor_nfsservers = nfs_servers
+        self._mark_cached("nfsservers", "all")
         return nfs_servers
 
+    def _resolve_addresses(self, addresses):
+        """
+        Resolve given host names to IPv4 addresses
+        Resolved addresses are cached for DNS_CACHE_TIME seconds, missing ones are resolved concurrently
+
+        @type addresses: iterable of host names or IP addresses
+
+        @returns: dict with IPv4 address as string per host name
+        """
+        now = time.monotonic()
+        resolved = {}
+        missing = []
+
+        for address in set(addresses):
+            try:
+                ip_address, expiration = self.dns_cache[address]
+            except KeyError:
+                missing.append(address)
+            else:
+                if expiration > now:
+                    resolved[address] = ip_address
+                else:
+                    missing.append(address)
+
+        if missing:
+            self.log.debug("Resolving addresses of hosts: %s", ", ".join(missing))
+            expiration = now + DNS_CACHE_TIME
+            for address, ip_address in zip(missing, parallel_map(gethostbyname, missing)):
+                self.dns_cache[address] = (ip_address, expiration)
+                resolved[address] = ip_address
+
+        return resolved
+
     def _local_filesystems(self):
         """
         Identify local NFS filesystems from OceanStor
-        Set filesystem name in OceanStor as attribute of local filesystems
+        Add OceanStor ID as attribute of local filesystems, NFS mounts are identified on first use
         """
         super()._local_filesystems()
 
-        if self.oceanstor_filesystems is None:
-            self.list_filesystems()
-
-        # Add filesystem name in OceanStor to list of attributes of local filesystems
+        # Add ID in OceanStor to list of attributes of local filesystems
         self.localfilesystemnaming.append(LOCAL_FS_OCEANSTOR)
 
-        # NFS share paths and their IDs
-        oceanstor_shares = self.list_nfs_shares()
-        oceanstor_share_paths = {
+        fs_type = self.localfilesystemnaming.index("type")
+        for fs in self.localfilesystems:
+            # possible NFS mounts from OceanStor are identified on first use, other mounts are not from OceanStor
+            fs.append(LOCAL_FS_UNRESOLVED if fs[fs_type] in self.supportedfilesystems else None)
+
+    def _local_filesystem_id(self, local_fs, server_addresses=None, share_paths=None):
+        """
+        Return ID in OceanStor of the share in given local filesystem (None if not served by OceanStor)
+        The ID of NFS mounts is identified once from their server and share path
+
+        @type local_fs: list with attributes of local filesystem
+        @type server_addresses: dict with IPv4 address per host name of NFS servers (if None: resolve server)
+        @type share_paths: dict with dtree ID per path of NFS shares in OceanStor (if None: list NFS shares)
+        """
+        oceanstor_col = self.localfilesystemnaming.index(LOCAL_FS_OCEANSTOR)
+        if local_fs[oceanstor_col] is not LOCAL_FS_UNRESOLVED:
+            return local_fs[oceanstor_col]
+
+        # Possible NFS mount from OceanStor
+        mount_point = local_fs[self.localfilesystemnaming.index("mountpoint")]
+        mount_device = local_fs[self.localfilesystemnaming.index("device")]
+        server_address, share_path = mount_device.split(":", 1)
+
+        # Check NFS server IP
+        try:
+            if server_addresses is None or server_address not in server_addresses:
+                server_addresses = self._resolve_addresses([server_address])
+            server_ip = IPv4Address(server_addresses[server_address])
+        except (AddressValueError, OSError):
+            errmsg = f"Error converting address of NFS server to an IPv4: {server_address}"
+            self.log.raiseException(errmsg, OceanStorOperationError)
+
+        oceanstor_tag = None
+        if server_ip in self.list_nfs_servers():
+            if share_paths is None:
+                share_paths = self._nfs_share_paths()
+
+            # Check share path
+            share_path = os.path.normpath(share_path)
+            if share_path in share_paths:
+                oceanstor_tag = share_paths[share_path]
+                dbgmsg = "Local NFS mount '%s' is served by OceanStor and shares object ID: %s"
+                self.log.debug(dbgmsg, mount_point, oceanstor_tag)
+            else:
+                errmsg = (
+                    f"NFS mount '{mount_point}' served from OceanStor '{str(server_ip)}' "
+                    f"shares unknown path '{share_path}'"
+                )
+                self.log.raiseException(errmsg, OceanStorOperationError)
+
+        local_fs[oceanstor_col] = oceanstor_tag
+        return oceanstor_tag
+
+    def _nfs_share_paths(self):
+        """
+        Return dict with ID of the dtree fileset exported by each NFS share in OceanStor keyed by its share path
+        """
+        return {
             os.path.normpath(nfs_share[ns]["share_path"]): nfs_share[ns]["dtree_id"]
-            for nfs_share in oceanstor_shares.values()
+            for nfs_share in self.list_nfs_shares().values()
             for ns in nfs_share
         }
 
-        for fs in self.localfilesystems:
-            oceanstor_tag = None
+    @staticmethod
+    def _read_mount_table_fingerprint():
+        """
+        Return hash of the contents of the mount table of this process
+        Return None if the mount table cannot be read
+        """
+        try:
+            with open(LOCAL_MOUNT_TABLE, "rb") as mount_table:
+                return hashlib.sha1(mount_table.read()).hexdigest()
+        except OSError:
+            return None
+
+    def _check_mount_table(self):
+        """
+        Drop cached identification of local paths and local filesystems if the mount table changed
+        Caching is disabled if the mount table cannot be read
 
-            if fs[self.localfilesystemnaming.index("type")] in self.supportedfilesystems:
-                # Possible NFS mount from OceanStor
-                mount_point = fs[self.localfilesystemnaming.index("mountpoint")]
-                mount_device = fs[self.localfilesystemnaming.index("device")]
-                server_address, share_path = mount_device.split(":", 1)
+        @returns: bool with cache validity
+        """
+        fingerprint = self._read_mount_table_fingerprint()
 
-                # Check NFS server IP
-                try:
-                    server_ip_str = gethostbyname(server_address)
-                    server_ip = IPv4Address(server_ip_str)
-                except AddressValueError:
-                    errmsg = f"Error converting address of NFS server to an IPv4: {server_address}"
-                    self.log.raiseException(errmsg, OceanStorOperationError)
-
-                oceanstor_nfs_servers = self.list_nfs_servers()
-                if any(server_ip == oceanstor_ip for oceanstor_ip in oceanstor_nfs_servers):
-                    # Check share path
-                    share_path = os.path.normpath(share_path)
-                    if share_path in oceanstor_share_paths:
-                        oceanstor_tag = oceanstor_share_paths[share_path]
-                        dbgmsg = "Local NFS mount '%s' is served by OceanStor and shares object ID: %s"
-                        self.log.debug(dbgmsg, mount_point, oceanstor_tag)
-                    else:
-                        errmsg = (
-                            f"NFS mount '{mount_point}' served from OceanStor '{str(server_ip)}' "
-                            f"shares unknown path '{share_path}'"
-                        )
-                        self.log.raiseException(errmsg, OceanStorOperationError)
+        if fingerprint is None or fingerprint != self._mount_table_fingerprint:
+            if self._mount_table_fingerprint is not None:
+                self.log.debug("Mount table changed, dropping %s cached local paths", len(self.local_paths))
+                self.local_paths_stats["invalidations"] += 1
+                # local filesystems are identified again on next use
+                self.localfilesystems = None
+            self.local_paths.clear()
+            self._mount_table_fingerprint = fingerprint
+
+        return fingerprint is not None
+
+    def local_paths_cache_info(self):
+        """
+        Return dict with statistics of the cache of identified local paths: hits, misses, invalidations and size
+        """
+        cache_info = dict(self.local_paths_stats)
+        cache_info["size"] = len(self.local_paths)
 
-            # Add filesystem name in OceanStor to all mounts (even if None)
-            fs.append(oceanstor_tag)
+        return cache_info
 
     def _identify_local_path(self, local_path):
         """
         Identify the filesystem/dtree ID in OceanStor of a given directory path
         Return IDs, mount point and relative path of object in OceanStor
+        Results are cached by normalized path until the mount table changes
+
+        @type local_path: string with directory path
+        """
+        path_key = os.path.normpath(os.path.abspath(local_path))
+
+        cache_valid = self._check_mount_table()
+        if cache_valid and path_key in self.local_paths:
+            self.local_paths_stats["hits"] += 1
+            local_object = self.local_paths[path_key]
+            self.log.debug("(cached) Path '%s' identified in OceanStor as: %s", local_path, local_object)
+            return local_object
+
+        self.local_paths_stats["misses"] += 1
+        local_object = self._resolve_local_path(local_path)
+        if cache_valid:
+            self.local_paths[path_key] = local_object
+
+        return local_object
+
+    def _resolve_local_path(self, local_path):
+        """
+        Identify the filesystem/dtree ID in OceanStor of a given directory path from the local system
 
         @type local_path: string with directory path
         """
@@ -1148,7 +3858,7 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         local_fs = self.what_filesystem(local_path)
 
         # Check NFS mount source
-        oceanstor_id = local_fs[self.localfilesystemnaming.index(LOCAL_FS_OCEANSTOR)]
+        oceanstor_id = self._local_filesystem_id(local_fs)
         if oceanstor_id is None:
             errmsg = f"NFS mount of '{local_path}' is not from OceanStor"
             self.log.raiseException(errmsg, OceanStorOperationError)
@@ -1178,37 +3888,88 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         @type fileset_id: string with ID of dtree fileset
         """
-        fileset_path = None
+        fileset_path = self._get_fileset_local_paths().get(fileset_id)
+
+        self.log.debug("Local path of fileset '%s': %s", fileset_id, fileset_path)
+
+        return fileset_path
+
+    def _filesets_version(self):
+        """
+        Return tuple identifying the current state of cached filesets
+        """
+        return tuple((fs_name, collection_version(fs_dtree)) for fs_name, fs_dtree in self.oceanstor_filesets.items())
+
+    def _get_fileset_local_paths(self):
+        """
+        Return dict with local path of each dtree fileset reachable from local mounts
+        Map is rebuilt whenever the mount table or the cached filesets change
+
+        If a fileset is reachable from several mounts, the last mount in the mount table wins
+        Mounts that cannot be identified in OceanStor are skipped
+        """
+        mount_table_valid = self._check_mount_table()
+        cache_version = (self._mount_table_fingerprint, self._filesets_version())
+
+        if mount_table_valid and self.fileset_local_paths is not None:
+            if self._fileset_local_paths_version == cache_version:
+                return self.fileset_local_paths
+
+        if not mount_table_valid or self.localfilesystems is None:
+            self._local_filesystems()
+
+        # Resolve servers of all NFS mounts pending identification at once
+        oceanstor_col = self.localfilesystemnaming.index(LOCAL_FS_OCEANSTOR)
+        device_col = self.localfilesystemnaming.index("device")
+        unresolved = [mount for mount in self.localfilesystems if mount[oceanstor_col] is LOCAL_FS_UNRESOLVED]
+
+        server_addresses = {}
+        share_paths = None
+        if unresolved:
+            try:
+                server_addresses = self._resolve_addresses([mount[device_col].split(":", 1)[0] for mount in unresolved])
+            except OSError as err:
+                # servers are resolved again per mount to skip only the failing ones
+                self.log.warning("Failed to resolve NFS servers of local mounts at once: %s", err)
+            else:
+                nfs_servers = self.list_nfs_servers()
+                if any(IPv4Address(ip) in nfs_servers for ip in server_addresses.values()):
+                    share_paths = self._nfs_share_paths()
 
-        self._local_filesystems()
+        fileset_paths = {}
 
-        for mount in [fs for fs in self.localfilesystems if fs[self.localfilesystemnaming.index(LOCAL_FS_OCEANSTOR)]]:
-            mount_id = mount[self.localfilesystemnaming.index(LOCAL_FS_OCEANSTOR)]
+        for mount in self.localfilesystems:
             mount_path = mount[self.localfilesystemnaming.index("mountpoint")]
-            if mount_id == fileset_id:
-                # fileset is directly mounted here
-                fileset_path = mount_path
+            try:
+                mount_id = self._local_filesystem_id(mount, server_addresses=server_addresses, share_paths=share_paths)
+            except OceanStorOperationError as err:
+                self.log.warning("Skipping local mount '%s' in map of fileset paths: %s", mount_path, err)
+                continue
+            if mount_id is None:
+                continue
+
+            # check filesets contained in mounted volume
+            filesystem_id, _ = mount_id.split("@", 1)
+            try:
+                mount_filesystem = next(iter(self.select_filesystems(filesystem_id, byid=True)))
+            except ValueError:
+                self.log.debug("Filesystem of mounted fileset '%s' not found", mount_id)
             else:
-                # check if mounted volume contains this fileset
-                filesystem_id, _ = mount_id.split("@", 1)
-                try:
-                    mount_filesystem = next(iter(self.select_filesystems(filesystem_id, byid=True)))
-                except ValueError:
-                    self.log.debug("Fileset '%s' not found in mounted fileset '%s'", fileset_id, mount_id)
-                else:
-                    # get filesets in this filesystem
-                    mount_filesystem_fs = self.list_filesets(devices=mount_filesystem)
-                    mount_filesystem_fs = mount_filesystem_fs[mount_filesystem]
-                    if fileset_id in mount_filesystem_fs:
-                        mount_fileset = mount_filesystem_fs[fileset_id]
-                        inner_path = os.path.join(mount_fileset["parent_dir"], mount_fileset["name"])[1:]
-                        fileset_path = os.path.join(mount_path, inner_path)
-                    else:
-                        self.log.debug("Fileset '%s' not found in mounted filesystem '%s'", fileset_id, mount_id)
+                # get filesets in this filesystem
+                mount_filesystem_fs = self.list_filesets(devices=mount_filesystem)
+                for dt_id, mount_fileset in mount_filesystem_fs[mount_filesystem].items():
+                    inner_path = os.path.join(mount_fileset["parent_dir"], mount_fileset["name"])[1:]
+                    fileset_paths[dt_id] = os.path.join(mount_path, inner_path)
 
-        self.log.debug("Local path of fileset '%s': %s", fileset_id, fileset_path)
+            # fileset is directly mounted here
+            fileset_paths[mount_id] = mount_path
 
-        return fileset_path
+        self.log.debug("Mapped local paths of %s dtree filesets", len(fileset_paths))
+
+        self.fileset_local_paths = fileset_paths
+        self._fileset_local_paths_version = (self._mount_table_fingerprint, self._filesets_version())
+
+        return fileset_paths
 
     def make_fileset(
         self,
@@ -1361,10 +4122,9 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
             self.log.raiseException(errmsg, OceanStorOperationError)
 
         # Check if a dtree fileset with this name alreay exists
-        for dt in self.oceanstor_filesets[filesystem_name].values():
-            if dt["name"] == fileset_name:
-                errmsg = f"Found existing dtree fileset '{dt['name']}' with same name as new one '{fileset_name}'"
-                self.log.raiseException(errmsg, OceanStorOperationError)
+        if self._get_fileset_index(filesystem_name).get_id(fileset_name) is not None:
+            errmsg = f"Found existing dtree fileset with same name as new one '{fileset_name}'"
+            self.log.raiseException(errmsg, OceanStorOperationError)
 
         # Check if OceanStor name constrains for dtrees are met
         unallowed_name_chars = re.compile(r"[^a-zA-Z0-9._]")
@@ -1395,9 +4155,30 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         else:
             _, result = self.session.api.v2.file_service.dtrees.post(body=new_dtree_params)
             self.log.info("New dtree fileset created succesfully: %s", result)
+            self._drop_disk_cache("filesets", filesystem_name)
 
-            # Rescan all filesets and force update the info
-            self.list_filesets(update=True)
+            try:
+                new_dtree = OceanStorDtree(result["data"])
+                new_dt_id = new_dtree["id"]
+            except (KeyError, TypeError, ValueError):
+                # Rescan all filesets and force update the info
+                self.list_filesets(update=True)
+            else:
+                # Add new fileset to cached filesets and index of their paths
+                new_dtree.setdefault("name", fileset_name)
+                new_dtree.setdefault("parent_dir", parent_dir)
+                with self._cache_lock:
+                    cached_dtree = self.oceanstor_filesets[filesystem_name]
+                    fs_dtree = OceanStorCollection(cached_dtree)
+                    fs_dtree[new_dt_id] = new_dtree
+                    self._swap_cached("oceanstor_filesets", {filesystem_name: fs_dtree})
+                    # prefix tree of paths only grows, the new path is inserted in place
+                    fileset_trie = self.oceanstor_fileset_paths.get(filesystem_name)
+                    if fileset_trie is not None and fileset_trie.source is cached_dtree:
+                        fileset_trie.insert(os.path.join(new_dtree["parent_dir"], new_dtree["name"]), new_dt_id)
+                        fileset_trie.source = fs_dtree
+                        fileset_trie.version = collection_version(fs_dtree)
+                self.log.debug("Added new dtree fileset '%s' to cache of filesystem '%s'", new_dt_id, filesystem_name)
 
     @staticmethod
     def _convert_quota_attributes(quota):
@@ -1437,7 +4218,7 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
             fancylogger.getLogger().raiseException("Missing space_unit_type attribute in quota object", KeyError)
         else:
             # AP expects block quotas in KiB, convert units down to bytes and to KiB
-            kib_conversion = lambda q: int((q * byte_conversion) // 1024)
+            kib_conversion = lambda q: None if q is None else int((q * byte_conversion) // 1024)
 
         try:
             storage_quota = {
@@ -1476,7 +4257,9 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         return storage_quota
 
-    def list_quota(self, devices=None, update=False, only_default=False):  # pylint: disable=arguments-differ
+    def list_quota(
+        self, devices=None, update=False, only_default=False, max_age=None
+    ):  # pylint: disable=arguments-differ
         """
         Get quota info for all filesystems for all quota types (fileset, user, group)
         Regular quotas and default quotas are kept in separate class attributes
@@ -1484,10 +4267,11 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         @type devices: list of filesystem names (if string: 1 filesystem; if None: all known filesystems)
         @type only_default: bool to return list of default quotas
+        @type max_age: int with maximum age in seconds of cached data (if None: follow cache policy)
 
         set self.oceanstor_quotas to dict with
         : keys per filesystemName and value is dict with
-        :: keys per quotaType and value is dict with
+        :: keys per quotaType and value is OceanStorQuotaIndex with
         ::: keys per quotaID and value is StorageQuota named tuple
         """
         # Filter by filesystem name (devices in GPFS)
@@ -1505,7 +4289,8 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         default_quotas = {}
 
         for fs_name, fs_id in filter_fs.items():
-            if not update and fs_name in self.oceanstor_quotas and fs_name in self.oceanstor_defaultquotas:
+            fs_cached = fs_name in self.oceanstor_quotas and fs_name in self.oceanstor_defaultquotas
+            if self._use_cache("quotas", fs_name, fs_cached, update, max_age):
                 # Use cached data
                 dbg_prefix = "(cached) "
                 quotas[fs_name] = self.oceanstor_quotas[fs_name]
@@ -1513,38 +4298,49 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
             else:
                 # Request quotas for this filesystem and all its filesets
                 dbg_prefix = ""
-                fs_quotas = {qt.name: {} for qt in QuotaType}
-                fs_default_quotas = {qt.name: {} for qt in QuotaType}
+                quota_changes = self._quota_changes.get(fs_name, 0)
+                fs_quotas = {qt.name: OceanStorQuotaIndex() for qt in QuotaType}
+                fs_default_quotas = {qt.name: OceanStorQuotaIndex() for qt in QuotaType}
 
-                query_params = {
-                    "parent_type": OCEANSTOR_QUOTA_PARENT_TYPE["filesystem"],
-                    "parent_id": fs_id,
-                }
+                cached_quotas, cached_age = self._load_disk_cache("quotas", fs_name, update, max_age)
+                if cached_quotas is None:
+                    fs_quota_iter = self._iter_filesystem_quotas(fs_id)
+                else:
+                    fs_quota_iter = ((quota_type, StorageQuota(*quota)) for quota_type, quota in cached_quotas)
 
-                # quota queries are paginated
-                query_params["space_unit_type"] = OCEANSTOR_QUOTA_UNIT_TYPE["B"]  # bytes
-                status, response = self.session.api.v2.file_service.fs_quota.get(pagination=True, **query_params)
-
-                if status and "data" in response:
-                    # add each quota to its category in current filesystem
-                    for quota_obj in response["data"]:
-                        quota_type = QuotaType(quota_obj["quota_type"]).name
-                        quota_attributes = self._convert_quota_attributes(quota_obj)
-                        if quota_attributes:
-                            quota_entry = {quota_obj["id"]: StorageQuota(**quota_attributes)}
-                            if quota_entry[quota_obj["id"]].ownerName == "All User":
-                                # user default quota
-                                fs_default_quotas[quota_type].update(quota_entry)
-                            else:
-                                # regular quota
-                                fs_quotas[quota_type].update(quota_entry)
-
-                quotas[fs_name] = fs_quotas
-                default_quotas[fs_name] = fs_default_quotas
-
-                # Update cache of quotas in selected filesystem
-                self.oceanstor_quotas[fs_name] = fs_quotas
-                self.oceanstor_defaultquotas[fs_name] = fs_default_quotas
+                # add each quota to its category in current filesystem
+                for quota_type, quota in fs_quota_iter:
+                    if quota.ownerName == OCEANSTOR_QUOTA_DEFAULT_OWNER:
+                        # user default quota
+                        fs_default_quotas[quota_type][quota.id] = quota
+                    else:
+                        # regular quota
+                        fs_quotas[quota_type][quota.id] = quota
+
+                with self._cache_lock:
+                    quotas_changed = self._quota_changes.get(fs_name, 0) != quota_changes
+                    if quotas_changed and fs_name in self.oceanstor_quotas and fs_name in self.oceanstor_defaultquotas:
+                        # cached quotas changed while requesting them, received quotas might predate those changes
+                        dbg_prefix = "(cached) "
+                        self.log.debug("Quotas of filesystem '%s' changed during refresh, keeping cached ones", fs_name)
+                        quotas[fs_name] = self.oceanstor_quotas[fs_name]
+                        default_quotas[fs_name] = self.oceanstor_defaultquotas[fs_name]
+                    else:
+                        # Update cache of quotas in selected filesystem
+                        quotas[fs_name] = fs_quotas
+                        default_quotas[fs_name] = fs_default_quotas
+                        self._swap_cached("oceanstor_quotas", {fs_name: fs_quotas})
+                        self._swap_cached("oceanstor_defaultquotas", {fs_name: fs_default_quotas})
+                        self._mark_cached("quotas", fs_name, age=cached_age)
+
+                if cached_quotas is None and quotas[fs_name] is fs_quotas:
+                    cached_quotas = [
+                        (quota_type, quota)
+                        for typ_quotas in (fs_quotas, fs_default_quotas)
+                        for quota_type, quota_index in typ_quotas.items()
+                        for quota in quota_index.values()
+                    ]
+                    self._save_disk_cache("quotas", fs_name, cached_quotas)
 
             quota_count = [f"{qt.name} = {len(quotas[fs_name][qt.name])}" for qt in QuotaType]
             self.log.debug(
@@ -1555,6 +4351,63 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
             return default_quotas
         return quotas
 
+    def iter_quota(self, devices=None, only_default=False):
+        """
+        Query quota info for all filesystems for all quota types (fileset, user, group) page by page
+        Quotas are streamed from OceanStor without being cached
+        By default, only yield regular quotas
+
+        @type devices: list of filesystem names (if string: 1 filesystem; if None: all known filesystems)
+        @type only_default: bool to yield default quotas
+
+        Return generator of tuples with filesystemName, quotaType and StorageQuota named tuple
+        """
+        # Filter by filesystem name (devices in GPFS)
+        if devices is None:
+            filesystems = self.list_filesystems()
+            devices = list(filesystems.keys())
+        elif isinstance(devices, str):
+            devices = [devices]
+
+        filter_fs = self.select_filesystems(devices)
+        self.log.debug("Streaming quotas in filesystems IDs: %s", ", ".join(filter_fs))
+
+        return (
+            (fs_name, quota_type, quota)
+            for fs_name, fs_id in filter_fs.items()
+            for quota_type, quota in self._iter_filesystem_quotas(fs_id)
+            if (quota.ownerName == OCEANSTOR_QUOTA_DEFAULT_OWNER) == only_default
+        )
+
+    def _iter_filesystem_quotas(self, fs_id):
+        """
+        Query quotas of given filesystem and all its filesets page by page
+        Quotas attached to the filesystem itself are ignored
+
+        @type fs_id: ID of filesystem in OceanStor
+
+        Generator of tuples with quotaType and StorageQuota named tuple
+        """
+        query_params = {
+            "parent_type": OCEANSTOR_QUOTA_PARENT_TYPE["filesystem"],
+            "parent_id": fs_id,
+            "space_unit_type": OCEANSTOR_QUOTA_UNIT_TYPE["B"],  # bytes
+        }
+
+        # quota queries are paginated, fetch pages concurrently up to the total count of quotas
+        fs_quotas = self.session.api.v2.file_service.fs_quota.get(
+            pagination=True,
+            stream=True,
+            workers=OCEANSTOR_MAX_WORKERS,
+            count_url=OCEANSTOR_QUOTA_COUNT_URL,
+            **query_params,
+        )
+
+        for quota_obj in fs_quotas:
+            quota_attributes = self._convert_quota_attributes(quota_obj)
+            if quota_attributes:
+                yield QuotaType(quota_obj["quota_type"]).name, StorageQuota(**quota_attributes)
+
     def _get_quota(self, who, obj, typ=Typ2Param.USR.value):
         """
         Get quota information of a given local object.
@@ -1580,37 +4433,26 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         ostor_fs_id, ostor_dtree_id, ostor_mount, ostor_path = self._identify_local_path(quota_path)
         ostor_fs_name = next(iter(self.select_filesystems(ostor_fs_id, byid=True)))
 
-        # Look for filesets with the corresponding parent directory
+        # Look for the deepest fileset containing the path
         parent_id = None
-        fs_filesets = self.list_filesets(devices=ostor_fs_name)
-        # start at the bottom of the path and move upwards
-        fileset_parent = ostor_path
-        while fileset_parent != "/":
-            fileset_parent, fileset_name = os.path.split(fileset_parent)
-            fileset = [
-                fs["id"]
-                for fs in fs_filesets[ostor_fs_name].values()
-                if fs["name"] == fileset_name and fs["parent_dir"] == fileset_parent
-            ]
-
-            if len(fileset) == 1:
-                # found the fileset in this path, stop searching
-                parent_id = fileset[0]
-                dbgmsg = "getQuota: quota path '%s' is fileset '%s' in OceanStor filesystem '%s'"
-                self.log.debug(dbgmsg, quota_path, parent_id, ostor_mount)
-                break
-
-            if len(fileset) > 1:
-                # there cannot be more than one match for any path
-                errmsg = (
-                    f"getQuota: found multiple filesets mathing path '{quota_path}' "
-                    f"in OceanStor filesystem '{ostor_mount}': {', '.join(fileset)}"
-                )
-                self.log.raiseException(errmsg, OceanStorOperationError)
-            else:
-                # no fileset found, continue looking up the path
-                dbgmsg = "getQuota: no fileset found matching path '%s' in OceanStor filesystem '%s'"
-                self.log.debug(dbgmsg, fileset_parent, ostor_mount)
+        fileset_trie = self._get_fileset_trie(ostor_fs_name)
+        fileset_path, fileset = fileset_trie.lookup(ostor_path)
+
+        if len(fileset) == 1:
+            # found the fileset in this path
+            parent_id = fileset[0]
+            dbgmsg = "getQuota: quota path '%s' is in fileset '%s' at '%s' in OceanStor filesystem '%s'"
+            self.log.debug(dbgmsg, quota_path, parent_id, fileset_path, ostor_mount)
+        elif len(fileset) > 1:
+            # there cannot be more than one match for any path
+            errmsg = (
+                f"getQuota: found multiple filesets mathing path '{quota_path}' "
+                f"in OceanStor filesystem '{ostor_mount}': {', '.join(fileset)}"
+            )
+            self.log.raiseException(errmsg, OceanStorOperationError)
+        else:
+            dbgmsg = "getQuota: no fileset found matching path '%s' in OceanStor filesystem '%s'"
+            self.log.debug(dbgmsg, ostor_path, ostor_mount)
 
         if not parent_id:
             # Target path is root of NFS mount (fileset_parent == '/')
@@ -1625,7 +4467,7 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         # Find quotas attached to parent object
         fs_quotas = self.list_quota(devices=ostor_fs_name)
         typ_quotas = fs_quotas[ostor_fs_name][typ]
-        attached_quotas = {fq.id: fq for fq in typ_quotas.values() if fq.parentId == parent_id}
+        attached_quotas = typ_quotas.lookup(parent_id)
 
         dbgmsg = "getQuota: quotas attached to parent ID '%s': %s"
         self.log.debug(dbgmsg, parent_id, ", ".join(attached_quotas))
@@ -1635,10 +4477,10 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
             if who == "*":
                 # default quotas are cached in their own list
                 default_typ_quotas = self.oceanstor_defaultquotas[ostor_fs_name][typ]
-                attached_quotas = {fq.id: fq for fq in default_typ_quotas.values() if fq.parentId == parent_id}
+                attached_quotas = default_typ_quotas.lookup(parent_id)
             else:
                 # select quotas for this user/group
-                attached_quotas = {fq.id: fq for fq in attached_quotas.values() if fq.ownerName == str(who)}
+                attached_quotas = typ_quotas.lookup(parent_id, owner=str(who))
                 dbgmsg = "getQuota: quotas attached to parent ID '%s' for user/group '%s': %s"
                 self.log.debug(dbgmsg, parent_id, who, ", ".join(attached_quotas))
 
@@ -1730,40 +4572,221 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
             # local path already has requested quotas
             for quota_id in quotas:
                 self.log.debug("Sending request to update %s quota with ID: %s", typ, quota_id)
-                self._change_quota_api(quota_id, **kwargs)
+                quota_changes = self._change_quota_api(quota_id, **kwargs)
+                self._patch_cached_quota(ostor_fs_name, typ, quota_id, quota_changes)
         else:
             # create new quota for given local path
             self.log.debug("Sending request to create new %s quota for object ID: %s", typ, quota_parent)
-            # quotas without any limits on inodes take that limit from their default quota
-            if "inode_soft" not in kwargs or kwargs["inode_soft"] is None:
-                default_quota = [
-                    q for q in self.oceanstor_defaultquotas[ostor_fs_name][typ].values()
-                    if q.parentId == quota_parent
-                ]
-                try:
-                   kwargs["inode_hard"] = default_quota[0].filesLimit
-                   kwargs["inode_soft"] = default_quota[0].filesQuota
-                except (KeyError, IndexError):
-                    # move along, not every object and type of quota has a default quota
-                    self.log.warning(
-                        f"setQuota: failed to retrieve default inode quotas from parent '{quota_parent}' "
-                        f"quota of '{quota_path}'"
-                    )
+            self._default_inode_limits(ostor_fs_name, typ, quota_parent, quota_path, who, kwargs)
+            new_quota_id = self._new_quota_api(quota_parent, typ=typ, who=who, **kwargs)
+            if new_quota_id is not None:
+                self._cache_new_quota(ostor_fs_name, new_quota_id)
+
+        # Quota cache was updated in place, refresh the complete filesystem if deferred
+        self._defer_quota_refresh(ostor_fs_name)
+
+    def _default_inode_limits(self, fs_name, typ, quota_parent, quota_path, who, limits):
+        """
+        Quotas without any limits on inodes take that limit from their default quota
+        Update the given limits in place with the inode limits of the default quota of its parent object
+
+        @type fs_name: name of filesystem of the quota
+        @type typ: string with type of quota: fileset, user or group
+        @type quota_parent: ID of parent object holding the quota
+        @type quota_path: local path of the quota
+        @type who: identifier (username for user quota, group name for group quota, ignored for fileset quota)
+        @type limits: dict with keyword arguments of the quota limits
+        """
+        if "inode_soft" in limits and limits["inode_soft"] is not None:
+            return
+
+        default_typ_quotas = self.oceanstor_defaultquotas[fs_name][typ]
+        default_quota = list(default_typ_quotas.lookup(quota_parent).values())
+        try:
+            limits["inode_hard"] = default_quota[0].filesLimit
+            limits["inode_soft"] = default_quota[0].filesQuota
+        except (KeyError, IndexError):
+            # move along, not every object and type of quota has a default quota
+            self.log.warning(
+                f"setQuota: failed to retrieve default inode quotas from parent '{quota_parent}' "
+                f"quota of '{quota_path}'"
+            )
+        else:
+            self.log.debug(
+                f"setQuota: applying default inode limit of {limits['inode_hard']} "
+                f"from parent '{quota_parent}' to new quota for '{who}' in '{quota_path}'"
+            )
+
+    def sync_quota(self, desired):
+        """
+        Synchronise quotas in OceanStor with the given desired state
+        Only quotas that differ from the cached ones are created or updated, changes are sent concurrently
+
+        @type desired: iterable of tuples with (path, typ, who, limits)
+            path: local path of the quota
+            typ: string with type of quota: fileset, user or group
+            who: identifier (UID/username for user quota, GID/group name for group quota, ignored for fileset quota)
+            limits: dict with quota limits: soft, hard, inode_soft, inode_hard
+
+        @returns: list of dicts with the report of each item in desired: path, typ, who, action and status
+            action: 'create', 'update' or 'noop'
+            status: 'ok', 'dryrun' or 'failed' (with the error in 'error')
+            user quotas rejected by OceanStor on creation are reported as 'failed', the default user quota applies
+        """
+        report = []
+        changes = []
+
+        for path, typ, who, limits in desired:
+            item_report = {"path": path, "typ": typ, "who": who, "action": None, "status": None, "error": None}
+            report.append(item_report)
+            try:
+                change = self._plan_quota_sync(path, typ, who, dict(limits))
+            except (PosixOperationError, HTTPError, RuntimeError, KeyError) as err:
+                item_report["status"] = "failed"
+                item_report["error"] = str(err)
+                self.log.warning("syncQuota: failed to plan %s quota of '%s' for '%s': %s", typ, path, who, err)
+                continue
+
+            item_report["action"] = change["action"]
+            if change["action"] == "noop":
+                item_report["status"] = "ok"
+                self.log.debug("syncQuota: %s quota of '%s' for '%s' is up to date", typ, path, who)
+            elif self.dry_run:
+                item_report["status"] = "dryrun"
+                self.log.info(
+                    "(dryrun) syncQuota: %s %s quota of '%s' for '%s': %s",
+                    change["action"], typ, path, who, change["limits"],
+                )
+            else:
+                changes.append((item_report, change))
+
+        # Send all changes to OceanStor
+        results = parallel_map(self._apply_quota_sync, [change for _, change in changes])
+
+        # Update cached quotas from the main thread
+        for (item_report, change), (result, error) in zip(changes, results):
+            if error is not None:
+                item_report["status"] = "failed"
+                item_report["error"] = error
+                continue
+
+            if change["action"] == "create" and result is None:
+                item_report["status"] = "failed"
+                item_report["error"] = "quota creation rejected by OceanStor, default quota in place"
+                continue
+
+            item_report["status"] = "ok"
+            if change["action"] == "update":
+                for quota_id, query_params in result.items():
+                    self._patch_cached_quota(change["fs_name"], change["typ"], quota_id, query_params)
+            else:
+                self._cache_new_quota(change["fs_name"], result)
+
+        failed = [item for item in report if item["status"] == "failed"]
+        self.log.info(
+            "syncQuota: %d quotas processed, %d changed, %d failed",
+            len(report), len([item for item in report if item["action"] in ("create", "update")]), len(failed)
+        )
+
+        return report
+
+    def _plan_quota_sync(self, path, typ, who, limits):
+        """
+        Determine the change needed to apply given quota limits on local path
+
+        @returns: dict describing the change with keys: action, fs_name, typ, who, parent, quota_ids, limits
+        """
+        if typ not in [qt.name for qt in QuotaType]:
+            errmsg = f"syncQuota: unknown quota type '{typ}'"
+            self.log.raiseException(errmsg, OceanStorOperationError)
+
+        if typ == Typ2Param.FILESET.value:
+            who = None
+        elif str(who).isdigit():
+            # convert UIDs/GIDs to names
+            who = self.vsc.uid_number_to_uid(who)
+        elif who is not None:
+            who = str(who)
+
+        if who is None and typ != Typ2Param.FILESET.value:
+            errmsg = f"syncQuota: missing owner of {typ} quota of '{path}'"
+            self.log.raiseException(errmsg, OceanStorOperationError)
+
+        quota_path = self._sanity_check(path)
+        quota_parent, quota_ids = self._get_quota(who, quota_path, typ)
+        ostor_fs_id = quota_parent.split("@", 1)[0]
+        ostor_fs_name = next(iter(self.select_filesystems(ostor_fs_id, byid=True)))
+
+        change = {
+            "action": "noop",
+            "fs_name": ostor_fs_name,
+            "typ": typ,
+            "who": who,
+            "parent": quota_parent,
+            "path": quota_path,
+            "quota_ids": quota_ids,
+            "limits": limits,
+        }
+
+        if not quota_ids:
+            change["action"] = "create"
+            return change
+
+        # Compare requested limits with cached quotas
+        query_params = self._parse_quota_limits(**limits)
+        if who == "*":
+            typ_quotas = self.oceanstor_defaultquotas[ostor_fs_name][typ]
+        else:
+            typ_quotas = self.oceanstor_quotas[ostor_fs_name][typ]
+
+        for quota_id in quota_ids:
+            quota = typ_quotas[quota_id]
+            for param, value in query_params.items():
+                if param in OCEANSTOR_QUOTA_BLOCK_PARAMS:
+                    cached_value = getattr(quota, OCEANSTOR_QUOTA_BLOCK_PARAMS[param])
+                    value = int(value // 1024)
+                elif param in OCEANSTOR_QUOTA_FILES_PARAMS:
+                    cached_value = getattr(quota, OCEANSTOR_QUOTA_FILES_PARAMS[param])
                 else:
-                    self.log.debug(
-                        f"setQuota: applying default inode limit of {kwargs['inode_hard']} "
-                        f"from parent '{quota_parent}' to new quota for '{who}' in '{quota_path}'"
-                    )
-            self._new_quota_api(quota_parent, typ=typ, who=who, **kwargs)
+                    continue
+                if cached_value != value:
+                    change["action"] = "update"
+                    return change
+
+        return change
+
+    def _apply_quota_sync(self, change):
+        """
+        Send planned quota change to OceanStor
 
-        # Update quota list from this filesystem
-        self.list_quota(devices=ostor_fs_name, update=True)
+        @type change: dict describing the change as generated by _plan_quota_sync
+
+        @returns: tuple with result and error message
+            result: dict of applied query parameters per quota ID on updates, ID of new quota on creation
+        """
+        limits = dict(change["limits"])
+        try:
+            if change["action"] == "update":
+                result = {quota_id: self._change_quota_api(quota_id, **limits) for quota_id in change["quota_ids"]}
+            else:
+                self._default_inode_limits(
+                    change["fs_name"], change["typ"], change["parent"], change["path"], change["who"], limits
+                )
+                result = self._new_quota_api(change["parent"], typ=change["typ"], who=change["who"], **limits)
+        except (OceanStorOperationError, HTTPError, RuntimeError) as err:
+            errmsg = f"syncQuota: failed to {change['action']} {change['typ']} quota of '{change['path']}': {err}"
+            self.log.error(errmsg)
+            return None, str(err)
+
+        return result, None
 
     def _change_quota_api(self, quota_id, **kwargs):
         """
         Modify existing quota in OceanStor
 
         @type quota_id: ID of existing quota
+
+        @returns: dict with query parameters of the applied changes (None in dry-run)
         """
         query_params = self._parse_quota_limits(**kwargs)
 
@@ -1771,9 +4794,142 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         query_params["id"] = quota_id
         if self.dry_run:
             self.log.info("(dryrun) Quota '%s' update query: %s", quota_id, query_params)
-        else:
-            self.session.api.v2.file_service.fs_quota.put(body=query_params)
-            self.log.info("Quota '%s' updated succesfully", quota_id)
+            return None
+
+        self.session.api.v2.file_service.fs_quota.put(body=query_params)
+        self.log.info("Quota '%s' updated succesfully", quota_id)
+
+        return query_params
+
+    def _patch_cached_quota(self, fs_name, typ, quota_id, query_params):
+        """
+        Update attributes of cached quota with the parameters of a query changing it in OceanStor
+
+        @type fs_name: name of filesystem of the quota
+        @type typ: string with type of quota: fileset, user or group
+        @type quota_id: ID of existing quota
+        @type query_params: dict with parameters of the query sent to OceanStor
+        """
+        if query_params is None:
+            return
+
+        # on-disk cache is refreshed on next full listing of quotas
+        self._drop_disk_cache("quotas", fs_name)
+
+        quota_changes = {}
+        for param, value in query_params.items():
+            if param in OCEANSTOR_QUOTA_BLOCK_PARAMS:
+                # block quotas are cached in KiB, queries are always in bytes
+                quota_changes[OCEANSTOR_QUOTA_BLOCK_PARAMS[param]] = int(value // 1024)
+            elif param in OCEANSTOR_QUOTA_FILES_PARAMS:
+                quota_changes[OCEANSTOR_QUOTA_FILES_PARAMS[param]] = value
+            elif param == "soft_grace_time":
+                quota_changes["blockGrace"] = value
+                quota_changes["filesGrace"] = value
+
+        with self._cache_lock:
+            self._quota_changes[fs_name] = self._quota_changes.get(fs_name, 0) + 1
+            for quota_cache in ("oceanstor_quotas", "oceanstor_defaultquotas"):
+                try:
+                    cached_quota = getattr(self, quota_cache)[fs_name][typ][quota_id]
+                except KeyError:
+                    continue
+
+                self._swap_cached_quota(quota_cache, fs_name, typ, cached_quota._replace(**quota_changes))
+                self.log.debug("Updated cached %s quota '%s' with: %s", typ, quota_id, quota_changes)
+
+    def _swap_cached_quota(self, quota_cache, fs_name, quota_type, quota):
+        """
+        Set quota in the cached quotas of given filesystem
+        The collection of quotas of that type is copied, changed and swapped in under the cache lock
+
+        @type quota_cache: string with name of attribute holding the cached quotas
+        @type fs_name: name of filesystem of the quota
+        @type quota_type: string with type of quota: fileset, user or group
+        @type quota: StorageQuota named tuple
+        """
+        with self._cache_lock:
+            fs_quotas = getattr(self, quota_cache)[fs_name]
+            typ_quotas = fs_quotas[quota_type].copy()
+            typ_quotas[quota.id] = quota
+            self._swap_cached(quota_cache, {fs_name: dict(fs_quotas, **{quota_type: typ_quotas})})
+
+    def _cache_new_quota(self, fs_name, quota_id):
+        """
+        Add new quota to the cache of quotas of given filesystem
+        Query the new quota by its ID, the cache of the filesystem is dropped if that fails
+
+        @type fs_name: name of filesystem of the quota
+        @type quota_id: ID of the new quota
+        """
+        # on-disk cache is refreshed on next full listing of quotas
+        self._drop_disk_cache("quotas", fs_name)
+
+        if fs_name not in self.oceanstor_quotas or fs_name not in self.oceanstor_defaultquotas:
+            # quotas of this filesystem are not cached yet
+            return
+
+        query_params = {
+            "id": quota_id,
+            "space_unit_type": OCEANSTOR_QUOTA_UNIT_TYPE["B"],  # bytes
+        }
+
+        try:
+            _, response = self.session.api.v2.file_service.fs_quota.get(**query_params)
+            quota_obj = response["data"]
+            quota_type = QuotaType(quota_obj["quota_type"]).name
+            quota_attributes = self._convert_quota_attributes(quota_obj)
+        except (HTTPError, URLError, RuntimeError, KeyError, TypeError, ValueError) as err:
+            warnmsg = "Failed to retrieve new quota '%s', dropping cached quotas of filesystem '%s': %s"
+            self.log.warning(warnmsg, quota_id, fs_name, err)
+            with self._cache_lock:
+                self._quota_changes[fs_name] = self._quota_changes.get(fs_name, 0) + 1
+                self._swap_cached("oceanstor_quotas", removed=[fs_name])
+                self._swap_cached("oceanstor_defaultquotas", removed=[fs_name])
+            return
+
+        if quota_attributes:
+            quota = StorageQuota(**quota_attributes)
+            if quota.ownerName == OCEANSTOR_QUOTA_DEFAULT_OWNER:
+                quota_cache = "oceanstor_defaultquotas"
+            else:
+                quota_cache = "oceanstor_quotas"
+            with self._cache_lock:
+                self._quota_changes[fs_name] = self._quota_changes.get(fs_name, 0) + 1
+                if fs_name not in getattr(self, quota_cache):
+                    # cached quotas were dropped meanwhile
+                    return
+                self._swap_cached_quota(quota_cache, fs_name, quota_type, quota)
+            self.log.debug("Added new %s quota '%s' to cache of filesystem '%s'", quota_type, quota.id, fs_name)
+
+    def _defer_quota_refresh(self, fs_name):
+        """
+        Mark cached quotas of given filesystem to be refreshed at the end of a deferred_quota_refresh block
+        """
+        if self._deferred_quota_refresh is not None:
+            self._deferred_quota_refresh.add(fs_name)
+
+    @contextmanager
+    def deferred_quota_refresh(self):
+        """
+        Context manager for bulk changes of quotas
+        Cached quotas are updated in place on every change and all quotas of each modified filesystem
+        are requested once more from OceanStor when leaving the context
+        """
+        if self._deferred_quota_refresh is not None:
+            # nested context, refresh happens in outer context
+            yield
+            return
+
+        self._deferred_quota_refresh = set()
+        try:
+            yield
+        finally:
+            refresh_fs = sorted(self._deferred_quota_refresh)
+            self._deferred_quota_refresh = None
+            if refresh_fs:
+                self.log.debug("Refreshing deferred quotas of filesystems: %s", ", ".join(refresh_fs))
+                self.list_quota(devices=refresh_fs, update=True)
 
     def _new_quota_api(self, quota_parent, typ=Typ2Param.USR.value, who=None, **kwargs):
         """
@@ -1782,6 +4938,8 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         @type quota_parent: ID of parent object holding the quota
         @type typ: string with type of quota: fileset, user or group
         @type who: identifier (username for user quota, group name for group quota, ignored for fileset quota)
+
+        @returns: ID of the new quota (None in dry-run or if creation failed)
         """
         if "inode_soft" not in kwargs or kwargs["inode_soft"] is None:
             # Always set the inode limits of new quotas, OceanStor default is too big for the AP
@@ -1822,10 +4980,11 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         if self.dry_run:
             self.log.info("(dryrun) New quota creation query: %s", query_params)
-            return
+            return None
 
         # Attempt the creation of the quota
         # TODO: remove the warning whenever OceanStor allows creating quotas on non-empty filesets
+        new_quota_id = None
         try:
             _, response = self.session.api.v2.file_service.fs_quota.post(body=query_params)
         except RuntimeError:
@@ -1840,6 +4999,8 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
             new_quota_id = response["data"]["id"]
             self.log.info("Quota '%s' created succesfully", new_quota_id)
 
+        return new_quota_id
+
     def _parse_quota_limits(self, soft=None, hard=None, inode_soft=None, inode_hard=None):
         """
         Parse quota limits and generate corresponding query parameters
@@ -1957,16 +5118,18 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
                 errmsg = f"setGrace: {typ} quota of '{quota_path}' not found"
                 self.log.raiseException(errmsg, OceanStorOperationError)
 
+        ostor_fs_id = quota_parent.split("@", 1)[0]
+        ostor_fs_name = next(iter(self.select_filesystems(ostor_fs_id, byid=True)))
+
         # Set grace period
         grace_days = int(round(grace / (24 * 3600)))
         for quota_id in quotas:
             self.log.debug("Sending request to set grace of quota with ID: %s", quota_id)
-            self._set_grace_api(quota_id, grace_days)
+            quota_changes = self._set_grace_api(quota_id, grace_days)
+            self._patch_cached_quota(ostor_fs_name, typ, quota_id, quota_changes)
 
-        # Update quota list from this filesystem
-        ostor_fs_id = quota_parent.split("@", 1)[0]
-        ostor_fs_name = next(iter(self.select_filesystems(ostor_fs_id, byid=True)))
-        self.list_quota(devices=ostor_fs_name, update=True)
+        # Quota cache was updated in place, refresh the complete filesystem if deferred
+        self._defer_quota_refresh(ostor_fs_name)
 
     def _set_grace_api(self, quota_id, grace):
         """
@@ -1974,6 +5137,8 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         @type quota_id: ID of existing quota
         @type grace: int with grace period in days
+
+        @returns: dict with query parameters of the applied changes (None in dry-run)
         """
         # Modify existing quota
         query_params = {
@@ -1983,9 +5148,12 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
 
         if self.dry_run:
             self.log.info("(dryrun) Grace period of quota '%s' update query: %s", quota_id, query_params)
-        else:
-            self.session.api.v2.file_service.fs_quota.put(body=query_params)
-            self.log.info("Grace period of quota '%s' updated succesfully: %s days", quota_id, grace)
+            return None
+
+        self.session.api.v2.file_service.fs_quota.put(body=query_params)
+        self.log.info("Grace period of quota '%s' updated succesfully: %s days", quota_id, grace)
+
+        return query_params
 
     @staticmethod
     def determine_grace_periods(quota):
@@ -2133,7 +5301,31 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
         @type filesystem: name of the filesystem
         @type fileset: name of the dtree fileset
         """
+        filter_json = self._snapshot_filter(filesystem, fileset)
+        _, response = self.session.api.v2.file_service.snapshots.get(pagination=True, filter=filter_json)
+
+        return [snap["name"] for snap in response["data"]]
+
+    def iter_snapshots(self, filesystem, fileset=None):
+        """
+        Query the snapshots in the given filesystem or dtree fileset page by page
+        Return generator of snapshot names
+
+        @type filesystem: name of the filesystem
+        @type fileset: name of the dtree fileset
+        """
+        filter_json = self._snapshot_filter(filesystem, fileset)
+        snapshots = self.session.api.v2.file_service.snapshots.get(pagination=True, stream=True, filter=filter_json)
+
+        return (snap["name"] for snap in snapshots)
+
+    def _snapshot_filter(self, filesystem, fileset=None):
+        """
+        Return JSON filter of snapshot queries in the given filesystem or dtree fileset
 
+        @type filesystem: name of the filesystem
+        @type fileset: name of the dtree fileset
+        """
         fs = self.get_filesystem_info(filesystem)
         filter_json = {"file_system_id": int(fs["id"])}
 
@@ -2144,10 +5336,7 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
                 self.log.raiseException(err_msg, OceanStorOperationError)
             filter_json["dtree_id"] = dtree["id"]
 
-        filter_json = json.dumps([filter_json], separators=OCEANSTOR_JSON_SEP)
-        _, response = self.session.api.v2.file_service.snapshots.get(pagination=True, filter=filter_json)
-
-        return [snap["name"] for snap in response["data"]]
+        return json.dumps([filter_json], separators=OCEANSTOR_JSON_SEP)
 
     def _file_service_snapshot_api(self, snap_name, fs_name, fileset_name=None, delete=False):
         """
@@ -2183,43 +5372,105 @@ class OceanStorOperations(PosixOperations, metaclass=Singleton):
             if snap_name in snapshots:
                 self.log.error("Snapshot '%s' already exists for filesystem %s!", snap_name, fs_name)
                 return 0
-            if self.dry_run:
-                self.log.info("(dryrun) New snapshot '%s' creation query: %s", snap_name, query_params)
-            else:
-                _, response = self.session.api.v2.file_service.snapshots.post(body=query_params)
-                new_snap_id = response["data"]["id"]
-                self.log.info("New snapshot '%s' created successfully with ID: %s", snap_name, new_snap_id)
+            return self._new_snapshot_api(snap_name, fs_name, fileset_name)
+
+        return True
+
+    def _new_snapshot_api(self, snap_name, fs_name, fileset_name=None):
+        """
+        Create a filesystem or dtree fileset snapshot in OceanStor without checking existing snapshots
+
+        @type snap_name: string representing the name of the new snapshot
+        @type fs_name: name of the filesystem of the new snapshot
+        @type fileset_name: name of the dtree fileset of the new snapshot
+
+        @returns: True on success, errors of the query are raised
+        """
+        query_params = {
+            "name": str(snap_name),
+            "file_system_name": fs_name,
+        }
+        if fileset_name is not None:
+            query_params["dtree_name"] = fileset_name
+
+        if self.dry_run:
+            self.log.info("(dryrun) New snapshot '%s' creation query: %s", snap_name, query_params)
+            return True
+
+        _, response = self.session.api.v2.file_service.snapshots.post(body=query_params)
+        new_snap_id = response["data"]["id"]
+        self.log.info("New snapshot '%s' created successfully with ID: %s", snap_name, new_snap_id)
 
         return True
 
-    def create_filesystem_snapshot(self, fsname, snapname, filesets=None):
+    def _new_fileset_snapshot_api(self, snap_name, fs_name, fileset_name):
+        """
+        Create a dtree fileset snapshot in OceanStor as part of a batch of fileset snapshots
+        Errors of the query are logged instead of raised to not abort the snapshots of other filesets
+
+        @type snap_name: string representing the name of the new snapshot
+        @type fs_name: name of the filesystem of the new snapshot
+        @type fileset_name: name of the dtree fileset of the new snapshot
+
+        @returns: True on success, 0 if the snapshot could not be created
+        """
+        try:
+            return self._new_snapshot_api(snap_name, fs_name, fileset_name)
+        except (HTTPError, RuntimeError) as err:
+            err_code = err.args[0][1] if isinstance(err, RuntimeError) else None
+            if err_code == 33656849:
+                self.log.error("Snapshot '%s' already exists for filesystem %s!", snap_name, fs_name)
+            else:
+                self.log.error("Failed to create snapshot '%s' in filesystem %s: %s", snap_name, fs_name, err)
+            return 0
+
+    def create_filesystem_snapshot(self, fsname, snapname, filesets=None, report=False):
         """
         Create a filesystem snapshot. If filesets is None, it's full system snapshots
         else the snapshot is limited to the list of filesets given.
+        Snapshots of filesets are created concurrently after listing the existing snapshots once.
 
         @type fsname: string representing the name of the filesystem
         @type snapname: string representing the name of the new snapshot
         @type filesets: list of fileset names to take a snapshots of
+        @type report: bool to return the status of the snapshot of each fileset
+
+        @returns: status of the snapshots (True: all created; 0: any not created)
+                  or dict with the status of the snapshot of each fileset if filesets are given with report
         """
-        if filesets is not None:
-            # fileset/dtree snapshot
-            if not isinstance(filesets, list):
-                filesets = [filesets]
+        if filesets is None:
+            # filesystem snapshot
+            return self._file_service_snapshot_api(snapname, fsname, None)
 
-            for fileset in filesets:
-                if self.get_fileset_info(fsname, fileset) is None:
-                    self.log.error("Cannot create snapshot: fileset %s not found on filesystem %s!", fileset, fsname)
-                    return 0
+        # fileset/dtree snapshot
+        if not isinstance(filesets, list):
+            filesets = [filesets]
 
-                # the snapshot namespace of all filesets is shared in OceanStor
-                fileset_snapname = self._fileset_snapshot_name(fileset, snapname)
+        existing_snapshots = set(self.iter_snapshots(fsname))
 
-                new_snap_status = self._file_service_snapshot_api(fileset_snapname, fsname, fileset)
-        else:
-            # filesystem snapshot
-            new_snap_status = self._file_service_snapshot_api(snapname, fsname, None)
+        snap_status = dict.fromkeys(filesets, 0)
+        new_snapshots = []
+        for fileset in snap_status:
+            if self.get_fileset_info(fsname, fileset) is None:
+                self.log.error("Cannot create snapshot: fileset %s not found on filesystem %s!", fileset, fsname)
+                continue
+
+            # the snapshot namespace of all filesets is shared in OceanStor
+            fileset_snapname = self._fileset_snapshot_name(fileset, snapname)
+            if fileset_snapname in existing_snapshots:
+                self.log.error("Snapshot '%s' already exists for filesystem %s!", fileset_snapname, fsname)
+                continue
+
+            new_snapshots.append((fileset, fileset_snapname))
+
+        # snapshots missing from the listing that already exist are reported by OceanStor on creation
+        results = parallel_map(lambda snap: self._new_fileset_snapshot_api(snap[1], fsname, snap[0]), new_snapshots)
+        snap_status.update(zip([fileset for fileset, _ in new_snapshots], results))
+
+        if report:
+            return snap_status
 
-        return new_snap_status
+        return True if all(snap_status.values()) else 0
 
     def delete_filesystem_snapshot(self, fsname, snapname, fileset=None):
         """
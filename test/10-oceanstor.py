@@ -28,7 +28,16 @@ Tests for the VSC OceanStor API.
 @author: Alex Domingo (Vrije Universiteit Brussel)
 """
 import json
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
 import unittest.mock as mock
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
 
 import vsc.filesystem.oceanstor as oceanstor
 from vsc.install.testing import TestCase
@@ -194,6 +203,73 @@ API_RESPONSE = {
             "description": "",
         },
     },
+    "nas_protocol.nfs_share_list": {
+        "data": [
+            {
+                "account_id": "0000000001",
+                "account_name": "test",
+                "description": "/test/dttest",
+                "dtree_id": "10@4097",
+                "file_system_id": "10",
+                "id": "1",
+                "share_path": "/test/dttest/",
+            },
+            {
+                "account_id": "0000000001",
+                "account_name": "test",
+                "description": "/test/dttest2",
+                "dtree_id": "10@4098",
+                "file_system_id": "10",
+                "id": "2",
+                "share_path": "/test/dttest2/",
+            },
+        ],
+        "result": {
+            "code": 0,
+            "description": "",
+        },
+    },
+    "nas_protocol.nfs_share_auth_client_list": {
+        "data": [
+            {
+                "access_name": "10.141.0.0/16",
+                "access_value": 1,
+                "all_squash": 1,
+                "id": "1",
+                "root_squash": 0,
+                "share_id": "1",
+                "sync": 0,
+            },
+            {
+                "access_name": "10.143.0.0/16",
+                "access_value": 0,
+                "all_squash": 1,
+                "id": "2",
+                "root_squash": 0,
+                "share_id": "1",
+                "sync": 0,
+            },
+            {
+                "access_name": "10.141.0.0/16",
+                "access_value": 1,
+                "all_squash": 1,
+                "id": "3",
+                "root_squash": 0,
+                "share_id": "2",
+                "sync": 0,
+            },
+            {
+                "access_name": "10.141.0.0/16",
+                "access_value": 1,
+                "id": "4",
+                "share_id": "99",
+            },
+        ],
+        "result": {
+            "code": 0,
+            "description": "",
+        },
+    },
     "file_service.snapshots.fs": {
         "data": [
             {
@@ -258,6 +334,114 @@ API_RESPONSE = {
             "description": "",
         },
     },
+    "file_service.fs_quota": {
+        "data": [
+            {
+                "id": "10@4097@1",
+                "resuse_name": "dttest",
+                "quota_type": 1,
+                "parent_id": "10@4097",
+                "parent_type": 16445,
+                "space_unit_type": 0,
+                "space_used": 1048576,
+                "space_soft_quota": 268435456,
+                "space_hard_quota": 281857228,
+                "file_used": 10,
+                "file_soft_quota": 1950,
+                "file_hard_quota": 2048,
+                "soft_grace_time": 7,
+                "usr_grp_owner_name": "",
+                "usr_grp_type": 0,
+            },
+            {
+                "id": "10@4097@2",
+                "resuse_name": "dttest",
+                "quota_type": 2,
+                "parent_id": "10@4097",
+                "parent_type": 16445,
+                "space_unit_type": 0,
+                "space_used": 0,
+                "space_soft_quota": 124830,
+                "space_hard_quota": 131072,
+                "file_used": 0,
+                "file_soft_quota": 975,
+                "file_hard_quota": 1024,
+                "soft_grace_time": 7,
+                "usr_grp_owner_name": "All User",
+                "usr_grp_type": 1,
+            },
+            {
+                "id": "10@4097@3",
+                "resuse_name": "dttest",
+                "quota_type": 2,
+                "parent_id": "10@4097",
+                "parent_type": 16445,
+                "space_unit_type": 0,
+                "space_used": 2048,
+                "space_soft_quota": 124830,
+                "space_hard_quota": 131072,
+                "file_used": 2,
+                "file_soft_quota": 975,
+                "file_hard_quota": 1024,
+                "soft_grace_time": 7,
+                "usr_grp_owner_name": "vsc10001",
+                "usr_grp_type": 3,
+            },
+            {
+                "id": "10@0@4",
+                "resuse_name": "test",
+                "quota_type": 1,
+                "parent_id": "10",
+                "parent_type": 40,
+                "space_unit_type": 0,
+                "space_used": 0,
+                "space_soft_quota": 0,
+                "space_hard_quota": 0,
+                "file_used": 0,
+                "file_soft_quota": 0,
+                "file_hard_quota": 0,
+                "soft_grace_time": 0,
+                "usr_grp_owner_name": "",
+                "usr_grp_type": 0,
+            },
+        ],
+        "result": {
+            "code": 0,
+            "description": "",
+        },
+    },
+    "file_service.fs_quota.post": {
+        "data": {
+            "id": "10@4097@5",
+        },
+        "result": {
+            "code": 0,
+            "description": "",
+        },
+    },
+    "file_service.fs_quota.new": {
+        "data": {
+            "id": "10@4097@5",
+            "resuse_name": "dttest",
+            "quota_type": 2,
+            "parent_id": "10@4097",
+            "parent_type": 16445,
+            "space_unit_type": 0,
+            "space_used": 0,
+            "space_soft_quota": 1048576,
+            "space_hard_quota": 2097152,
+            "file_used": 0,
+            "file_soft_quota": 975,
+            "file_hard_quota": 1024,
+            "soft_grace_time": 7,
+            "usr_grp_owner_name": "vsc10002",
+            "usr_grp_type": 3,
+        },
+        "result": {
+            "code": 0,
+            "description": "",
+        },
+    },
     "dfv.service.obsOSC.supportAPI.get": {
         "data": {
             "supportAPI": "COMPATIBLE",
@@ -303,7 +487,7 @@ def api_response_dtree_post_side_effect(body, **kwargs):
     return (0, response)
 
 
-def api_response_snapshots_side_effect(filter=None, *args, **kwargs):
+def api_response_snapshots_side_effect(filter=None, *args, stream=False, **kwargs):
     """
     Mock GET responses of file_service/snapshots depending on filter
     """
@@ -315,15 +499,84 @@ def api_response_snapshots_side_effect(filter=None, *args, **kwargs):
         else:
             response = API_RESPONSE["file_service.snapshots.fs"]
 
+    if stream:
+        return iter(response["data"])
+
     return (0, response)
 
 
-def api_response_account_side_effect(filter=None, **kwargs):
+def api_response_snapshots_post_side_effect(body=None, *args, **kwargs):
+    """
+    Mock POST responses of file_service/snapshots depending on existing snapshots
+    """
+    existing_snapshots = [
+        snap["name"]
+        for fixture in ("file_service.snapshots.fs", "file_service.snapshots.dtree")
+        for snap in API_RESPONSE[fixture]["data"]
+    ]
+    if body["name"] in existing_snapshots:
+        raise RuntimeError(("OceanStor query returned non-zero exit code", 33656849, "already exists"))
+
+    return (0, API_RESPONSE["file_service.snapshots.post"])
+
+
+def api_response_fs_quota_side_effect(parent_id=None, id=None, stream=False, **kwargs):
+    """
+    Mock GET responses of file_service/fs_quota depending on the parent filesystem or quota ID
+    """
+    response = {"data": []}
+
+    if str(parent_id) == "10":
+        response = API_RESPONSE["file_service.fs_quota"]
+    elif id is not None:
+        if id == API_RESPONSE["file_service.fs_quota.new"]["data"]["id"]:
+            return (0, API_RESPONSE["file_service.fs_quota.new"])
+        raise RuntimeError(f"Quota '{id}' not found")
+
+    if stream:
+        return iter(response["data"])
+
+    return (0, response)
+
+
+def api_response_nfs_share_side_effect(filter=None, **kwargs):
+    """
+    Mock GET responses of nas_protocol/nfs_share_list depending on filesystem ID in filter
+    """
+    response = {"data": []}
+
+    fs_id = json.loads(filter)[0]["fs_id"]
+    response["data"] = [
+        ns for ns in API_RESPONSE["nas_protocol.nfs_share_list"]["data"] if ns["file_system_id"] == fs_id
+    ]
+
+    return (0, response)
+
+
+def api_response_nfs_client_side_effect(filter=None, pagination=False, **kwargs):
+    """
+    Mock GET responses of nas_protocol/nfs_share_auth_client_list depending on share ID in filter
+    """
+    unfilter_response = API_RESPONSE["nas_protocol.nfs_share_auth_client_list"]
+
+    if filter is None:
+        return (0, unfilter_response)
+
+    share_id = json.loads(filter)[0]["share_id"]
+    response = {"data": [nc for nc in unfilter_response["data"] if nc["share_id"] == share_id]}
+
+    return (0, response)
+
+
+def api_response_account_side_effect(filter=None, stream=False, **kwargs):
     """
     Mock GET responses of account/accounts depending on filters
     """
     unfilter_response = API_RESPONSE["account.accounts"]
 
+    if stream:
+        return iter(unfilter_response["data"])
+
     if filter is None:
         return (0, unfilter_response)
 
@@ -401,6 +654,100 @@ def api_response_bucket_exists_side_effect(body, **kwargs):
     return (0, response)
 
 
+class FakeOceanStorHandler(BaseHTTPRequestHandler):
+    """
+    Minimal HTTP/1.1 server of OceanStor REST API responses
+    """
+
+    protocol_version = "HTTP/1.1"
+    # number of items in paginated queries
+    total_items = 95
+    # X-Auth-Tokens issued by the server, only the last one is valid
+    issued_tokens = []
+    # number of remaining transient failures per path: HTTP 503 for /api/v2/unavailable and busy system otherwise
+    failures = {}
+
+    def _transient_failure(self, path):
+        """Send transient failure response if any is left for given path"""
+        if self.failures.get(path, 0) <= 0:
+            return False
+
+        self.failures[path] -= 1
+        if path == "/api/v2/unavailable":
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            body = b""
+        else:
+            self.send_response(200)
+            result = {"code": 1077949006, "description": "The system is busy."}
+            body = json.dumps({"data": {}, "result": result}).encode()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        result = {"code": 0, "description": ""}
+
+        if self._transient_failure(self.path):
+            return
+
+        if self.path == "/api/v2/aa/sessions":
+            self.issued_tokens.append(f"token-{len(self.issued_tokens)}")
+            data = {"x_auth_token": self.issued_tokens[-1]}
+        else:
+            data = {}
+        self.send_response(200)
+        body = json.dumps({"data": data, "result": result}).encode()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        result = {"code": 0, "description": ""}
+
+        if self._transient_failure(url.path):
+            return
+
+        if url.path == "/api/v2/missing":
+            self.send_response(404)
+            body = b""
+        elif url.path == "/api/v2/forbidden":
+            self.send_response(401)
+            body = b""
+        elif url.path == "/api/v2/secure":
+            if self.issued_tokens and self.headers.get("X-Auth-Token") == self.issued_tokens[-1]:
+                self.send_response(200)
+                body = json.dumps({"data": [], "result": result}).encode()
+            else:
+                self.send_response(401)
+                body = b""
+        elif url.path == "/api/v2/items/count":
+            self.send_response(200)
+            body = json.dumps({"data": {"count": self.total_items}, "result": result}).encode()
+        elif url.path == "/api/v2/items":
+            query_range = json.loads(query["range"][0])
+            first = query_range["offset"]
+            last = min(first + query_range["limit"], self.total_items)
+            self.send_response(200)
+            body = json.dumps({"data": [{"id": n} for n in range(first, last)], "result": result}).encode()
+        else:
+            self.send_response(200)
+            body = json.dumps({"data": [], "result": result}).encode()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
 class StorageTest(TestCase):
     """
     Tests for various storage functions in the oceanstor lib.
@@ -410,10 +757,10 @@ class StorageTest(TestCase):
     session = rest_client.return_value
     # static queries
     session.api.v2.data_service.storagepool.get.return_value = (0, API_RESPONSE["data_service.storagepool"])
-    session.api.v2.file_service.snapshots.post.return_value = (0, API_RESPONSE["file_service.snapshots.post"])
     session.api.v2.file_service.snapshots.delete.return_value = (0, API_RESPONSE["file_service.snapshots.delete"])
     session.api.v2.converged_service.snapshots.post.return_value = (0, API_RESPONSE["converged_service.snapshots.post"])
     session.api.v2.converged_service.snapshots.delete.return_value = (0, API_RESPONSE["converged_service.snapshots.delete"])
+    session.api.v2.file_service.fs_quota.post.return_value = (0, API_RESPONSE["file_service.fs_quota.post"])
     session.dfv.service.obsOSC.supportAPI.get.return_value = (0, API_RESPONSE["dfv.service.obsOSC.supportAPI.get"])
     # queries with variable outcome depending on filter arguments
     session.api.v2.get.side_effect = api_response_get_side_effect
@@ -421,9 +768,15 @@ class StorageTest(TestCase):
     session.api.v2.file_service.dtrees.get.side_effect = api_response_dtree_side_effect
     session.api.v2.file_service.dtrees.post.side_effect = api_response_dtree_post_side_effect
     session.api.v2.file_service.snapshots.get.side_effect = api_response_snapshots_side_effect
+    session.api.v2.file_service.snapshots.post.side_effect = api_response_snapshots_post_side_effect
+    session.api.v2.file_service.fs_quota.get.side_effect = api_response_fs_quota_side_effect
     session.api.v2.converged_service.namespaces.get.side_effect = api_response_namespaces_side_effect
     session.api.v2.converged_service.snapshots.get.side_effect = api_response_namespace_snapshots_side_effect
     session.dfv.service.obsOSC.bucket_exists.post.side_effect = api_response_bucket_exists_side_effect
+    session.api.v2.nas_protocol.nfs_share_list.get.side_effect = api_response_nfs_share_side_effect
+    session.api.v2.nas_protocol.nfs_share_auth_client_list.get.side_effect = api_response_nfs_client_side_effect
+    session.api.v2.nas_protocol.nfs_share.post.return_value = (0, {"data": {"id": "3"}})
+    session.api.v2.nas_protocol.nfs_share_auth_client.post.return_value = (0, {"data": {"id": "10"}})
 
     # mock VscStorage
     mock_options = mock.Mock()
@@ -455,6 +808,40 @@ class StorageTest(TestCase):
         self.assertEqual(O.get_account_info("test"), account_reference)
         self.assertRaises(oceanstor.OceanStorOperationError, O.get_account_info, "nonexistent")
 
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_lazy_init(self):
+        account_get = self.session.api.v2.account.accounts.get
+        objapi_get = self.session.dfv.service.obsOSC.supportAPI.get
+        with mock.patch.dict(oceanstor.OceanStorOperations._instances, clear=True):
+            account_calls = account_get.call_count
+            objapi_calls = objapi_get.call_count
+            storage_calls = self.vsc_storage.call_count
+
+            # constructor does not query OceanStor nor parse the VSC configuration
+            O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+            self.assertEqual(account_get.call_count, account_calls)
+            self.assertEqual(objapi_get.call_count, objapi_calls)
+            self.assertEqual(self.vsc_storage.call_count, storage_calls)
+
+            # first use of each attribute initialises it once
+            self.assertEqual(O.account["name"], "oceanstor_account")
+            self.assertTrue(O.objapi_access)
+            self.assertEqual(O.host_institute, "test_host_inst")
+            self.assertEqual(len(O.vsc_storage), 1)
+            self.assertEqual(account_get.call_count, account_calls + 1)
+            self.assertEqual(objapi_get.call_count, objapi_calls + 1)
+            self.assertEqual(self.vsc_storage.call_count, storage_calls + 1)
+
+            for _ in range(10):
+                self.assertEqual(O.account["name"], "oceanstor_account")
+                self.assertTrue(O.objapi_access)
+                self.assertEqual(len(O.vsc_storage), 1)
+            self.assertEqual(account_get.call_count, account_calls + 1)
+            self.assertEqual(objapi_get.call_count, objapi_calls + 1)
+            self.assertEqual(self.vsc_storage.call_count, storage_calls + 1)
+
     @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
     @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
     @mock.patch("vsc.config.base.VscOptions", vsc_options)
@@ -467,6 +854,13 @@ class StorageTest(TestCase):
         ]
         self.assertEqual(O.list_active_accounts(), accounts_reference)
 
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_iter_active_accounts(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        self.assertEqual(list(O.iter_active_accounts()), O.list_active_accounts())
+
     @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
     @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
     @mock.patch("vsc.config.base.VscOptions", vsc_options)
@@ -556,8 +950,13 @@ class StorageTest(TestCase):
             },
         }
         O.oceanstor_account_namespaces = ns_outdated
-        self.assertEqual(O.list_namespaces(), ns_outdated)
+        # only the outdated account is cached, other accounts are requested
+        self.assertEqual(O.list_namespaces(), dict(ns_ref_full, **ns_outdated))
+        # refreshed namespaces are swapped in, previous references are left untouched
+        previous_namespaces = O.oceanstor_namespaces
         self.assertEqual(O.list_namespaces(update=True), ns_ref_full)
+        self.assertIsNot(O.oceanstor_namespaces, previous_namespaces)
+        self.assertIn("outdated", previous_namespaces)
 
     @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
     @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
@@ -582,6 +981,29 @@ class StorageTest(TestCase):
         self.assertEqual(O._is_bucket("object"), True)
         self.assertRaises(oceanstor.OceanStorOperationError, O._is_bucket, "nonexistent")
 
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_are_buckets(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        bucket_exists = self.session.dfv.service.obsOSC.bucket_exists.post
+
+        O.oceanstor_bucket_attrs = {}
+        bucket_exists.reset_mock()
+        bucket_reference = {"test": False, "data": False, "object": True}
+        self.assertEqual(O._are_buckets(["test", "data", "object"]), bucket_reference)
+        self.assertEqual(bucket_exists.call_count, 3)
+        self.assertEqual(O.oceanstor_bucket_attrs, {10: False, 11: False, 20: True})
+
+        # bucket attributes are cached
+        bucket_exists.reset_mock()
+        self.assertEqual(O._are_buckets(["test", "data", "object"]), bucket_reference)
+        self.assertEqual(O.list_buckets(update=True)["0000000001"], {"object": O.oceanstor_namespaces["object"]})
+        self.assertEqual(list(O.list_filesystems(update=True)), ["test", "data"])
+        self.assertEqual(bucket_exists.call_count, 0)
+
+        self.assertRaises(oceanstor.OceanStorOperationError, O._are_buckets, ["test", "nonexistent"])
+
     @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
     @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
     @mock.patch("vsc.config.base.VscOptions", vsc_options)
@@ -624,7 +1046,8 @@ class StorageTest(TestCase):
             },
         }
         O.oceanstor_buckets = ns_outdated
-        self.assertEqual(O.list_buckets(), ns_outdated)
+        # only the outdated account is cached, other accounts are requested
+        self.assertEqual(O.list_buckets(), dict(ns_ref_full, **ns_outdated))
         self.assertEqual(O.list_buckets(update=True), ns_ref_full)
 
     @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
@@ -755,6 +1178,626 @@ class StorageTest(TestCase):
         self.assertEqual(O.list_filesets(devices="test", filesetnames="dttest", update=True), {"test": dt_test})
         self.assertEqual(O.list_filesets(update=True), dt_reference)
 
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_list_filesets_details(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        dtrees_get = self.session.api.v2.file_service.dtrees.get
+
+        # skip details of filesets
+        dtrees_get.reset_mock()
+        dt_skip = O.list_filesets(devices="test", update=True, details="skip")
+        self.assertEqual(dtrees_get.call_count, 1)
+        self.assertFalse(any("parent_dir" in dt for dt in dt_skip["test"].values()))
+
+        # resolve details on first access
+        dtrees_get.reset_mock()
+        dt_lazy = O.list_filesets(devices="test", details="lazy")
+        self.assertEqual(dtrees_get.call_count, 0)
+        self.assertEqual(dt_lazy["test"]["10@4097"]["parent_dir"], "/test")
+        self.assertEqual(dtrees_get.call_count, 1)
+        self.assertEqual(dt_lazy["test"]["10@4097"]["parent_dir"], "/test")
+        self.assertEqual(dtrees_get.call_count, 1)
+        self.assertRaises(KeyError, lambda: dt_lazy["test"]["10@4097"]["nonexistent"])
+
+        # get() and membership tests also resolve details
+        dt_get, dt_contains = [dt for dt_id, dt in sorted(dt_lazy["test"].items()) if dt_id != "10@4097"][:2]
+        self.assertEqual(dt_get.get("parent_dir"), "/test")
+        self.assertEqual(dtrees_get.call_count, 2)
+        self.assertEqual(dt_get.get("nonexistent", "default"), "default")
+        self.assertTrue("parent_dir" in dt_contains)
+        self.assertEqual(dtrees_get.call_count, 3)
+        self.assertFalse("nonexistent" in dt_contains)
+
+        # resolve remaining details of cached filesets
+        dtrees_get.reset_mock()
+        dt_eager = O.list_filesets(devices="test")
+        self.assertEqual(dtrees_get.call_count, 0)
+        self.assertTrue(all(dt["parent_dir"] == "/test" for dt in dt_eager["test"].values()))
+
+        # repeated lazy listings do not resolve pending details, eager ones resolve them concurrently
+        O.list_filesets(devices="test", update=True, details="skip")
+        dtrees_get.reset_mock()
+        O.list_filesets(devices="test", details="lazy")
+        lazy_dtree = O.list_filesets(devices="test", details="lazy")["test"]
+        self.assertEqual(dtrees_get.call_count, 0)
+        self.assertTrue(O.oceanstor_filesets["test"] is lazy_dtree)
+        with mock.patch.object(oceanstor, "parallel_map", wraps=oceanstor.parallel_map) as parallel_map:
+            self.assertEqual(O.get_fileset_info("test", "dttest")["parent_dir"], "/test")
+        self.assertEqual(dtrees_get.call_count, 3)
+        self.assertEqual(len(parallel_map.call_args[0][1]), 3)
+        # resolved dtrees are swapped in, previous collection is left untouched
+        self.assertFalse(O.oceanstor_filesets["test"] is lazy_dtree)
+        self.assertFalse(any(dict.__contains__(dt, "parent_dir") for dt in lazy_dtree.values()))
+        dtrees_get.reset_mock()
+        O.get_fileset_info("test", "dttest")
+        self.assertEqual(dtrees_get.call_count, 0)
+
+        self.assertRaises(oceanstor.OceanStorOperationError, O.list_filesets, devices="test", details="nonexistent")
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_resolve_addresses(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        O.dns_cache.clear()
+
+        dns_records = {"nfs1.example.org": "10.0.0.1", "nfs2.example.org": "10.0.0.2", "10.0.0.3": "10.0.0.3"}
+        with mock.patch("vsc.filesystem.oceanstor.gethostbyname", side_effect=dns_records.get) as gethostbyname:
+            self.assertEqual(O._resolve_addresses(dns_records), dns_records)
+            self.assertEqual(gethostbyname.call_count, 3)
+
+            # resolved addresses are cached
+            self.assertEqual(O._resolve_addresses(["nfs1.example.org"]), {"nfs1.example.org": "10.0.0.1"})
+            self.assertEqual(gethostbyname.call_count, 3)
+
+            # expired addresses are resolved again
+            O.dns_cache["nfs2.example.org"] = ("10.0.0.2", 0)
+            nfs_addresses = ["nfs1.example.org", "nfs2.example.org"]
+            self.assertEqual(O._resolve_addresses(nfs_addresses), {addr: dns_records[addr] for addr in nfs_addresses})
+            gethostbyname.assert_called_with("nfs2.example.org")
+            self.assertEqual(gethostbyname.call_count, 4)
+
+        O.dns_cache.clear()
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_identify_local_path(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        O.local_paths.clear()
+        O._mount_table_fingerprint = None
+        local_object = ("10", "4097", "/tmp", "/")
+
+        mount_table = ["mounts-a", "mounts-a", "mounts-a", "mounts-b", None, None]
+        with mock.patch.object(O, "_read_mount_table_fingerprint", side_effect=mount_table), \
+             mock.patch.object(O, "_resolve_local_path", return_value=local_object) as resolve_local_path, \
+             mock.patch.dict(O.local_paths_stats, {"hits": 0, "misses": 0, "invalidations": 0}):
+            self.assertEqual(O._identify_local_path("/tmp/dttest"), local_object)
+            self.assertEqual(O._identify_local_path("/tmp/dttest/"), local_object)
+            self.assertEqual(O._identify_local_path("/tmp/./dttest"), local_object)
+            self.assertEqual(resolve_local_path.call_count, 1)
+            self.assertEqual(O.local_paths_cache_info(), {"hits": 2, "misses": 1, "invalidations": 0, "size": 1})
+
+            # changes in the mount table invalidate the cache
+            O._identify_local_path("/tmp/dttest")
+            self.assertEqual(resolve_local_path.call_count, 2)
+            self.assertEqual(O.local_paths_cache_info(), {"hits": 2, "misses": 2, "invalidations": 1, "size": 1})
+
+            # nothing is cached without mount table
+            O._identify_local_path("/tmp/dttest")
+            O._identify_local_path("/tmp/dttest")
+            self.assertEqual(resolve_local_path.call_count, 4)
+            self.assertEqual(O.local_paths_cache_info()["size"], 0)
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_get_fileset_local_path(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        O.list_filesets(devices="test", update=True)
+
+        def local_filesystems():
+            O.localfilesystemnaming = ["type", "mountpoint", "id", "device", "oceanstor"]
+            O.localfilesystems = [
+                ["nfs4", "/mnt/test", 0, "nfs.example.org:/test", "10@0"],
+                ["ext4", "/", 0, "/dev/sda1", None],
+                ["nfs4", "/mnt/dttest", 0, "nfs.example.org:/test/dttest", "10@4097"],
+                ["nfs4", "/mnt/broken", 0, "broken.example.org:/broken", oceanstor.LOCAL_FS_UNRESOLVED],
+            ]
+
+        mount_table = ["mounts-a"] * 3 + ["mounts-b"]
+        with mock.patch.object(O, "_read_mount_table_fingerprint", side_effect=mount_table), \
+             mock.patch("vsc.filesystem.oceanstor.gethostbyname", side_effect=OSError("unknown host")), \
+             mock.patch.object(O, "_local_filesystems", side_effect=local_filesystems) as mock_local_filesystems:
+            O.localfilesystems = None
+            O._mount_table_fingerprint = None
+            self.assertEqual(O.get_fileset_local_path("10@0"), "/mnt/test")
+            self.assertEqual(O.get_fileset_local_path("10@4097"), "/mnt/dttest")
+            # last mount wins
+            self.assertEqual(O.get_fileset_local_path("10@4098"), "/mnt/dttest/test/dttest2")
+            self.assertEqual(mock_local_filesystems.call_count, 1)
+
+            # changes in the mount table rebuild the map
+            self.assertEqual(O.get_fileset_local_path("nonexistent"), None)
+            self.assertEqual(mock_local_filesystems.call_count, 2)
+
+        O.localfilesystems = None
+        O.fileset_local_paths = None
+        O._mount_table_fingerprint = None
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_local_filesystem_id(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        O.localfilesystemnaming = ["type", "mountpoint", "id", "device", "oceanstor"]
+        unresolved = oceanstor.LOCAL_FS_UNRESOLVED
+        mount_dttest = ["nfs4", "/mnt/dttest", 0, "nfs.example.org:/test/dttest/", unresolved]
+        mount_unknown = ["nfs4", "/mnt/unknown", 0, "nfs.example.org:/unknown", unresolved]
+        mount_other = ["nfs4", "/mnt/other", 0, "other.example.org:/other", unresolved]
+
+        dns_records = {"nfs.example.org": "10.0.0.1", "other.example.org": "10.0.0.2"}
+        nfs_shares = {"test": {"1": {"share_path": "/test/dttest", "dtree_id": "10@4097"}}}
+        with mock.patch("vsc.filesystem.oceanstor.gethostbyname", side_effect=dns_records.get), \
+             mock.patch.object(O, "list_nfs_servers", return_value={oceanstor.IPv4Address("10.0.0.1")}), \
+             mock.patch.object(O, "list_nfs_shares", return_value=nfs_shares) as list_nfs_shares:
+            self.assertEqual(O._local_filesystem_id(mount_dttest), "10@4097")
+            self.assertEqual(O._local_filesystem_id(mount_dttest), "10@4097")
+            self.assertEqual(list_nfs_shares.call_count, 1)
+            # mounts are identified independently of each other
+            self.assertRaises(oceanstor.OceanStorOperationError, O._local_filesystem_id, mount_unknown)
+            self.assertEqual(O._local_filesystem_id(mount_other), None)
+            self.assertEqual(mount_unknown[-1], unresolved)
+
+            # servers of all pending mounts are resolved at once and NFS shares listed once
+            O.dns_cache.clear()
+            list_nfs_shares.reset_mock()
+            mount_dttest[-1] = mount_other[-1] = unresolved
+            O.localfilesystems = [mount_dttest, mount_unknown, mount_other]
+            O.fileset_local_paths = None
+            with mock.patch.object(O, "_check_mount_table", return_value=True), \
+                 mock.patch.object(O, "_resolve_addresses", wraps=O._resolve_addresses) as resolve_addresses:
+                self.assertEqual(O.get_fileset_local_path("10@4097"), "/mnt/dttest")
+            resolve_addresses.assert_called_once()
+            self.assertEqual(sorted(resolve_addresses.call_args[0][0]), ["nfs.example.org"] * 2 + ["other.example.org"])
+            self.assertEqual(list_nfs_shares.call_count, 1)
+            self.assertEqual(mount_other[-1], None)
+
+        O.dns_cache.clear()
+        O.localfilesystems = None
+        O.fileset_local_paths = None
+
+    def test_name_index(self):
+        filesystems = {"fs1": {"id": 1, "name": "fs1"}, "fs2": {"id": 2, "name": "fs2"}}
+        name_index = oceanstor.OceanStorNameIndex().sync(filesystems)
+        self.assertEqual(name_index.get_name(2), "fs2")
+        self.assertEqual(name_index.get_id("fs1"), 1)
+        self.assertEqual(name_index.get_name(3), None)
+        self.assertEqual(name_index.get_name(3, default="3"), "3")
+
+        # index follows changes in its collection
+        filesystems["fs3"] = {"id": 3, "name": "fs3"}
+        self.assertEqual(name_index.sync(filesystems).get_name(3), "fs3")
+        self.assertEqual(name_index.sync({"fs4": {"id": 1, "name": "fs4"}}).get_name(1), "fs4")
+        self.assertEqual(name_index.get_id("fs1"), None)
+
+        # collections from OceanStor track changes that keep their size
+        namespaces = oceanstor.OceanStorCollection(ns1={"id": 1, "name": "ns1"}, ns2={"id": 2, "name": "ns2"})
+        ns_index = oceanstor.OceanStorNameIndex().sync(namespaces)
+        self.assertEqual(ns_index.get_name(2), "ns2")
+        del namespaces["ns2"]
+        namespaces["ns2-renamed"] = {"id": 2, "name": "ns2-renamed"}
+        self.assertEqual(ns_index.sync(namespaces).get_name(2), "ns2-renamed")
+        self.assertEqual(ns_index.get_id("ns2"), None)
+        namespaces.update(ns3={"id": 3, "name": "ns3"})
+        self.assertEqual(ns_index.sync(namespaces).get_id("ns3"), 3)
+
+        # versions are unique across collections
+        collection_a, collection_b = oceanstor.OceanStorCollection(), oceanstor.OceanStorCollection()
+        self.assertNotEqual(collection_a.version, collection_b.version)
+        version_a = collection_a.version
+        collection_a.setdefault("key", "value")
+        self.assertNotEqual(collection_a.version, version_a)
+        version_a = collection_a.version
+        collection_a.setdefault("key", "other value")
+        self.assertEqual(collection_a.version, version_a)
+
+        pools = {"pool": {"storagePoolId": 0, "storagePoolName": "pool"}}
+        pool_index = oceanstor.OceanStorNameIndex(id_attr="storagePoolId", name_attr="storagePoolName")
+        self.assertEqual(pool_index.sync(pools).get_id("pool"), 0)
+
+    def test_inventory_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cache_path = os.path.join(cache_dir, "oceanstor")
+            # permissions of the cache do not rely on the umask of the process
+            with mock.patch("os.umask", side_effect=AssertionError("umask of process changed")):
+                disk_cache = oceanstor.OceanStorInventoryCache("https://oceanstor|vsc", cache_dir=cache_path)
+            self.assertEqual(stat.S_IMODE(os.stat(cache_path).st_mode), 0o700)
+            self.assertEqual(stat.S_IMODE(os.stat(disk_cache.path).st_mode), 0o600)
+
+            disk_cache.set("filesets", "test", [{"id": "10@1", "name": "dt1"}])
+            self.assertEqual(stat.S_IMODE(os.stat(disk_cache.path + "-wal").st_mode), 0o600)
+            disk_cache.set("quotas", "test", [("user", [1, "dt1"])])
+            self.assertEqual(disk_cache.get("filesets", "test"), [{"id": "10@1", "name": "dt1"}])
+            self.assertEqual(disk_cache.get("quotas", "test"), [["user", [1, "dt1"]]])
+            self.assertEqual(disk_cache.get("filesets", "other"), None)
+
+            # entries are shared between processes of the same scope
+            other_cache = oceanstor.OceanStorInventoryCache("https://oceanstor|vsc", cache_dir=cache_path)
+            self.assertEqual(other_cache.get("filesets", "test"), [{"id": "10@1", "name": "dt1"}])
+            other_scope = oceanstor.OceanStorInventoryCache("https://oceanstor|other", cache_dir=cache_path)
+            self.assertEqual(other_scope.get("filesets", "test"), None)
+
+            # expired entries
+            disk_cache.ttl["nfsshares"] = -1
+            disk_cache.set("nfsshares", "test", [])
+            self.assertEqual(disk_cache.get("nfsshares", "test"), None)
+
+            disk_cache.invalidate("filesets", "test")
+            self.assertEqual(other_cache.get("filesets", "test"), None)
+            self.assertEqual(other_cache.get("quotas", "test"), [["user", [1, "dt1"]]])
+            disk_cache.invalidate()
+            self.assertEqual(other_cache.get("quotas", "test"), None)
+
+            for cache in (disk_cache, other_cache, other_scope):
+                cache.close()
+        finally:
+            shutil.rmtree(cache_dir)
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_list_disk_cache(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+
+        cache_dir = tempfile.mkdtemp()
+        disk_cache = oceanstor.OceanStorInventoryCache("https://oceanstor|vsc", cache_dir=cache_dir)
+        dtrees_get = self.session.api.v2.file_service.dtrees.get
+        fs_quota_get = self.session.api.v2.file_service.fs_quota.get
+        try:
+            with mock.patch.object(O, "disk_cache", disk_cache):
+                filesets = O.list_filesets(devices="test", update=True)
+                quotas = O.list_quota(devices="test", update=True)
+
+                # start with empty caches in memory
+                del O.oceanstor_filesets["test"]
+                del O.oceanstor_quotas["test"]
+                dtrees_get.reset_mock()
+                fs_quota_get.reset_mock()
+
+                self.assertEqual(O.list_filesets(devices="test"), filesets)
+                self.assertEqual(O.list_quota(devices="test"), quotas)
+                self.assertFalse(dtrees_get.called)
+                self.assertFalse(fs_quota_get.called)
+                self.assertTrue(isinstance(O.oceanstor_filesets["test"]["10@4097"], oceanstor.OceanStorDtree))
+                self.assertTrue(isinstance(O.oceanstor_quotas["test"]["user"], oceanstor.OceanStorQuotaIndex))
+
+                # forced updates skip the on-disk cache
+                O.list_filesets(devices="test", update=True)
+                self.assertTrue(dtrees_get.called)
+
+                # on-disk data older than max_age is requested again
+                disk_cache.set("quotas", "test", disk_cache.get("quotas", "test"), age=120)
+                del O.oceanstor_quotas["test"]
+                fs_quota_get.reset_mock()
+                self.assertEqual(O.list_quota(devices="test", max_age=60), quotas)
+                self.assertTrue(fs_quota_get.called)
+
+                # on-disk data keeps its age in memory
+                disk_cache.set("quotas", "test", disk_cache.get("quotas", "test"), age=120)
+                del O.oceanstor_quotas["test"]
+                fs_quota_get.reset_mock()
+                O.list_quota(devices="test", max_age=600)
+                self.assertFalse(fs_quota_get.called)
+                O.list_quota(devices="test", max_age=60)
+                self.assertTrue(fs_quota_get.called)
+
+                # on-disk data older than the TTL of its collection is requested again
+                disk_cache.set("filesets", "test", disk_cache.get("filesets", "test"), age=120)
+                del O.oceanstor_filesets["test"]
+                dtrees_get.reset_mock()
+                with mock.patch.dict(O.cache_policy, {"filesets": (60, None)}):
+                    O.list_filesets(devices="test")
+                self.assertTrue(dtrees_get.called)
+        finally:
+            disk_cache.close()
+            shutil.rmtree(cache_dir)
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_cache_policy(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        O.list_filesets(devices="test", update=True)
+
+        def age_filesets(seconds):
+            O._cache_times[("filesets", "test")] -= seconds
+            dtrees_get.reset_mock()
+
+        dtrees_get = self.session.api.v2.file_service.dtrees.get
+        dtrees_get.reset_mock()
+
+        # cached data never expires by default
+        age_filesets(3600)
+        O.list_filesets(devices="test")
+        self.assertFalse(dtrees_get.called)
+
+        # callers can state the maximum age of data
+        O.list_filesets(devices="test", max_age=7200)
+        self.assertFalse(dtrees_get.called)
+        O.list_filesets(devices="test", max_age=60)
+        dtrees_get.assert_any_call(file_system_name="test")
+
+        with mock.patch.dict(O.cache_policy):
+            O.set_cache_policy("filesets", ttl=60, max_stale=600)
+
+            # fresh data
+            age_filesets(30)
+            O.list_filesets(devices="test")
+            self.assertFalse(dtrees_get.called)
+
+            # stale data is refreshed in the background
+            age_filesets(60)
+            O.list_filesets(devices="test")
+            O.wait_for_refresh()
+            dtrees_get.assert_any_call(file_system_name="test")
+            self.assertEqual(O._refresh_pending, {})
+
+            # expired data is refreshed before use
+            age_filesets(3600)
+            O.list_filesets(devices="test")
+            dtrees_get.assert_any_call(file_system_name="test")
+
+        self.assertRaises(oceanstor.OceanStorOperationError, O.set_cache_policy, "nonexistent", ttl=60)
+
+    def _unmock_list_nfs_shares(self, O):
+        """Use real list_nfs_shares for this test, test_make_fileset mocks it in the shared instance"""
+        patcher = mock.patch.object(O, "list_nfs_shares", partial(oceanstor.OceanStorOperations.list_nfs_shares, O))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_list_nfs_shares(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        self._unmock_list_nfs_shares(O)
+        nfs_shares = O.list_nfs_shares(filesystemnames="test", update=True)
+        self.assertEqual(list(nfs_shares), ["test"])
+        self.assertEqual(sorted(nfs_shares["test"]), ["1", "2"])
+        self.assertEqual(nfs_shares["test"]["1"]["dtree_id"], "10@4097")
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_list_nfs_clients(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        self._unmock_list_nfs_shares(O)
+        client_get = self.session.api.v2.nas_protocol.nfs_share_auth_client_list.get
+        api_clients = API_RESPONSE["nas_protocol.nfs_share_auth_client_list"]["data"]
+        clients_reference = {
+            "1": {"1": api_clients[0], "2": api_clients[1]},
+            "2": {"3": api_clients[2]},
+        }
+
+        # clients requested per NFS share
+        client_get.reset_mock()
+        nfs_clients = O.list_nfs_clients(filesystemnames="test", update=True, bulk=False)
+        self.assertEqual(nfs_clients, clients_reference)
+        self.assertEqual(client_get.call_count, 2)
+
+        # clients requested in bulk for the whole account
+        client_get.reset_mock()
+        nfs_clients = O.list_nfs_clients(filesystemnames="test", update=True, bulk=True)
+        self.assertEqual(nfs_clients, clients_reference)
+        client_get.assert_called_once_with(
+            pagination=True, workers=oceanstor.OCEANSTOR_MAX_WORKERS, account_name=O.account["name"]
+        )
+        self.assertFalse("99" in O.oceanstor_nfsclients)
+
+        # filter by NFS share ID uses cached data
+        client_get.reset_mock()
+        self.assertEqual(O.list_nfs_clients(nfs_share_id=2, filesystemnames="test"), {"2": clients_reference["2"]})
+        self.assertEqual(O.list_nfs_clients(nfs_share_id=[99], filesystemnames="test"), {})
+        self.assertFalse(client_get.called)
+
+        # failed bulk request falls back to requests per NFS share
+        client_get.reset_mock()
+        with mock.patch.object(O, "_query_account_nfs_clients", side_effect=RuntimeError("not supported")):
+            nfs_clients = O.list_nfs_clients(filesystemnames="test", update=True, bulk=True)
+        self.assertEqual(nfs_clients, clients_reference)
+        self.assertEqual(client_get.call_count, 2)
+
+        client_get.reset_mock()
+        http_error = oceanstor.HTTPError("https://oceanstor.url", 404, "Not Found", {}, None)
+        with mock.patch.object(O, "_query_account_nfs_clients", side_effect=http_error):
+            nfs_clients = O.list_nfs_clients(filesystemnames="test", update=True, bulk=True)
+        self.assertEqual(nfs_clients, clients_reference)
+        self.assertEqual(client_get.call_count, 2)
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_sync_nfs_exports(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        self._unmock_list_nfs_shares(O)
+        nas_protocol = self.session.api.v2.nas_protocol
+        nas_protocol.nfs_share.reset_mock()
+        nas_protocol.nfs_share_auth_client.reset_mock()
+
+        desired = [
+            ("test", "dttest", {"10.141.0.0/16": {}, "10.143.0.0/16": {"access_value": 1}, "10.150.0.0/16": None}),
+            ("test", "dttest2", {}),
+            ("test", "100", {"10.141.0.0/16": {"root_squash": 1}}),
+            ("test", "nonexistent", {}),
+        ]
+
+        # dry-run does not send any change
+        with mock.patch.object(O, "dry_run", True):
+            report = O.sync_nfs_exports(desired)
+        self.assertEqual(sorted(item["status"] for item in report), ["dryrun"] * 5 + ["failed", "ok"])
+        self.assertFalse(nas_protocol.nfs_share.post.called)
+        self.assertFalse(nas_protocol.nfs_share_auth_client.post.called)
+
+        report = O.sync_nfs_exports(desired)
+        actions = [(item["fileset"], item["client"], item["action"], item["status"]) for item in report]
+        self.assertEqual(
+            actions,
+            [
+                ("dttest", "10.141.0.0/16", "noop", "ok"),
+                ("dttest", "10.143.0.0/16", "update_client", "ok"),
+                ("dttest", "10.150.0.0/16", "create_client", "ok"),
+                ("dttest2", "10.141.0.0/16", "delete_client", "ok"),
+                ("100", None, "create_share", "ok"),
+                ("100", "10.141.0.0/16", "create_client", "ok"),
+                ("nonexistent", None, None, "failed"),
+            ],
+        )
+        self.assertEqual(report[5]["share_id"], "3")
+
+        share_body = nas_protocol.nfs_share.post.call_args.kwargs["body"]
+        self.assertEqual(share_body["share_path"], "/test/100/")
+        client_bodies = [call.kwargs["body"] for call in nas_protocol.nfs_share_auth_client.post.call_args_list]
+        self.assertEqual(
+            sorted((body["share_id"], body["access_name"], body["root_squash"]) for body in client_bodies),
+            [("1", "10.150.0.0/16", 0), ("3", "10.141.0.0/16", 1)],
+        )
+        update_body = nas_protocol.nfs_share_auth_client.put.call_args.kwargs["body"]
+        self.assertEqual((update_body["id"], update_body["access_value"]), ("2", 1))
+        delete_body = nas_protocol.nfs_share_auth_client.delete.call_args.kwargs["body"]
+        self.assertEqual(delete_body["id"], "3")
+        self.assertFalse("test" in O.oceanstor_nfsshares)
+
+        # shares of dtrees not in desired state are only deleted on request
+        desired = [("test", "dttest", {"10.141.0.0/16": {}, "10.143.0.0/16": {"access_value": 0}})]
+        with mock.patch.object(O, "dry_run", True):
+            report = O.sync_nfs_exports(desired)
+            self.assertEqual([item["action"] for item in report], ["noop", "noop"])
+            report = O.sync_nfs_exports(desired, prune=True)
+        self.assertEqual(report[-1]["action"], "delete_share")
+        self.assertEqual((report[-1]["fileset"], report[-1]["share_id"]), ("dttest2", "2"))
+
+        # failed creation of share fails its clients
+        nas_protocol.nfs_share.post.side_effect = RuntimeError("share creation failed")
+        try:
+            report = O.sync_nfs_exports([("test", "100", {"10.141.0.0/16": {}})])
+        finally:
+            nas_protocol.nfs_share.post.side_effect = None
+        self.assertEqual([item["status"] for item in report], ["failed", "failed"])
+        self.assertEqual(report[1]["error"], "NFS share could not be created")
+
+        nas_protocol.nfs_share.post.side_effect = oceanstor.HTTPError("https://oceanstor.url", 500, "Error", {}, None)
+        try:
+            report = O.sync_nfs_exports([("test", "100", {"10.141.0.0/16": {}})])
+        finally:
+            nas_protocol.nfs_share.post.side_effect = None
+        self.assertEqual([item["status"] for item in report], ["failed", "failed"])
+
+        # cached shares are dropped even if sync is interrupted
+        O.list_nfs_shares(filesystemnames="test", update=True)
+        self.assertTrue("test" in O.oceanstor_nfsshares)
+        with mock.patch.object(O, "_apply_nfs_sync", side_effect=ValueError("interrupted")):
+            self.assertRaises(ValueError, O.sync_nfs_exports, [("test", "100", {"10.141.0.0/16": {}})])
+        self.assertFalse("test" in O.oceanstor_nfsshares)
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_cache_report(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        O.list_filesets(devices="test", update=True)
+        O.reset_cache_stats()
+
+        with O.cache_profile("list filesets") as profile:
+            O.list_filesets(devices="test")
+            O.list_filesets(devices="test")
+            O.list_filesets(devices="test", update=True)
+        self.assertEqual(profile["filesets"]["hits"], 2)
+        self.assertEqual(profile["filesets"]["refreshes"], 1)
+        self.assertEqual(profile["filesets"]["misses"], 0)
+
+        with O.cache_profile() as profile:
+            O.list_filesets(devices="test")
+        self.assertEqual(sorted(profile), ["filesets", "filesystems"])
+        self.assertEqual(profile["filesets"]["hits"], 1)
+
+        report = O.cache_report()
+        self.assertEqual(report["filesets"]["hits"], 3)
+        self.assertEqual(report["filesets"]["refreshes"], 1)
+        self.assertEqual(report["filesets"]["hit_ratio"], 0.75)
+        self.assertEqual(report["filesets"]["entries"], len(O.oceanstor_filesets["test"]))
+        self.assertTrue(report["filesets"]["bytes"] > 0)
+        self.assertEqual(report["nfsclients"]["hit_ratio"], None)
+        for collection in ["storagepools", "filesystems", "quotas", "nfsshares", "dns", "local_paths"]:
+            self.assertTrue(collection in report)
+
+        O.reset_cache_stats()
+        self.assertEqual(O.cache_report()["filesets"]["hits"], 0)
+
+    def test_approx_sizeof(self):
+        small = {"a": 1}
+        large = {"a": 1, "b": ["x" * 1000, "y" * 1000]}
+        self.assertTrue(oceanstor.approx_sizeof(large) > oceanstor.approx_sizeof(small) + 2000)
+        # shared objects are accounted once
+        shared = "z" * 1000
+        self.assertTrue(oceanstor.approx_sizeof([shared, shared]) < 2000)
+        # objects with slots
+        table = oceanstor.OceanStorQuotaTable()
+        self.assertTrue(oceanstor.approx_sizeof(table) > 0)
+
+    def test_path_trie(self):
+        filesets = {
+            "10@1": {"name": "vo1", "parent_dir": "/data"},
+            "10@2": {"name": "vo2", "parent_dir": "/data"},
+            "10@3": {"name": "sub", "parent_dir": "/data/vo1"},
+        }
+        fileset_trie = oceanstor.OceanStorPathTrie(filesets)
+        self.assertEqual(len(fileset_trie), 3)
+        self.assertTrue(fileset_trie.source is filesets)
+
+        self.assertEqual(fileset_trie.lookup("/data/vo2"), ("/data/vo2", ["10@2"]))
+        self.assertEqual(fileset_trie.lookup("/data/vo2/user/dir"), ("/data/vo2", ["10@2"]))
+        self.assertEqual(fileset_trie.lookup("/data/vo1/sub/dir"), ("/data/vo1/sub", ["10@3"]))
+        self.assertEqual(fileset_trie.lookup("/data/vo1/other"), ("/data/vo1", ["10@1"]))
+        self.assertEqual(fileset_trie.lookup("/data/vo3"), ("/", []))
+        self.assertEqual(fileset_trie.lookup("/"), ("/", []))
+
+        fileset_trie.insert("/data/vo2/", "10@4")
+        self.assertEqual(len(fileset_trie), 4)
+        self.assertEqual(fileset_trie.lookup("/data/vo2/user"), ("/data/vo2", ["10@2", "10@4"]))
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_get_fileset_trie(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        O.list_filesets()
+        O.list_filesets(devices="test", update=True)
+
+        fileset_trie = O._get_fileset_trie("test")
+        self.assertEqual(len(fileset_trie), 3)
+        self.assertEqual(fileset_trie.lookup("/test/dttest2/user"), ("/test/dttest2", ["10@4098"]))
+        self.assertTrue(O._get_fileset_trie("test") is fileset_trie)
+
+        # new filesets are added to the existing index
+        new_dtree = {"data": {"id": "10@4099", "name": "dttest3", "parent_dir": "/test"}}
+        dtrees_get = self.session.api.v2.file_service.dtrees.get
+        dtrees_get.reset_mock()
+        with mock.patch.object(self.session.api.v2.file_service.dtrees.post, "side_effect", None), \
+             mock.patch.object(self.session.api.v2.file_service.dtrees.post, "return_value", (0, new_dtree)):
+            O.make_fileset_api("dttest3", "test", parent_dir="/test")
+        self.assertFalse(dtrees_get.called)
+        self.assertTrue(O._get_fileset_trie("test") is fileset_trie)
+        self.assertEqual(fileset_trie.lookup("/test/dttest3"), ("/test/dttest3", ["10@4099"]))
+
+        # index is rebuilt with the filesets
+        O.list_filesets(devices="test", update=True)
+        self.assertFalse(O._get_fileset_trie("test") is fileset_trie)
+        self.assertEqual(O._get_fileset_trie("test").lookup("/test/dttest3"), ("/", []))
+
     @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
     @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
     @mock.patch("vsc.config.base.VscOptions", vsc_options)
@@ -867,6 +1910,269 @@ class StorageTest(TestCase):
         self.assertEqual(call_kwargs["grace"], 604800)
         self.assertEqual(call_kwargs["who"], "*")
 
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_list_quota(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+
+        quotas = O.list_quota(devices="test", update=True)
+        self.assertEqual(list(quotas), ["test"])
+        self.assertEqual(list(quotas["test"]["fileset"]), ["10@4097@1"])
+        self.assertEqual(list(quotas["test"]["user"]), ["10@4097@3"])
+        self.assertEqual(quotas["test"]["group"], {})
+
+        fileset_quota = quotas["test"]["fileset"]["10@4097@1"]
+        self.assertEqual(fileset_quota.filesetname, "10@4097")
+        self.assertEqual(fileset_quota.blockUsage, 1024)
+        self.assertEqual(fileset_quota.blockQuota, 262144)
+        self.assertEqual(fileset_quota.filesLimit, 2048)
+
+        default_quotas = O.list_quota(devices="test", only_default=True)
+        self.assertEqual(list(default_quotas["test"]["user"]), ["10@4097@2"])
+        self.assertEqual(default_quotas["test"]["user"]["10@4097@2"].ownerName, "All User")
+
+        # changes to cached quotas made during a refresh are not lost
+        fs_quota_get = self.session.api.v2.file_service.fs_quota.get
+
+        def patch_during_refresh(*args, **kwargs):
+            O._patch_cached_quota("test", "user", "10@4097@3", {"space_soft_quota": 4096 * 1024})
+            return oceanstor_test_fs_quota_get(*args, **kwargs)
+
+        oceanstor_test_fs_quota_get = fs_quota_get.side_effect
+        previous_quotas = O.oceanstor_quotas
+        fs_quota_get.side_effect = patch_during_refresh
+        try:
+            quotas = O.list_quota(devices="test", update=True)
+        finally:
+            fs_quota_get.side_effect = oceanstor_test_fs_quota_get
+        self.assertIs(quotas["test"], O.oceanstor_quotas["test"])
+        self.assertEqual(quotas["test"]["user"]["10@4097@3"].blockQuota, 4096)
+        # patched quotas are swapped in, previous references are left untouched
+        self.assertEqual(previous_quotas["test"]["user"]["10@4097@3"].blockQuota, 121)
+        patched_quotas = quotas["test"]
+
+        # next refresh without concurrent changes swaps in new quotas
+        quotas = O.list_quota(devices="test", update=True)
+        self.assertIsNot(quotas["test"], patched_quotas)
+        self.assertEqual(quotas["test"]["user"]["10@4097@3"].blockQuota, 121)
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_set_quota(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        O.list_quota(devices="test", update=True)
+
+        quota_path = "/tmp/dttest"
+        fs_quota_get = self.session.api.v2.file_service.fs_quota.get
+        with mock.patch.object(O, "_sanity_check", return_value=quota_path), \
+             mock.patch.object(O, "exists", return_value=True), \
+             mock.patch.object(O, "_identify_local_path", return_value=("10", "4097", "/tmp", "/")):
+            fs_quota_get.reset_mock()
+
+            # update existing user quota
+            O._set_quota("vsc10001", quota_path, typ="user", soft=2097152, hard=4194304)
+            user_quota = O.oceanstor_quotas["test"]["user"]["10@4097@3"]
+            self.assertEqual(user_quota.blockQuota, 2048)
+            self.assertEqual(user_quota.blockLimit, 4096)
+            self.assertEqual(user_quota.filesLimit, 1024)
+
+            # update grace of default user quota
+            O._set_grace(quota_path, "user", grace=14 * 24 * 3600, who="*")
+            default_quota = O.oceanstor_defaultquotas["test"]["user"]["10@4097@2"]
+            self.assertEqual(default_quota.blockGrace, 14)
+            self.assertEqual(default_quota.filesGrace, 14)
+
+            # create new user quota
+            O._set_quota("vsc10002", quota_path, typ="user", soft=1048576, hard=2097152)
+            new_quota = O.oceanstor_quotas["test"]["user"]["10@4097@5"]
+            self.assertEqual(new_quota.ownerName, "vsc10002")
+            self.assertEqual(new_quota.blockQuota, 1024)
+
+            # cache updated in place, only the new quota was queried
+            fs_quota_get.assert_called_once_with(id="10@4097@5", space_unit_type=0)
+
+            # failed query of the new quota drops the cached quotas of its filesystem
+            fs_quota_side_effect = fs_quota_get.side_effect
+            http_error = oceanstor.HTTPError("https://oceanstor.url", 500, "Error", {}, None)
+            for new_user, error in (("vsc10003", http_error), ("vsc10004", oceanstor.URLError("unreachable"))):
+                O.list_quota(devices="test")
+                fs_quota_get.side_effect = error
+                try:
+                    O._set_quota(new_user, quota_path, typ="user", soft=1048576, hard=2097152)
+                finally:
+                    fs_quota_get.side_effect = fs_quota_side_effect
+                self.assertFalse("test" in O.oceanstor_quotas)
+                self.assertFalse("test" in O.oceanstor_defaultquotas)
+            O.list_quota(devices="test")
+
+            # deferred refresh of whole filesystem at the end of bulk changes
+            fs_quota_get.reset_mock()
+            with O.deferred_quota_refresh():
+                O._set_quota("vsc10001", quota_path, typ="user", soft=1048576)
+                O._set_quota("vsc10001", quota_path, typ="user", soft=2097152)
+                self.assertFalse(fs_quota_get.called)
+            fs_quota_get.assert_called_once()
+            self.assertEqual(str(fs_quota_get.call_args[1]["parent_id"]), "10")
+            self.assertEqual(fs_quota_get.call_args[1]["count_url"], oceanstor.OCEANSTOR_QUOTA_COUNT_URL)
+            self.assertEqual(O.oceanstor_quotas["test"]["user"]["10@4097@3"].blockQuota, 121)
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_sync_quota(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        O.list_quota(devices="test", update=True)
+
+        quota_path = "/tmp/dttest"
+        desired = [
+            (quota_path, "user", "vsc10001", {"soft": 124830, "hard": 131072, "inode_soft": 975, "inode_hard": 1024}),
+            (quota_path, "user", "*", {"soft": 1048576}),
+            (quota_path, "user", "vsc10002", {"soft": 1048576, "hard": 2097152}),
+            (quota_path, "nonexistent", "vsc10001", {"soft": 1048576}),
+        ]
+
+        fs_quota_put = self.session.api.v2.file_service.fs_quota.put
+        fs_quota_post = self.session.api.v2.file_service.fs_quota.post
+        with mock.patch.object(O, "_sanity_check", return_value=quota_path), \
+             mock.patch.object(O, "exists", return_value=True), \
+             mock.patch.object(O, "_identify_local_path", return_value=("10", "4097", "/tmp", "/")):
+            # dry-run only reports the plan
+            fs_quota_put.reset_mock()
+            fs_quota_post.reset_mock()
+            with mock.patch.object(O, "dry_run", True):
+                report = O.sync_quota(desired)
+            self.assertEqual([item["action"] for item in report], ["noop", "update", "create", None])
+            self.assertEqual([item["status"] for item in report], ["ok", "dryrun", "dryrun", "failed"])
+            self.assertFalse(fs_quota_put.called)
+            self.assertFalse(fs_quota_post.called)
+
+            # only changed quotas are sent to OceanStor
+            report = O.sync_quota(desired)
+            self.assertEqual([item["action"] for item in report], ["noop", "update", "create", None])
+            self.assertEqual([item["status"] for item in report], ["ok", "ok", "ok", "failed"])
+            self.assertEqual(fs_quota_put.call_count, 1)
+            self.assertEqual(fs_quota_put.call_args[1]["body"]["id"], "10@4097@2")
+            self.assertEqual(fs_quota_post.call_count, 1)
+            self.assertEqual(fs_quota_post.call_args[1]["body"]["usr_grp_owner_name"], "vsc10002")
+
+            # user quotas without owner are rejected, user quotas refused by OceanStor are failures
+            fs_quota_post.reset_mock()
+            with mock.patch.object(fs_quota_post, "side_effect", RuntimeError("quota creation failed")):
+                report = O.sync_quota([
+                    (quota_path, "user", None, {"soft": 1048576}),
+                    (quota_path, "user", "vsc10003", {"soft": 1048576}),
+                ])
+            self.assertEqual([item["status"] for item in report], ["failed", "failed"])
+            self.assertEqual(fs_quota_post.call_count, 1)
+
+        # cached quotas are updated with the changes
+        self.assertEqual(O.oceanstor_defaultquotas["test"]["user"]["10@4097@2"].blockQuota, 1024)
+        self.assertEqual(O.oceanstor_quotas["test"]["user"]["10@4097@5"].ownerName, "vsc10002")
+
+        # invalid paths do not abort the synchronisation of other quotas
+        def sanity_check(path):
+            if path == quota_path:
+                return path
+            raise oceanstor.PosixOperationError(f"invalid path: {path}")
+
+        with mock.patch.object(O, "_sanity_check", side_effect=sanity_check), \
+             mock.patch.object(O, "exists", return_value=True), \
+             mock.patch.object(O, "_identify_local_path", return_value=("10", "4097", "/tmp", "/")):
+            report = O.sync_quota([
+                ("/nonexistent", "user", "vsc10001", {"soft": 1048576}),
+                (quota_path, "user", "vsc10002", {"soft": 1048576, "hard": 2097152}),
+            ])
+        self.assertEqual([item["status"] for item in report], ["failed", "ok"])
+
+    def test_quota_index(self):
+        quota_attrs = dict.fromkeys(oceanstor.StorageQuota._fields, 0)
+        quota_a = oceanstor.StorageQuota(**dict(quota_attrs, id="1", parentId="10@1", ownerName="vsc10001"))
+        quota_b = oceanstor.StorageQuota(**dict(quota_attrs, id="2", parentId="10@1", ownerName="vsc10002"))
+        quota_c = oceanstor.StorageQuota(**dict(quota_attrs, id="3", parentId="10@2", ownerName="vsc10001"))
+
+        quota_index = oceanstor.OceanStorQuotaIndex({"1": quota_a, "2": quota_b})
+        quota_index["3"] = quota_c
+        self.assertEqual(quota_index, {"1": quota_a, "2": quota_b, "3": quota_c})
+        self.assertEqual(quota_index.lookup("10@1"), {"1": quota_a, "2": quota_b})
+        self.assertEqual(quota_index.lookup("10@1", owner="vsc10002"), {"2": quota_b})
+        self.assertEqual(quota_index.lookup("10@2", owner="vsc10002"), {})
+        self.assertEqual(quota_index.lookup("nonexistent"), {})
+
+        # indexes follow changes in the collection
+        quota_index["2"] = quota_b._replace(parentId="10@2")
+        self.assertEqual(quota_index.lookup("10@1"), {"1": quota_a})
+        self.assertEqual(list(quota_index.lookup("10@2")), ["3", "2"])
+        del quota_index["1"]
+        self.assertEqual(quota_index.lookup("10@1"), {})
+        self.assertEqual(len(quota_index), 2)
+
+        # owners with several quotas in the same parent
+        quota_index["4"] = quota_c._replace(id="4")
+        self.assertEqual(list(quota_index.lookup("10@2", owner="vsc10001")), ["3", "4"])
+        del quota_index["3"]
+        self.assertEqual(list(quota_index.lookup("10@2", owner="vsc10001")), ["4"])
+        self.assertEqual(list(quota_index.lookup("10@2")), ["4", "2"])
+
+        # copies are independent of the original collection
+        quota_copy = quota_index.copy()
+        quota_copy["5"] = quota_a._replace(id="5")
+        quota_copy["4"] = quota_c._replace(id="4", blockQuota=1)
+        self.assertEqual(quota_copy.lookup("10@1"), {"5": quota_a._replace(id="5")})
+        self.assertEqual(quota_index.lookup("10@1"), {})
+        self.assertEqual(quota_index["4"].blockQuota, 0)
+        self.assertEqual(len(quota_index), 2)
+
+    def test_quota_table(self):
+        quota_attrs = dict.fromkeys(oceanstor.StorageQuota._fields, 0)
+        quota_a = oceanstor.StorageQuota(**dict(quota_attrs, id="1", parentId="10@1", ownerName="vsc10001"))
+        quota_b = oceanstor.StorageQuota(**dict(quota_attrs, id="2", parentId="10@1", ownerName="vsc10002"))
+
+        quota_table = oceanstor.OceanStorQuotaTable()
+        row_a = quota_table.add(quota_a)
+        row_b = quota_table.add(quota_b)
+        self.assertEqual(len(quota_table), 2)
+        self.assertEqual(quota_table.get(row_a), quota_a)
+        self.assertTrue(isinstance(quota_table.get(row_b), oceanstor.StorageQuota))
+        self.assertEqual(quota_table.get_field(row_b, "ownerName"), "vsc10002")
+
+        # strings are shared between rows
+        parent_a = quota_table.get_field(row_a, "parentId")
+        self.assertTrue(parent_a is quota_table.get_field(row_b, "parentId"))
+
+        quota_table.update(row_b, quota_b._replace(blockQuota=1024))
+        self.assertEqual(quota_table.get(row_b).blockQuota, 1024)
+
+        # rows of removed quotas are reused
+        quota_table.remove(row_a)
+        self.assertEqual(len(quota_table), 1)
+        self.assertEqual(quota_table.add(quota_a), row_a)
+        self.assertEqual(len(quota_table), 2)
+
+        # numeric attributes must be integers or None
+        self.assertRaises(TypeError, quota_table.add, quota_a._replace(blockQuota="1024"))
+        self.assertEqual(len(quota_table), 2)
+        quota_null = quota_a._replace(id="3", filesQuota=None, filesLimit=None)
+        row_null = quota_table.add(quota_null)
+        self.assertEqual(quota_table.get(row_null), quota_null)
+        self.assertEqual(quota_table.get_field(row_null, "filesQuota"), None)
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_iter_quota(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+
+        quotas = O.list_quota(devices="test", update=True)
+        quota_stream = [(fs, typ, quota.id) for fs, typ, quota in O.iter_quota(devices="test")]
+        quota_reference = [("test", typ, qid) for typ in quotas["test"] for qid in quotas["test"][typ]]
+        self.assertEqual(quota_stream, quota_reference)
+
+        default_quota_stream = [quota.id for _, _, quota in O.iter_quota(devices="test", only_default=True)]
+        self.assertEqual(default_quota_stream, ["10@4097@2"])
+        self.assertRaises(KeyError, O.iter_quota, devices="nonexistent")
+
     @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
     @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
     @mock.patch("vsc.config.base.VscOptions", vsc_options)
@@ -909,6 +2215,15 @@ class StorageTest(TestCase):
         self.assertEqual(O.list_snapshots("test", "dttest"), snap_reference)
         self.assertRaises(oceanstor.OceanStorOperationError, O.list_snapshots, "test", "nonexistent")
 
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_iter_snapshots(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        self.assertEqual(list(O.iter_snapshots("test")), O.list_snapshots("test"))
+        self.assertEqual(list(O.iter_snapshots("test", "dttest")), O.list_snapshots("test", "dttest"))
+        self.assertRaises(oceanstor.OceanStorOperationError, O.iter_snapshots, "nonexistent")
+
     @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
     @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
     @mock.patch("vsc.config.base.VscOptions", vsc_options)
@@ -923,6 +2238,30 @@ class StorageTest(TestCase):
         self.assertEqual(O.create_filesystem_snapshot("test", "SNAP_TEST_01", filesets="dttest"), 0)
         self.assertEqual(O.create_filesystem_snapshot("test", "NEW_SNAPSHOT", filesets=["dttest"]), True)
         self.assertEqual(O.create_filesystem_snapshot("test", "SNAP_TEST_01", filesets=["dttest"]), 0)
+        snap_status = O.create_filesystem_snapshot("test", "NEW_SNAPSHOT", filesets=["dttest"], report=True)
+        self.assertEqual(snap_status, {"dttest": True})
+
+        # multiple filesets: existing snapshots are listed once and new ones created concurrently
+        snapshots_api = O.session.api.v2.file_service.snapshots
+        snapshots_api.get.reset_mock()
+        snapshots_api.post.reset_mock()
+        filesets = ["dttest", "nonexistent", "dttest"]
+        snap_status = O.create_filesystem_snapshot("test", "SNAP_TEST_03", filesets=filesets, report=True)
+        self.assertEqual(snap_status, {"dttest": 0, "nonexistent": 0})
+        self.assertEqual(snapshots_api.get.call_count, 1)
+        self.assertEqual(snapshots_api.post.call_count, 1)
+        self.assertEqual(O.create_filesystem_snapshot("test", "SNAP_TEST_03", filesets=filesets), 0)
+
+        # HTTP errors on creation are reported per fileset
+        post_side_effect = snapshots_api.post.side_effect
+        snapshots_api.post.side_effect = oceanstor.HTTPError("https://oceanstor.url", 500, "Error", {}, None)
+        try:
+            snap_status = O.create_filesystem_snapshot("test", "NEW_SNAPSHOT", filesets=["dttest"], report=True)
+            # errors on full filesystem snapshots are raised
+            self.assertRaises(oceanstor.HTTPError, O.create_filesystem_snapshot, "test", "NEW_SNAPSHOT")
+        finally:
+            snapshots_api.post.side_effect = post_side_effect
+        self.assertEqual(snap_status, {"dttest": 0})
 
     @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
     @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
@@ -934,3 +2273,269 @@ class StorageTest(TestCase):
         self.assertRaises(
             oceanstor.OceanStorOperationError, O.delete_filesystem_snapshot, "nonexistent", "SNAP_TEST_01"
         )
+
+    def test_rate_limiter(self):
+        # token bucket limits rate after the burst, waits are measured on a simulated clock
+        clock = [0.0]
+        sleeps = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            # clock always advances, like the real one
+            clock[0] += max(seconds, 1e-6)
+
+        fake_time = mock.Mock(monotonic=lambda: clock[0], sleep=fake_sleep)
+        with mock.patch("vsc.filesystem.oceanstor.time", fake_time):
+            limiter = oceanstor.OceanStorRateLimiter(rate=100, burst=5)
+            for _ in range(5):
+                limiter.acquire()
+                limiter.release()
+            self.assertEqual(sleeps, [])
+            for _ in range(10):
+                limiter.acquire()
+                limiter.release()
+        # 10 queries beyond the burst wait for a token each at about 100 queries per second
+        self.assertTrue(0.09 <= clock[0] <= 0.11)
+
+        # queries in flight are limited
+        limiter = oceanstor.OceanStorRateLimiter(max_in_flight=2)
+        peak = []
+
+        def query(_):
+            limiter.acquire()
+            peak.append(limiter.status()["in_flight"])
+            time.sleep(0.01)
+            limiter.release()
+
+        oceanstor.parallel_map(query, range(8), max_workers=8)
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(limiter.status()["in_flight"], 0)
+        self.assertEqual(limiter.status()["waiting"], 0)
+
+        # throttling decreases rate, successful queries recover it
+        limiter = oceanstor.OceanStorRateLimiter(rate=80)
+        limiter.acquire()
+        limiter.release(throttled=True)
+        self.assertEqual(limiter.status()["rate"], 40)
+        self.assertEqual(limiter.status()["throttled"], 1)
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release()
+        self.assertAlmostEqual(limiter.status()["rate"], 40.5)
+        limiter.rate = 79.95
+        limiter.acquire()
+        limiter.release()
+        self.assertEqual(limiter.status()["rate"], 80)
+
+        # endpoint families of the client
+        client = oceanstor.OceanStorClient("https://oceanstor.url", rate_limits={"dtrees": (None, None, 1)})
+        self.assertEqual(client.rate_limiter("/api/v2/file_service/fs_quota?id=1"), client.rate_limiters["fs_quota"])
+        self.assertEqual(client.rate_limiter("/api/v2/converged_service/snapshots"), client.rate_limiters["snapshots"])
+        self.assertEqual(client.rate_limiter("/api/v2/account/accounts"), client.rate_limiters["default"])
+        self.assertEqual(client.rate_limit_status()["dtrees"]["max_in_flight"], 1)
+        # rate limits are opt-in, default limits of queries in flight do not throttle parallel queries
+        for family_status in client.rate_limit_status().values():
+            self.assertEqual(family_status["max_rate"], None)
+        self.assertEqual(client.rate_limit_status()["fs_quota"]["max_in_flight"], oceanstor.OCEANSTOR_MAX_WORKERS)
+
+    @mock.patch("vsc.filesystem.oceanstor.OceanStorRestClient", rest_client)
+    @mock.patch("vsc.filesystem.oceanstor.VscStorage", vsc_storage)
+    @mock.patch("vsc.config.base.VscOptions", vsc_options)
+    def test_rate_limit_status(self):
+        O = oceanstor.OceanStorOperations(*FAKE_INIT_PARAMS)
+        with mock.patch.object(self.session.client, "rate_limit_status", return_value={"default": {}}):
+            self.assertEqual(O.rate_limit_status(), {"default": {}})
+
+
+class OceanStorClientTest(TestCase):
+    """
+    Tests for the REST client of OceanStor against a minimal local HTTP server
+    """
+
+    def setUp(self):
+        """Start local OceanStor server with a clean state"""
+        super().setUp()
+        FakeOceanStorHandler.failures = {}
+        FakeOceanStorHandler.issued_tokens = []
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOceanStorHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        # cleanups run in reverse order
+        self.addCleanup(setattr, FakeOceanStorHandler, "issued_tokens", [])
+        self.addCleanup(setattr, FakeOceanStorHandler, "failures", {})
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def test_connection_pool(self):
+        client = oceanstor.OceanStorClient(self.url, pool_size=2)
+        for _ in range(3):
+            status, response = client.get("api/v2/test")
+            self.assertEqual(status, 200)
+            self.assertEqual(response["data"], [])
+        self.assertEqual(client.pool.stats(), {"hits": 2, "misses": 1, "idle": 1})
+        self.assertRaises(oceanstor.HTTPError, client.get, "api/v2/missing")
+        client.pool.clear()
+        self.assertEqual(client.pool.stats()["idle"], 0)
+
+    def test_token_manager(self):
+        token_dir = tempfile.mkdtemp()
+        token_file = os.path.join(token_dir, "tokens", "x_auth_token")
+        self.addCleanup(shutil.rmtree, token_dir)
+
+        client = oceanstor.OceanStorClient(self.url)
+        self.assertTrue(client.login("user", "secret", token_file=token_file))
+        self.assertEqual(FakeOceanStorHandler.issued_tokens, ["token-0"])
+        self.assertEqual(client.get("api/v2/secure")[0], 200)
+
+        # token is persisted only readable by its owner and without password
+        self.assertEqual(stat.S_IMODE(os.stat(token_file).st_mode), 0o600)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.dirname(token_file)).st_mode), 0o700)
+        with open(token_file, encoding="utf-8") as token_fh:
+            token_data = json.load(token_fh)
+        self.assertEqual(token_data["token"], "token-0")
+        self.assertEqual(token_data["username"], "user")
+        self.assertFalse("secret" in json.dumps(token_data))
+
+        # other process reuses persisted token
+        client_reuse = oceanstor.OceanStorClient(self.url)
+        client_reuse.login("user", "secret", token_file=token_file)
+        self.assertEqual(client_reuse.get("api/v2/secure")[0], 200)
+        self.assertEqual(FakeOceanStorHandler.issued_tokens, ["token-0"])
+        # token of other user is not reused
+        client_other = oceanstor.OceanStorClient(self.url)
+        client_other.login("other", "secret", token_file=token_file)
+        self.assertEqual(FakeOceanStorHandler.issued_tokens, ["token-0", "token-1"])
+
+        # rejected token is renewed and query retried once
+        self.assertEqual(client.get("api/v2/secure")[0], 200)
+        self.assertEqual(client.token_manager.token, "token-2")
+        self.assertEqual(FakeOceanStorHandler.issued_tokens, ["token-0", "token-1", "token-2"])
+        # query is retried only once
+        self.assertRaises(oceanstor.HTTPError, client.get, "api/v2/forbidden")
+        self.assertEqual(len(FakeOceanStorHandler.issued_tokens), 4)
+
+        # token files accessible by other users are ignored
+        os.chmod(token_file, 0o644)
+        client_reuse.token_manager.expires = 0
+        self.assertEqual(client_reuse.get("api/v2/secure")[0], 200)
+        self.assertEqual(client_reuse.token_manager.token, "token-4")
+
+        # token close to expiration is renewed proactively
+        client_mem = oceanstor.OceanStorClient(self.url)
+        client_mem.login("user", "secret")
+        self.assertEqual(client_mem.token_manager.token, "token-5")
+        client_mem.token_manager.expires = time.time() + oceanstor.OCEANSTOR_TOKEN_REFRESH_MARGIN / 2
+        self.assertEqual(client_mem.get("api/v2/secure")[0], 200)
+        self.assertEqual(client_mem.token_manager.token, "token-6")
+
+        # authentication errors in exit codes are detected
+        auth_err = RuntimeError(("OceanStor query returned non-zero exit code", -401, ""))
+        self.assertTrue(client._is_auth_error(auth_err))
+        self.assertFalse(client._is_auth_error(RuntimeError(("error", 1077949006, ""))))
+        self.assertFalse(client._is_auth_error(RuntimeError("error")))
+
+    def test_retry_backoff(self):
+        client = oceanstor.OceanStorClient(self.url, retries=3, retry_delay=0.001)
+
+        # idempotent queries are retried on transient errors
+        FakeOceanStorHandler.failures = {"/api/v2/unavailable": 2, "/api/v2/busy": 3}
+        self.assertEqual(client.get("api/v2/unavailable")[0], 200)
+        self.assertEqual(client.get("api/v2/busy")[0], 200)
+        self.assertEqual(FakeOceanStorHandler.failures, {"/api/v2/unavailable": 0, "/api/v2/busy": 0})
+
+        # retries are limited
+        FakeOceanStorHandler.failures = {"/api/v2/busy": 5}
+        self.assertRaises(RuntimeError, client.get, "api/v2/busy")
+        self.assertEqual(FakeOceanStorHandler.failures["/api/v2/busy"], 1)
+
+        # POST queries are only retried if marked as idempotent
+        FakeOceanStorHandler.failures = {"/api/v2/unavailable": 1}
+        self.assertRaises(oceanstor.HTTPError, client.post, "api/v2/unavailable", body={})
+        FakeOceanStorHandler.failures = {"/api/v2/unavailable": 1}
+        self.assertEqual(client.post("api/v2/unavailable", body={}, idempotent=True)[0], 200)
+
+        # fatal errors are not retried
+        FakeOceanStorHandler.failures = {}
+        self.assertRaises(oceanstor.HTTPError, client.get, "api/v2/missing")
+        self.assertFalse(client.is_retryable(RuntimeError(("error", 33656849, "already exists"))))
+        self.assertFalse(client.is_retryable(RuntimeError(("error", 1077949058, "no permission"))))
+        self.assertTrue(client.is_retryable(RuntimeError(("error", 1077949006, "system busy"))))
+        self.assertTrue(client.is_retryable(oceanstor.URLError(ConnectionResetError())))
+        self.assertFalse(client.is_retryable(oceanstor.URLError("unknown host")))
+
+        # backoff grows exponentially up to the maximum delay
+        delays = [client._retry_wait(attempt, None) for attempt in range(20)]
+        self.assertTrue(0.0005 <= delays[0] <= 0.001)
+        self.assertTrue(0.004 <= delays[3] <= 0.008)
+        self.assertTrue(max(delays) <= oceanstor.OCEANSTOR_RETRY_MAX_DELAY)
+
+    def test_rate_limit_throttling(self):
+        client = oceanstor.OceanStorClient(
+            self.url, retry_delay=0.001, rate_limits={"default": (100, 10, 4)}
+        )
+        FakeOceanStorHandler.failures = {"/api/v2/unavailable": 2}
+        self.assertEqual(client.get("api/v2/unavailable")[0], 200)
+        status = client.rate_limit_status()["default"]
+        self.assertEqual(status["throttled"], 2)
+        self.assertAlmostEqual(status["rate"], 25.1)
+        self.assertEqual(status["in_flight"], 0)
+
+    def test_query_stats(self):
+        prom_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, prom_dir)
+
+        client = oceanstor.OceanStorClient(self.url, retries=0)
+        client.get("api/v2/items", pagination=True, page_size=50)
+        client.post("api/v2/test/123", body={"name": "test"})
+        self.assertRaises(oceanstor.HTTPError, client.get, "api/v2/missing")
+        FakeOceanStorHandler.failures = {"/api/v2/busy": 1}
+        self.assertRaises(RuntimeError, client.get, "api/v2/busy")
+
+        report = client.stats.report()
+        self.assertEqual(
+            sorted(report), ["GET api/v2/busy", "GET api/v2/items", "GET api/v2/missing", "POST api/v2/test/:id"]
+        )
+        items = report["GET api/v2/items"]
+        self.assertEqual(items["calls"], 2)
+        self.assertEqual(items["pages"], 2)
+        self.assertEqual(items["latency_buckets"][float("inf")], 2)
+        self.assertTrue(items["bytes_received"] > 0)
+        self.assertEqual(items["errors"], {})
+        self.assertEqual(report["POST api/v2/test/:id"]["bytes_sent"], len('{"name": "test"}'))
+        self.assertEqual(report["GET api/v2/missing"]["errors"], {"404": 1})
+        self.assertEqual(report["GET api/v2/busy"]["errors"], {"1077949006": 1})
+
+        prom_file = os.path.join(prom_dir, "oceanstor.prom")
+        client.stats.write_prometheus(prom_file)
+        self.assertEqual(stat.S_IMODE(os.stat(prom_file).st_mode), 0o644)
+        with open(prom_file, encoding="utf-8") as prom_fh:
+            prom_text = prom_fh.read()
+        self.assertTrue("# TYPE oceanstor_api_request_duration_seconds histogram" in prom_text)
+        self.assertTrue('oceanstor_api_requests_total{method="GET",endpoint="api/v2/items"} 2' in prom_text)
+        self.assertTrue('oceanstor_api_pages_total{method="GET",endpoint="api/v2/items"} 2' in prom_text)
+        labels = 'method="GET",endpoint="api/v2/items",le="+Inf"'
+        self.assertTrue(f"oceanstor_api_request_duration_seconds_bucket{{{labels}}} 2" in prom_text)
+        labels = 'method="GET",endpoint="api/v2/missing",code="404"'
+        self.assertTrue(f"oceanstor_api_request_errors_total{{{labels}}} 1" in prom_text)
+        self.assertEqual(os.listdir(prom_dir), ["oceanstor.prom"])
+
+        client.stats.reset()
+        self.assertEqual(client.stats.report(), {})
+
+    def test_paginated_get(self):
+        client = oceanstor.OceanStorClient(self.url)
+        items_reference = [{"id": n} for n in range(FakeOceanStorHandler.total_items)]
+
+        _, response = client.get("api/v2/items", pagination=True)
+        self.assertEqual(response["data"], items_reference)
+        _, response = client.get("api/v2/items", pagination=True, page_size=10)
+        self.assertEqual(response["data"], items_reference)
+        _, response = client.get("api/v2/items", pagination=True, page_size=10, workers=4)
+        self.assertEqual(response["data"], items_reference)
+        _, response = client.get(
+            "api/v2/items", pagination=True, page_size=5, workers=3, count_url="api/v2/items/count"
+        )
+        self.assertEqual(response["data"], items_reference)
+        self.assertRaises(ValueError, client.get, "api/v2/items", pagination=True, page_size=1000)